@@ -2,6 +2,8 @@
 
 import visa
 import time, sys
+from rigol_ds import read_measurements
+from rigol_dg1022 import DualChannel
 
 ############################################################################
 # Date: 2017-12-26
@@ -15,7 +17,6 @@ ds = None  # digital oscilloscope (DS2072A)
 dg = None  # digital function generator (DG1022)
 
 USE_PROBE_10X = True
-TOO_LARGE_VALUE = (9e+37)
 
 ############################################################################
 def cmdWrite(instr, cmd, dly=0.1):
@@ -75,18 +76,13 @@ else:
 cmdWrite( dg, "SYST:REM", 1.0 )
 
 freq = 50.0; vpp = 5.0; offset = 0.0 # the properties of sine wave
-cmdWrite( dg, "VOLT:UNIT VPP" )      # use voltage peak-to-peak
-cmdWrite( dg, "APPL:SIN {:.3e},{:.3e},{:.3e}".format(freq,vpp,offset) )
-cmdWrite( dg, "PHAS 0" )             # set phase offset to 0.0
-cmdWrite( dg, "OUTP ON" )            # enable CH1 outout
-
-cmdWrite( dg, "VOLT:UNIT:CH2 VPP" )  # use voltage peak-to-peak
-cmdWrite( dg, "APPL:SIN:CH2 {:.3e},{:.3e},{:.3e}".format(freq,vpp,offset) )
-cmdWrite( dg, "PHAS:CH2 90" )        # set phase offset to 90.0
-cmdWrite( dg, "OUTP:CH2 ON" )        # enable CH2 output
-
-time.sleep( 0.5 )
-cmdWrite( dg, "PHAS:ALIGN" )         # enable align phase output of dual channels
+# CH1: phase 0.0, CH2: phase 90.0, both outputs on, then align the phases
+# (all settings are checked first and sent in one batch)
+dual = DualChannel( dg )
+dual.configure( {'func': 'SIN', 'freq': freq, 'vpp': vpp, 'offset': offset,
+                 'phase': 0.0, 'output': True},
+                {'func': 'SIN', 'freq': freq, 'vpp': vpp, 'offset': offset,
+                 'phase': 90.0, 'output': True} )
 
 ############################################################################
 cmdWrite( ds, ":SYST:REM" )
@@ -123,26 +119,22 @@ cmdWrite( ds, ":MEAS:RPH CHAN1,CHAN2" )
 
 time.sleep(1.0)
 
-def read_vpp( channel ):
-    resp = cmdRead( ds, ":MEAS:VPP? CHAN{:d}".format( channel ), 0.2 )
-    vpp = float(resp)
-    if vpp > TOO_LARGE_VALUE:
-        print ( "CHAN{:d} Vpp: ---- V".format( channel) )
-    else:
-        print ( "CHAN{:d} Vpp: {:.3f} V".format( channel, vpp ) )
-
-def read_freq( channel ):
-    resp = cmdRead( ds, ":MEAS:FREQ? CHAN{:d}".format( channel ), 0.2 )
-    freq = float(resp)
-    if freq > TOO_LARGE_VALUE:
-        print ( "CHAN{:d} Freq: ---- Hz".format( channel ) )
-    else:
-        print ( "CHAN{:d} Freq: {:.1f} Hz".format( channel, freq ) )
-
-def read_phase_diff():
-    resp = cmdRead( ds,":MEAS:RPH? CHAN1,CHAN2", 0.2 )
-    phase_delay = float( resp )
-    if phase_delay > TOO_LARGE_VALUE:
+MEAS_SPECS = [ ('VPP',1), ('VPP',2), ('FREQ',1), ('FREQ',2), ('RPH',1,2) ]
+
+def read_all():
+    # all measurements with one compound query (one USB transaction)
+    vpp1, vpp2, freq1, freq2, phase_delay = read_measurements( ds, MEAS_SPECS )
+    for channel, vpp in [(1, vpp1), (2, vpp2)]:
+        if vpp is None:
+            print ( "CHAN{:d} Vpp: ---- V".format( channel) )
+        else:
+            print ( "CHAN{:d} Vpp: {:.3f} V".format( channel, vpp ) )
+    for channel, freq in [(1, freq1), (2, freq2)]:
+        if freq is None:
+            print ( "CHAN{:d} Freq: ---- Hz".format( channel ) )
+        else:
+            print ( "CHAN{:d} Freq: {:.1f} Hz".format( channel, freq ) )
+    if phase_delay is None:
         print ( "Cannot measure the phase difference" )
     else:
         print ( "Phase difference CHAN1->CHAN2: {:.1f} deg.".format( phase_delay) )
@@ -150,11 +142,7 @@ def read_phase_diff():
 # perform the measurements 3 times
 print (50*'-')
 for i in range(3):
-    read_vpp(1)
-    read_vpp(2)
-    read_freq(1)
-    read_freq(2)
-    read_phase_diff()
+    read_all()
     print (50*'-')
 
 resources.close()
@@ -2,7 +2,9 @@
 
 import visa
 import time, sys
-import math
+import math, os
+from rigol_sweep import FreqSweep
+from rigol_journal import Journal
 
 ############################################################################
 # Date: 2017-12-26
@@ -16,7 +18,7 @@ ds = None  # digital oscilloscope (DS2072A)
 dg = None  # digital function generator (DG1022)
 
 USE_PROBE_10X = True
-TOO_LARGE_VALUE = (1e+37)
+JOURNAL_FILE  = 'freq_sweep_journal.txt'  # completed points (for resuming)
 
 ############################################################################
 def cmdWrite(instr, cmd, dly=0.1):
@@ -34,6 +36,7 @@ def cmdRead(instr, cmd, dly=0.1):
 
 ############################################################################
 visa_driver = '@py'  # use 'visa64', 'visa32' (Windows) or '@py' (Linux)
+visa_driver = os.environ.get( 'PYVISA_LIBRARY', visa_driver )  # e.g. '@rigolsim'
 resources = visa.ResourceManager( visa_driver )
 devices   = resources.list_resources()
 
@@ -113,81 +116,41 @@ cmdWrite( ds, ":MEAS:SET:PSB CHAN2" )
 
 time.sleep(1.0)
 
-def read_vpp( channel ):
-    global ds
-    resp = cmdRead( ds, ":MEAS:VPP? CHAN{:d}".format( channel ), 0.2 )
-    vpp = float(resp)
-    if vpp > TOO_LARGE_VALUE:
-        return None
-    else:
-        return vpp
-
-def read_freq( channel ):
-    global ds
-    resp = cmdRead( ds, ":MEAS:FREQ? CHAN{:d}".format( channel ), 0.2 )
-    freq = float(resp)
-    if freq > TOO_LARGE_VALUE:
-        return None
-    else:
-        return freq
-
-def read_phase_diff():
-    global ds
-    resp = cmdRead( ds,":MEAS:RPH? CHAN1,CHAN2", 0.2 )
-    phase_diff = float( resp )
-    if phase_diff > TOO_LARGE_VALUE:
-        return None
-    else:
-        return phase_diff
-
 print (50*'-')
 
-scale = 1.0
-
-for freq in [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]:
-    cmdWrite( dg, "FREQ {:.3e}".format(freq) )
-    time.sleep(1.0)
-    cmdWrite( ds, ":TIM:SCAL {:.3e}".format( 0.5/freq ) )
-    if freq < 10:
-       time.sleep(5.0)
-    else:
-       time.sleep(3.0)
-
-    while True:
-        freq = read_freq(1)
-        if freq != None:
-            break
-        print ('.')
-        time.sleep(0.5)
-
-    vpp2 = read_vpp(2)
-    if vpp2 < 0.5:
-        scale = 0.1
-    elif vpp2 < 0.2:
-        scale = 0.05
-    elif vpp2 < 0.1:
-        scale = 0.02
-
-    cmdWrite( ds, ":CHAN{:d}:SCAL {:.3e}".format( 2, scale ) )
-    time.sleep(2.0)
-
-    vpp2 = read_vpp(2); vpp1 = read_vpp(1);
+# measurements for each frequency (one compound query)
+MEAS_SPECS = [ ('FREQ',1), ('VPP',1), ('VPP',2), ('RPH',1,2) ]
+
+# the vertical scale of CHAN2 is selected by auto-ranging for each frequency
+sweep = FreqSweep( ds, dg, MEAS_SPECS, timeout=10.0, autorange=(2,),
+                   probe=(10 if USE_PROBE_10X else 1) )
+
+# completed points are saved to the journal file; when the sweep was
+# interrupted, running the script again continues where it stopped
+freqs = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+journal = Journal( JOURNAL_FILE, {'freqs': freqs, 'specs': MEAS_SPECS} )
+if len(journal.done) > 0:
+    print ('Resuming the sweep: {:d} points done'.format( len(journal.done) ))
+
+for freq, values, settled in sweep.run( freqs, journal=journal ):
+    if None in values:
+        print ('Invalid measurements at {:.1f} Hz, point skipped'.format( freq ))
+        continue
+    freq, vpp1, vpp2, phase = values
+    if not settled:
+        print ('Measurements not settled (timeout)')
     if vpp2 < 0.100:
-        break
-
-    phase = None
-    while True:
-        phase = read_phase_diff()
-        if phase != None:
-            break
-        print ('.')
-        time.sleep(0.5)
+        break   # the end of the sweep
 
     str = "Freq(Hz): {:.1f}, Vpp2/Vpp1: {:.3f}, Phase(Deg.): {:.1f}"
     print ( str.format(freq, vpp2/vpp1, -phase) )
 
     print (50*'-')
 
+# the sweep has ended (the journal is kept only if it was interrupted;
+# invalid points are not journaled, they are measured again)
+os.remove( JOURNAL_FILE )
+
 resources.close()
 del resources
 dg.close()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    pyvisa back end ('@rigolsim') with the simulated instruments of
+#    rigol_sim.py: a DS oscilloscope and a DG1022 function generator
+#    (make_bench), found by ResourceManager.list_resources() as USB
+#    instruments, e.g.
+#       USB0::0x1AB1::0x04B0::DS2A000000001::INSTR
+#       USB0::0x1AB1::0x0588::DG1D000000001::INSTR
+#    so the scripts run unchanged without instruments, either with
+#       rm = visa.ResourceManager( '@rigolsim' )
+#    or with the pyvisa environment variable (used by ResourceManager('')):
+#       $ PYVISA_LIBRARY=@rigolsim python3 ./ds2000a_dg1022_freq_sweep.py
+#    Options of the simulation in the library path, separated by ';':
+#       'scope=DS1054Z;fc=1000;latency=0.002@rigolsim'
+#     - scope         : DS2000A (default), DS1000E, DS1000Z or none
+#     - generator     : 1 (default) or 0 (no DG1022)
+#     - fc            : the cutoff frequency of the RC lowpass between
+#                       DG1022 CH1 and CHAN2 (default 100), 0: DG1022 CH2
+#     - bytes_per_sec : the USB throughput (default 1e6)
+#     - latency       : the time per command and per chunk (default 0.001)
+#     - seed          : the seed of the noise and of the faults
+#     - faults        : e.g. 'timeout:0.01,corrupt:0.001' (rigol_sim.py)
+#    The instruments are created once per back end (the state is kept
+#    when a resource is closed and opened again).
+############################################################################
+
+import itertools
+from collections import OrderedDict
+
+from pyvisa import constants, errors, highlevel, rname
+
+import rigol_sim
+
+StatusCode = constants.StatusCode
+
+OPTIONS = {
+    'scope': str, 'generator': int, 'fc': float, 'bytes_per_sec': float,
+    'latency': float, 'seed': int, 'faults': str,
+}
+
+def parse_options( library_path ):
+    # 'scope=DS1054Z;fc=1000' -> {'scope': 'DS1054Z', 'fc': 1000.0}
+    options = {}
+    for item in str( library_path or '' ).split(';'):
+        key, _, value = item.partition( '=' )
+        key = key.strip().lower()
+        if key in OPTIONS:
+            options[key] = OPTIONS[key]( value.strip() )
+    faults = {}
+    for item in options.pop( 'faults', '' ).split(','):
+        name, _, value = item.partition( ':' )
+        if name.strip():
+            faults[name.strip()] = float( value )
+    options['faults'] = faults
+    return options
+
+def make_instruments( options ):
+    scope = options.get( 'scope', 'DS2000A' )
+    ds, dg = rigol_sim.make_bench( scope if scope.lower() != 'none' else 'DS2000A',
+                                   options.get('fc', 100.0) or None,
+                                   options.get('bytes_per_sec', 1.0e6),
+                                   options.get('latency', 0.001),
+                                   options['faults'], options.get('seed', 0) )
+    instruments = []
+    if scope.lower() != 'none':
+        instruments.append( ds )
+    if options.get( 'generator', 1 ):
+        instruments.append( dg )
+    return OrderedDict( (instr.resource_name, instr) for instr in instruments )
+
+############################################################################
+
+class RigolSimLibrary(highlevel.VisaLibraryBase):
+
+    def _init( self ):
+        self.options = parse_options( self.library_path )
+        self.instruments = make_instruments( self.options )
+        self.sessions = {}     # session -> instrument (None: resource manager)
+        self.attributes = {}   # session -> other attributes set by pyvisa
+        self._next_session = itertools.count( 1000 )
+
+    @staticmethod
+    def get_library_paths():
+        return ( 'unset', )
+
+    @staticmethod
+    def get_debug_info():
+        return OrderedDict( [('Version', '1.0'),
+                             ('Models', ', '.join(sorted(rigol_sim.MODELS)))] )
+
+    def _session( self, instr ):
+        session = next( self._next_session )
+        self.sessions[session] = instr
+        self.attributes[session] = {}
+        return session
+
+    def _instrument( self, session ):
+        try:
+            return self.sessions[session]
+        except KeyError:
+            raise errors.VisaIOError( StatusCode.error_invalid_object )
+
+    def open_default_resource_manager( self ):
+        return self._session( None ), StatusCode.success
+
+    def list_resources( self, session, query='?*::INSTR' ):
+        names = list( self.instruments )
+        if hasattr( rname, 'filter' ):
+            names = rname.filter( names, query )
+        return tuple( names )
+
+    def parse_resource_extended( self, session, resource_name ):
+        try:
+            parsed = rname.parse_resource_name( resource_name )
+        except rname.InvalidResourceName:
+            return 0, StatusCode.error_invalid_resource_name
+        info = highlevel.ResourceInfo( parsed.interface_type_const, parsed.board,
+                                       parsed.resource_class, str(parsed), None )
+        return info, StatusCode.success
+
+    def parse_resource( self, session, resource_name ):
+        return self.parse_resource_extended( session, resource_name )
+
+    def _find( self, resource_name ):
+        # 'USB0::6833::1200::DS2A000000001::0::INSTR' and the like
+        try:
+            key = str( rname.parse_resource_name(resource_name) )
+        except rname.InvalidResourceName:
+            key = resource_name
+        for name, instr in self.instruments.items():
+            if name.upper() == key.upper() or \
+               instr.serial.upper() in resource_name.upper().split('::'):
+                return instr
+        return None
+
+    def open( self, session, resource_name, access_mode=None, open_timeout=None ):
+        instr = self._find( resource_name )
+        if instr is None:
+            raise errors.VisaIOError( StatusCode.error_resource_not_found )
+        return self._session( instr ), StatusCode.success
+
+    def close( self, session ):
+        self.sessions.pop( session, None )
+        self.attributes.pop( session, None )
+        return StatusCode.success
+
+    ########################################################################
+
+    def read( self, session, count ):
+        instr = self._instrument( session )
+        try:
+            data, more = instr.read_chunk( count )
+        except IOError:
+            raise errors.VisaIOError( StatusCode.error_timeout )
+        if more:
+            return data, StatusCode.success_max_count_read
+        return data, StatusCode.success
+
+    def write( self, session, data ):
+        return self._instrument( session ).write_raw( data ), StatusCode.success
+
+    def clear( self, session ):
+        instr = self._instrument( session )
+        if instr is not None:
+            instr._resp = b''
+        return StatusCode.success
+
+    def flush( self, session, mask ):
+        return StatusCode.success
+
+    def read_stb( self, session ):
+        return 0, StatusCode.success
+
+    def disable_event( self, session, event_type, mechanism ):
+        return StatusCode.success
+
+    def discard_events( self, session, event_type, mechanism ):
+        return StatusCode.success
+
+    def get_attribute( self, session, attribute ):
+        instr = self._instrument( session )
+        if attribute in self.attributes.get( session, {} ):
+            return self.attributes[session][attribute], StatusCode.success
+        if instr is None:
+            return 0, StatusCode.error_nonsupported_attribute
+        if attribute == constants.VI_ATTR_TMO_VALUE:
+            return int( instr.timeout ), StatusCode.success
+        if attribute == constants.VI_ATTR_RSRC_NAME:
+            return instr.resource_name, StatusCode.success
+        if attribute == constants.VI_ATTR_INTF_TYPE:
+            return constants.InterfaceType.usb, StatusCode.success
+        if attribute == constants.VI_ATTR_MANF_ID:
+            return rigol_sim.RIGOL_VENDOR_ID, StatusCode.success
+        if attribute == constants.VI_ATTR_MODEL_CODE:
+            return instr.PRODUCT_ID, StatusCode.success
+        if attribute == constants.VI_ATTR_USB_SERIAL_NUM:
+            return instr.serial, StatusCode.success
+        return 0, StatusCode.error_nonsupported_attribute
+
+    def set_attribute( self, session, attribute, attribute_state ):
+        instr = self._instrument( session )
+        if instr is not None and attribute == constants.VI_ATTR_TMO_VALUE:
+            if attribute_state == constants.VI_TMO_INFINITE:
+                instr.timeout = 1.0e9
+            else:
+                instr.timeout = attribute_state
+            return StatusCode.success
+        self.attributes.setdefault( session, {} )[attribute] = attribute_state
+        return StatusCode.success
+
+WRAPPER_CLASS = RigolSimLibrary
+
+############################################################################
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Benchmark suite of the capture pipeline of a Rigol DS2000A:
+#      discovery     : find and identify the oscilloscope ('*IDN?')
+#      setup         : memory depth, time base, waveform source/mode
+#      trigger       : single acquisition, wait for ':TRIG:STAT?' = STOP
+#      transfer      : chunked RAW mode read of 1.4M, 14M, 56M points
+#      parse_header  : ':WAV:PRE?' and the data block header
+#      to_volts      : the samples to voltage values (float32)
+#      time_axis     : the time of each sample
+#      decimate      : min/max envelope for the plot
+#      save_capture  : the capture to .npy/.json files (rigol_capture.py)
+#      render_png    : PNG file of the saved capture (rigol_render.py)
+#    The instrument is the simulated oscilloscope (--sim, rigol_sim.py),
+#    a recorded session (--replay, rigol_session.py) or the instrument
+#    found by pyvisa; --record saves the session of a run. The steps
+#    after the transfer use the data of the largest transfer.
+#    Each stage is run 'repeat' times: the best wall time, the throughput
+#    (MB/s of samples) and the peak memory (tracemalloc, MB, measured in
+#    one more run, not in the timed runs) are reported
+#    and saved to a JSON file. With --baseline, the times are compared
+#    with a saved result and a stage slower by more than the tolerance
+#    is reported as a regression (exit code 1). With --trace, the
+#    commands are traced (rigol_trace.py): Chrome trace file and summary.
+############################################################################
+# Usage:
+#   $ python3 ./rigol_bench.py --sim [--points 1.4M,14M,56M] [--repeat 3]
+#                              [-o result.json] [--baseline base.json]
+#                              [--tolerance 0.25] [--bytes-per-sec 100e6]
+#                              [--trace trace.json]
+#   $ python3 ./rigol_bench.py --record run1.ses     (with the instrument)
+#   $ python3 ./rigol_bench.py --replay run1.ses --baseline base.json
+#
+############################################################################
+
+import os, sys, time, json
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+
+import rigol_ds
+import rigol_capture
+import rigol_render   # Agg backend
+from rigol_instr import cmdWrite, cmdRead, make_block, parse_block
+from rigol_discovery import Discovery
+
+DEFAULT_POINTS = '1.4M,14M,56M'
+PLOT_WIDTH = 4000
+TIME_PER_DIV = 1e-3
+
+############################################################################
+
+def parse_points( text ):
+    # '1.4M,14M,56M' -> [1400000, 14000000, 56000000]
+    factors = { 'K': 1e3, 'M': 1e6 }
+    points = []
+    for item in text.split(','):
+        item = item.strip().upper()
+        factor = factors.get( item[-1:], 1.0 )
+        points.append( int(round(float(item.rstrip('KM')) * factor)) )
+    return points
+
+def run_stage( func, repeat=1, prepare=None ):
+    # returns (best wall time, peak memory in bytes, last result);
+    # prepare() is called once before (not measured). The peak memory is
+    # measured in an extra run: tracemalloc slows down the allocations,
+    # so the timed runs are made without it
+    if prepare is not None:
+        prepare()
+    best, result = None, None
+    for i in range( repeat ):
+        t_start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t_start
+        best = elapsed if best is None else min( best, elapsed )
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+############################################################################
+
+def open_scope( args ):
+    # the oscilloscope (or the simulation / replay); None if not found
+    if args.replay:
+        import rigol_session
+        return rigol_session.SessionReplay( args.replay, speed=args.speed )
+    if args.sim:
+        import rigol_sim
+        instr = rigol_sim.SimScope( bytes_per_sec=args.bytes_per_sec,
+                                    latency=args.latency,
+                                    mem_depth=max(parse_points(args.points)) )
+    else:
+        discovery = Discovery()
+        device = discovery.find( 'DS' )
+        if device is None:
+            return None
+        instr = discovery.open( device )
+    if args.record:
+        import rigol_session
+        instr = rigol_session.SessionRecorder( instr, args.record )
+    return instr
+
+class Pipeline(object):
+    # the stages; each returns the number of bytes of samples processed
+
+    def __init__( self, args ):
+        self.args = args
+        self.instr = None
+        self.data = None
+        self.params = None
+        self.block = None
+        self.directory = tempfile.mkdtemp( prefix='rigol_bench_' )
+        self.basename = os.path.join( self.directory, 'bench' )
+
+    def close( self ):
+        if self.instr is not None:
+            self.instr.close()
+        shutil.rmtree( self.directory, ignore_errors=True )
+
+    def discovery( self ):
+        if self.instr is None:
+            self.instr = open_scope( self.args )
+            if self.instr is None:
+                raise IOError( 'No Rigol oscilloscope instrument found !!!' )
+        idn = cmdRead( self.instr, '*IDN?', 0.0 )
+        if idn is None:
+            raise IOError( 'No answer to *IDN?' )
+        return 0
+
+    def setup( self ):
+        depth = max( parse_points(self.args.points) )
+        cmdWrite( self.instr, ':RUN', 0.0 )
+        cmdWrite( self.instr, ':ACQ:MDEP {:d}'.format(depth), 0.0 )
+        cmdWrite( self.instr, ':TIM:SCAL {:e}'.format(TIME_PER_DIV), 0.0 )
+        rigol_ds.setup_waveform( self.instr, 1, 'RAW' )
+        return 0
+
+    def trigger( self ):
+        cmdWrite( self.instr, ':SING', 0.0 )
+        if not rigol_ds.wait_trigger_stop( self.instr, timeout=10.0, poll=0.005 ):
+            raise IOError( 'No trigger' )
+        return 0
+
+    def transfer( self, points ):
+        # the next stages use the largest capture
+        data = rigol_ds.read_raw( self.instr, 1, points )
+        if self.data is None or len(data) >= len(self.data):
+            self.data = data
+        return len( data )
+
+    def prepare_block( self ):
+        # a data block as large as the data of the largest transfer
+        self.block = make_block( self.data.tobytes(), 9 ) + b'\n'
+
+    def parse_header( self ):
+        preamble = cmdRead( self.instr, ':WAV:PRE?', 0.0 )
+        self.params = rigol_capture.parse_preamble( preamble )
+        return len( parse_block(self.block) )
+
+    def to_volts( self ):
+        return len( rigol_capture.to_volts(self.data, self.params) )
+
+    def time_axis( self ):
+        return len( rigol_capture.time_axis(self.params, len(self.data)) )
+
+    def decimate( self ):
+        rigol_capture.decimate_minmax( self.data, PLOT_WIDTH )
+        return len( self.data )
+
+    def save_capture( self ):
+        rigol_capture.save_capture( self.basename, self.data, self.params )
+        return len( self.data )
+
+    def render_png( self ):
+        # the capture saved by save_capture
+        rigol_render.render_capture( self.basename )
+        return len( self.data )
+
+    def stages( self ):
+        # [(name, points, function, prepare)]
+        stages = [ ('discovery', 0, self.discovery, None),
+                   ('setup', 0, self.setup, None),
+                   ('trigger', 0, self.trigger, None) ]
+        for points in parse_points( self.args.points ):
+            name = 'transfer_{:g}M'.format( points / 1e6 )
+            stages.append( (name, points, lambda n=points: self.transfer(n), None) )
+        stages += [ ('parse_header', 0, self.parse_header, self.prepare_block),
+                    ('to_volts', 0, self.to_volts, None),
+                    ('time_axis', 0, self.time_axis, None),
+                    ('decimate', 0, self.decimate, None),
+                    ('save_capture', 0, self.save_capture, None),
+                    ('render_png', 0, self.render_png, None) ]
+        return stages
+
+############################################################################
+
+def run( args ):
+    pipeline = Pipeline( args )
+    results = {}
+    print ( '{:>16s} {:>10s} {:>10s} {:>10s} {:>10s}'.format(
+            'stage', 'points', 'time', 'MB/s', 'peak MB') )
+    try:
+        for name, points, func, prepare in pipeline.stages():
+            # the instrument is opened once (a recorded session continues)
+            repeat = 1 if name == 'discovery' else args.repeat
+            seconds, peak, nbytes = run_stage( func, repeat, prepare )
+            result = { 'points': points or nbytes, 'seconds': seconds,
+                       'mb_per_sec': nbytes / seconds / 1e6 if nbytes and seconds > 0 else None,
+                       'peak_mb': peak / 1e6 }
+            results[name] = result
+            print ( '{:>16s} {:>10d} {:>9.4f}s {:>10s} {:>10.1f}'.format(
+                    name, result['points'], seconds,
+                    '{:.1f}'.format(result['mb_per_sec']) if result['mb_per_sec'] else '-',
+                    result['peak_mb']) )
+    finally:
+        pipeline.close()
+    return results
+
+def compare( results, baseline, tolerance ):
+    # the stages slower than the baseline by more than 'tolerance'
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get( name )
+        if base is None or not base['seconds']:
+            continue
+        ratio = result['seconds'] / base['seconds']
+        status = 'REGRESSION' if ratio > 1.0 + tolerance else 'ok'
+        print ( '{:>16s} {:>9.4f}s {:>9.4f}s {:>7.2f}x {}'.format(
+                name, base['seconds'], result['seconds'], ratio, status) )
+        if status != 'ok':
+            regressions.append( name )
+    return regressions
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Capture pipeline benchmark' )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument( '--sim', action='store_true',
+                         help='use the simulated oscilloscope (rigol_sim.py)' )
+    source.add_argument( '--replay', metavar='SESSION',
+                         help='replay a recorded session (rigol_session.py)' )
+    parser.add_argument( '--record', metavar='SESSION',
+                         help='record the session of this run' )
+    parser.add_argument( '--points', default=DEFAULT_POINTS,
+                         help='transfer sizes (default: %(default)s)' )
+    parser.add_argument( '--repeat', type=int, default=3 )
+    parser.add_argument( '--bytes-per-sec', type=float, default=100e6,
+                         help='simulated USB throughput' )
+    parser.add_argument( '--latency', type=float, default=0.001,
+                         help='simulated latency per command / chunk' )
+    parser.add_argument( '--speed', type=float, default=1.0,
+                         help='replay speed (0: no delays)' )
+    parser.add_argument( '-o', '--output', default=None, help='save the result (JSON)' )
+    parser.add_argument( '--baseline', default=None, help='compare with a saved result' )
+    parser.add_argument( '--tolerance', type=float, default=0.25,
+                         help='max. slowdown of a stage (default: %(default)s)' )
+    parser.add_argument( '--trace', metavar='JSON', default=None,
+                         help='trace the commands (Chrome trace file)' )
+    args = parser.parse_args( argv )
+
+    if args.trace:
+        import rigol_trace
+        rigol_trace.start()
+    try:
+        results = run( args )
+    except IOError as ex:
+        print ( ex )
+        return -1
+    finally:
+        if args.trace:
+            tracer = rigol_trace.stop()
+    if args.trace:
+        tracer.save_chrome( args.trace )
+        print ( '' )
+        tracer.print_summary()
+    if args.output:
+        info = { 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                 'source': 'replay' if args.replay else ('sim' if args.sim else 'instrument'),
+                 'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'points': args.points,
+                 'repeat': args.repeat }
+        with open( args.output, 'w' ) as f:
+            json.dump( {'info': info, 'results': results}, f, indent=1, sort_keys=True )
+    if args.baseline:
+        with open( args.baseline ) as f:
+            baseline = json.load( f )['results']
+        print ( '' )
+        regressions = compare( results, baseline, args.tolerance )
+        if regressions:
+            print ( 'Regressions: {}'.format(', '.join(regressions)) )
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Helpers for waveform captures read from Rigol digital oscilloscopes.
+#    A saved capture consists of two files sharing the same base name:
+#      <name>.npy  : raw 8-bit samples as read by ':WAV:DATA?' (uint8)
+#      <name>.json : waveform parameters (':WAV:PRE?') and extra info
+#    The raw samples are kept as bytes so that a capture of 14,000,000
+#    points costs 14 MB on disk and can be memory-mapped when loaded.
+############################################################################
+
+import os, glob, json
+import numpy as np
+
+# format, type, points, count, xinc, xorg, xref, yinc, yor, yref
+PREAMBLE_FIELDS = ( 'format', 'type', 'points', 'count',
+                    'xinc', 'xorg', 'xref', 'yinc', 'yorg', 'yref' )
+
+############################################################################
+
+def parse_preamble( preamble ):
+    fields = preamble.strip().split(',')
+    if len(fields) != len(PREAMBLE_FIELDS):
+        raise ValueError( 'Reading waveform parameters error: %r' % preamble )
+    params = {}
+    for i, name in enumerate(PREAMBLE_FIELDS):
+        if i < 4:
+            params[name] = int( float(fields[i]) )
+        else:
+            params[name] = float( fields[i] )
+    return params
+
+def to_volts( data, params, dtype=np.float32 ):
+    # convert the raw bytes (uint8) to voltage values
+    data = np.asarray( data )
+    yinc = dtype( params['yinc'] )
+    yoff = dtype( params['yref'] + params['yorg'] )
+    return (data.astype(dtype) - yoff) * yinc
+
+def time_axis( params, num ):
+    # time of each sample (in seconds); 'num' is either the number of
+    # samples or an array of sample indices (e.g. from decimate_minmax)
+    if np.ndim( num ) == 0:
+        num = np.arange( num )
+    t_left = params['xref'] + params['xorg']
+    return t_left + num * params['xinc']
+
+def time_unit( t_max ):
+    # select a convenient unit for the time axis: (scale, unit)
+    t_max = abs(t_max)
+    if t_max < 1e-3:
+        return 1e6, 'usec'
+    elif t_max < 1.0:
+        return 1e3, 'msec'
+    else:
+        return 1.0, 'sec'
+
+def decimate_minmax( data, width ):
+    # reduce the data to a min/max envelope of (about) 2*width points,
+    # which looks the same as the full record when plotted.
+    # returns (indices, values)
+    data = np.asarray( data )
+    n = len(data)
+    if n <= 2*width:
+        return np.arange(n), data
+    step = n // width
+    m = step * (width - 1)
+    blocks = data[:m].reshape( width - 1, step )
+    idx = np.empty( 2*width, dtype=np.int64 )
+    idx[0:-2:2] = np.argmin( blocks, axis=1 )
+    idx[1:-2:2] = np.argmax( blocks, axis=1 )
+    idx[0:-2:2] += np.arange(width - 1) * step
+    idx[1:-2:2] += np.arange(width - 1) * step
+    # the last block also holds the remaining n - step*width samples
+    idx[-2] = m + np.argmin( data[m:] )
+    idx[-1] = m + np.argmax( data[m:] )
+    idx.reshape( width, 2 ).sort( axis=1 )  # keep the samples in time order
+    return idx, data[idx]
+
+############################################################################
+
+def save_capture( basename, data, params, **info ):
+    basename = os.path.splitext( basename )[0]
+    data = np.asarray( data, dtype=np.uint8 )
+    np.save( basename + '.npy', data )
+    meta = dict( (name, params[name]) for name in PREAMBLE_FIELDS )
+    meta['points'] = len(data)
+    meta.update( info )
+    with open( basename + '.json', 'w' ) as f:
+        json.dump( meta, f, indent=1, sort_keys=True )
+    return basename
+
+def load_capture( basename, mmap=True ):
+    # returns (data, params); data is a read-only memory map by default
+    basename = os.path.splitext( basename )[0]
+    with open( basename + '.json' ) as f:
+        params = json.load( f )
+    data = np.load( basename + '.npy', mmap_mode=('r' if mmap else None) )
+    return data, params
+
+def list_captures( directory ):
+    names = []
+    for meta_file in sorted( glob.glob( os.path.join(directory, '*.json') ) ):
+        basename = os.path.splitext( meta_file )[0]
+        if os.path.exists( basename + '.npy' ):
+            names.append( basename )
+    return names
+
+############################################################################
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Functions for the Rigol DG1022 function generator built on the
+#    command layer in rigol_instr.py.
+#     - upload_user_waveform: upload DAC codes (rigol_wave.py) to the
+#       volatile memory and select it as the output waveform (FUNC USER)
+#    The DAC codes are sent as a binary definite-length block
+#    ('DATA:DAC VOLATILE,#<n><len><2 bytes per point, little-endian>'),
+#    which is about 2.5x smaller than the comma separated ASCII list and
+#    much faster to parse for the instrument. If the instrument does not
+#    accept the block (error queue), the ASCII form is used instead.
+#    Instead of fixed sleeps, '*OPC?' waits until the instrument has
+#    finished deleting, storing and applying the data.
+#     - WaveformCache: content-addressed cache of the waveforms in the
+#       volatile memory and in the non-volatile user memory. A stored
+#       waveform is named by the hash of its DAC codes ('W' + 7 hex
+#       digits), so it is found again in later runs ('DATA:CAT?'), and
+#       an unchanged waveform is selected with 'FUNC:USER <name>' instead
+#       of being deleted and uploaded again.
+#     - replay_capture: a saved oscilloscope capture (rigol_capture.py)
+#       as the output waveform, resampled to the memory depth
+#     - start_sweep: a linear or logarithmic frequency sweep run by the
+#       instrument ('SWE' subsystem, started with '*TRG'), or stepped by
+#       the host if the instrument does not accept the sweep commands.
+#       frequency_at(t) / time_at(freq) map the time since the start of
+#       the sweep to the output frequency (and back), so the captures of
+#       the oscilloscope can be lined up with the frequency.
+#     - DualChannel: the settings of both channels (function, frequency,
+#       amplitude, offset, phase, output) are validated as a whole and
+#       sent in one batch (no sleeps) which ends with one 'PHAS:ALIGN'.
+#       Only the settings that have changed since the last batch are
+#       sent; align() re-aligns the phases without sending anything else.
+############################################################################
+# Usage (upload benchmark with the simulated DG1022):
+#   $ python3 ./rigol_dg1022.py [--points 4096]
+#
+############################################################################
+
+import sys, time, re
+import hashlib
+import argparse
+import threading
+import numpy as np
+
+import rigol_wave
+import rigol_capture
+from rigol_instr import cmdWrite, cmdWriteRaw, cmdRead, make_block
+from rigol_instr import wait_complete, read_error
+
+############################################################################
+
+def max_points( dg ):
+    # max. volatile memory depth (number of points)
+    return int( float(cmdRead(dg, 'DATA:ATTR:POIN? VOLATILE')) )
+
+def dac_ascii( codes ):
+    return ('DATA:DAC VOLATILE,%s\n' % rigol_wave.dac_string(codes)).encode()
+
+def dac_binary( codes ):
+    codes = np.clip( np.asarray(codes), 0, rigol_wave.DAC_MAX )
+    data = codes.astype( '<u2' ).tobytes()
+    return b'DATA:DAC VOLATILE,' + make_block( data ) + b'\n'
+
+def write_dac( dg, codes, binary=True, timeout=10.0 ):
+    # store the DAC codes in the volatile memory; returns 'binary' or
+    # 'ascii' (the form the instrument has accepted)
+    if binary:
+        cmdWriteRaw( dg, dac_binary(codes), 0.0 )
+        wait_complete( dg, timeout )
+        error = read_error( dg )
+        if error is None:
+            return 'binary'
+        print ( 'Binary upload failed ({}), using ASCII'.format(error) )
+        cmdWrite( dg, '*CLS', 0.0 )
+    cmdWriteRaw( dg, dac_ascii(codes), 0.0 )
+    if not wait_complete( dg, timeout ):
+        raise IOError( 'DG1022: waveform upload timeout' )
+    return 'ascii'
+
+def set_output( dg, freq=None, vpp=None, offset=None ):
+    if freq is not None:
+        cmdWrite( dg, 'FREQ {:.6e}'.format(freq), 0.0 )
+    if vpp is not None:
+        cmdWrite( dg, 'VOLT:UNIT VPP', 0.0 )
+        cmdWrite( dg, 'VOLT {:.3f}'.format(vpp), 0.0 )
+    if offset is not None:
+        cmdWrite( dg, 'VOLT:OFFS {:.3f}'.format(offset), 0.0 )
+
+def upload_user_waveform( dg, codes, freq=None, vpp=None, offset=None,
+                          binary=True, timeout=10.0 ):
+    cmdWrite( dg, 'OUTP OFF', 0.0 )
+    cmdWrite( dg, 'FUNC USER', 0.0 )
+    set_output( dg, freq, vpp, offset )
+    cmdWrite( dg, 'DATA:DELelete VOLATILE', 0.0 )
+    wait_complete( dg, timeout )
+    form = write_dac( dg, codes, binary, timeout )
+    cmdWrite( dg, 'FUNC:USER VOLATILE', 0.0 )
+    wait_complete( dg, timeout )
+    cmdWrite( dg, 'OUTP ON', 0.0 )
+    return form
+
+############################################################################
+
+def waveform_name( codes ):
+    # name of a waveform in the user memory: 'W' + 7 hex digits of the hash
+    codes = np.clip( np.asarray(codes), 0, rigol_wave.DAC_MAX ).astype( '<u2' )
+    return 'W' + hashlib.sha1( codes.tobytes() ).hexdigest()[:7].upper()
+
+class WaveformCache(object):
+    # Keeps track of the waveforms in the DG1022 memory by their hash:
+    #   cache = WaveformCache( dg )
+    #   cache.select( rigol_wave.sine(1024), freq=1000, vpp=5.0 )
+    # 'slots' is the number of non-volatile user waveforms the cache may
+    # use (it only deletes its own 'W.......' waveforms).
+
+    NAME = re.compile( r'^W[0-9A-F]{7}$' )
+
+    def __init__( self, dg, slots=4, binary=True, timeout=10.0 ):
+        self.dg = dg
+        self.slots = slots
+        self.binary = binary
+        self.timeout = timeout
+        self.volatile = None   # the name (hash) of the volatile waveform
+        self.current = None    # the selected output waveform
+        self.stored = None     # names in the user memory (least recent first)
+
+    def _catalog( self ):
+        resp = cmdRead( self.dg, 'DATA:CAT?', 0.0 ) or ''
+        names = [ name.strip().strip('"').upper() for name in resp.split(',') ]
+        self.stored = [ name for name in names if self.NAME.match(name) ]
+
+    def _use( self, name ):
+        self.stored.remove( name )
+        self.stored.append( name )
+
+    def _store( self, name ):
+        # copy the volatile waveform to the user memory (if there is room)
+        while self.stored and len(self.stored) >= self.slots:
+            cmdWrite( self.dg, 'DATA:DEL %s' % self.stored.pop(0), 0.0 )
+            wait_complete( self.dg, self.timeout )
+        if len(self.stored) >= self.slots:
+            return False
+        cmdWrite( self.dg, 'DATA:COPY %s,VOLATILE' % name, 0.0 )
+        wait_complete( self.dg, self.timeout )
+        if read_error( self.dg ) is not None:
+            return False
+        self.stored.append( name )
+        return True
+
+    def _func_user( self, name ):
+        if self.current != name:
+            if self.current is None:
+                cmdWrite( self.dg, 'FUNC USER', 0.0 )
+            cmdWrite( self.dg, 'FUNC:USER %s' % name, 0.0 )
+            wait_complete( self.dg, self.timeout )
+            self.current = name
+
+    def select( self, codes, freq=None, vpp=None, offset=None ):
+        # make 'codes' the output waveform; returns 'selected' (already
+        # in the memory), 'stored' or 'uploaded' (volatile memory only)
+        name = waveform_name( codes )
+        if self.stored is None:
+            self._catalog()
+        set_output( self.dg, freq, vpp, offset )
+        if name in self.stored:
+            self._use( name )
+            self._func_user( name )
+            return 'selected'
+        if name == self.volatile:
+            self._func_user( 'VOLATILE' )
+            return 'selected'
+        self.volatile = None
+        cmdWrite( self.dg, 'DATA:DELelete VOLATILE', 0.0 )
+        wait_complete( self.dg, self.timeout )
+        write_dac( self.dg, codes, self.binary, self.timeout )
+        self.volatile = name
+        self.current = None
+        if self.slots > 0 and self._store( name ):
+            self._func_user( name )
+            return 'stored'
+        self._func_user( 'VOLATILE' )
+        return 'uploaded'
+
+def replay_capture( dg, basename, freq=None, vpp=None, offset=None, cache=None ):
+    # the whole record is one period of the output waveform;
+    # returns the result of WaveformCache.select()
+    data, params = rigol_capture.load_capture( basename )
+    codes = rigol_wave.fit_dac( data, max_points(dg) )
+    if cache is None:
+        cache = WaveformCache( dg )
+    return cache.select( codes, freq, vpp, offset )
+
+############################################################################
+
+def sweep_frequency( t, f_start, f_stop, sweep_time, spacing='LIN' ):
+    # the frequency at the time t (0..sweep_time) of a sweep
+    x = np.clip( np.asarray(t, dtype=np.float64) / sweep_time, 0.0, 1.0 )
+    if spacing.upper().startswith('LOG'):
+        return f_start * (float(f_stop) / f_start) ** x
+    return f_start + (f_stop - f_start) * x
+
+def sweep_time_at( freq, f_start, f_stop, sweep_time, spacing='LIN' ):
+    # the time when the sweep passes the frequency 'freq'
+    freq = np.asarray( freq, dtype=np.float64 )
+    if spacing.upper().startswith('LOG'):
+        x = np.log( freq / f_start ) / np.log( float(f_stop) / f_start )
+    else:
+        x = (freq - f_start) / float( f_stop - f_start )
+    return np.clip( x, 0.0, 1.0 ) * sweep_time
+
+TRIGGER_SOURCES = ( 'IMM', 'EXT', 'BUS' )
+
+class HardwareSweep(object):
+    # one sweep run by the DG1022 (CH1), started by '*TRG' (TRIG:SOUR BUS);
+    # the Sync output on the rear panel marks the start of the sweep
+
+    def __init__( self, dg, f_start, f_stop, sweep_time, spacing='LIN',
+                  timeout=10.0 ):
+        self.dg = dg
+        self.f_start = f_start
+        self.f_stop = f_stop
+        self.sweep_time = sweep_time
+        self.spacing = 'LOG' if spacing.upper().startswith('LOG') else 'LIN'
+        self.timeout = timeout
+        self.t_start = None
+
+    def configure( self ):
+        # returns False if the instrument does not accept the settings
+        # (then the sweep is off and the trigger source is restored)
+        source = cmdRead( self.dg, 'TRIG:SOUR?', 0.0 )
+        source = source.strip().upper()[:3] if source else ''
+        if source not in TRIGGER_SOURCES:
+            source = 'IMM'
+        cmdWrite( self.dg, 'FREQ:STAR {:.6e}'.format(self.f_start), 0.0 )
+        cmdWrite( self.dg, 'FREQ:STOP {:.6e}'.format(self.f_stop), 0.0 )
+        cmdWrite( self.dg, 'SWE:SPAC %s' % self.spacing, 0.0 )
+        cmdWrite( self.dg, 'SWE:TIME {:.6e}'.format(self.sweep_time), 0.0 )
+        cmdWrite( self.dg, 'TRIG:SOUR BUS', 0.0 )
+        cmdWrite( self.dg, 'SWE:STAT ON', 0.0 )
+        wait_complete( self.dg, self.timeout )
+        error = read_error( self.dg )
+        if error is not None:
+            print ( 'Hardware sweep not available ({})'.format(error) )
+            # a half-accepted sweep must not stay on (software sweep)
+            self.stop()
+            cmdWrite( self.dg, 'TRIG:SOUR %s' % source, 0.0 )
+            cmdWrite( self.dg, '*CLS', 0.0 )
+            return False
+        return True
+
+    def start( self ):
+        cmdWrite( self.dg, '*TRG', 0.0 )
+        self.t_start = time.time()
+
+    def join( self ):
+        time.sleep( max(0.0, self.t_start + self.sweep_time - time.time()) )
+
+    def stop( self ):
+        cmdWrite( self.dg, 'SWE:STAT OFF', 0.0 )
+
+    def frequency_at( self, t ):
+        return sweep_frequency( t, self.f_start, self.f_stop,
+                                self.sweep_time, self.spacing )
+
+    def time_at( self, freq ):
+        return sweep_time_at( freq, self.f_start, self.f_stop,
+                              self.sweep_time, self.spacing )
+
+class SoftwareSweep(threading.Thread):
+    # the same sweep stepped by the host: 'points' frequencies (f_start to
+    # f_stop), each one written ('FREQ') at its scheduled time, without
+    # read-backs; the time of each step is recorded for frequency_at() /
+    # time_at(), which return nan before the first step
+
+    def __init__( self, dg, f_start, f_stop, sweep_time, spacing='LIN',
+                  points=50 ):
+        threading.Thread.__init__( self )
+        self.daemon = True
+        self.dg = dg
+        self.f_start = f_start
+        self.f_stop = f_stop
+        self.sweep_time = sweep_time
+        self.spacing = 'LOG' if spacing.upper().startswith('LOG') else 'LIN'
+        self.times = np.linspace( 0.0, sweep_time, points )
+        self.freqs = sweep_frequency( self.times, f_start, f_stop,
+                                      sweep_time, self.spacing )
+        self.freqs[-1] = f_stop   # exactly (LOG: rounding)
+        self.steps = []   # (time since the start, frequency)
+        self.t_start = None
+        self.running = False
+
+    def run( self ):
+        self.t_start = time.time()
+        self.running = True
+        for t, freq in zip( self.times, self.freqs ):
+            if not self.running:
+                break
+            time.sleep( max(0.0, self.t_start + t - time.time()) )
+            cmdWrite( self.dg, 'FREQ {:.6e}'.format(freq), 0.0 )
+            self.steps.append( (time.time() - self.t_start, float(freq)) )
+
+    def stop( self ):
+        self.running = False
+
+    def frequency_at( self, t ):
+        if not self.steps:
+            return np.full( np.shape(t), np.nan )[()]
+        times, freqs = np.array( self.steps ).reshape(-1, 2).T
+        index = np.searchsorted( times, np.asarray(t), side='right' ) - 1
+        return np.where( index >= 0, freqs[np.maximum(index, 0)], np.nan )
+
+    def time_at( self, freq ):
+        # the time of the first step at (or beyond) the frequency
+        if not self.steps:
+            return np.full( np.shape(freq), np.nan )[()]
+        times, freqs = np.array( self.steps ).reshape(-1, 2).T
+        sign = 1.0 if self.f_stop >= self.f_start else -1.0
+        index = np.searchsorted( sign * freqs, sign * np.asarray(freq) )
+        return np.where( index < len(times),
+                         times[np.minimum(index, len(times) - 1)], np.nan )
+
+def start_sweep( dg, f_start, f_stop, sweep_time, spacing='LIN',
+                 hardware=True, points=50 ):
+    # starts a sweep (HardwareSweep or SoftwareSweep); call join() to
+    # wait for the end of the sweep, then stop()
+    if hardware:
+        sweep = HardwareSweep( dg, f_start, f_stop, sweep_time, spacing )
+        if sweep.configure():
+            sweep.start()
+            return sweep
+    sweep = SoftwareSweep( dg, f_start, f_stop, sweep_time, spacing, points )
+    sweep.start()
+    return sweep
+
+############################################################################
+
+FUNCTIONS = ( 'SIN', 'SQU', 'RAMP', 'PULS', 'NOIS', 'DC', 'USER' )
+MAX_FREQ = { 'SIN': 20.0e6, 'SQU': 5.0e6, 'RAMP': 150.0e3, 'PULS': 3.0e6,
+             'NOIS': 5.0e6, 'DC': 0.0, 'USER': 5.0e6 }
+MAX_VOLTAGE = 10.0   # |offset| + vpp/2 (high impedance load)
+
+class DualChannel(object):
+    # e.g. two sine waves in quadrature:
+    #   dual = DualChannel( dg )
+    #   dual.configure( {'freq': 50.0, 'vpp': 5.0, 'phase': 0.0},
+    #                   {'freq': 50.0, 'vpp': 5.0, 'phase': 90.0} )
+
+    DEFAULTS = { 'func': 'SIN', 'freq': 1000.0, 'vpp': 1.0, 'offset': 0.0,
+                 'phase': 0.0, 'output': True }
+
+    def __init__( self, dg, timeout=10.0 ):
+        self.dg = dg
+        self.timeout = timeout
+        self.state = [ dict(self.DEFAULTS), dict(self.DEFAULTS) ]
+        self.sent = [ {}, {} ]   # the settings known to be in the instrument
+
+    def validate( self, state ):
+        errors = []
+        for ch, settings in enumerate( state, 1 ):
+            unknown = set( settings ) - set( self.DEFAULTS )
+            if unknown:
+                errors.append( 'CH{}: unknown settings {}'.format(ch, sorted(unknown)) )
+                continue
+            func = settings['func'].upper()
+            if func not in FUNCTIONS:
+                errors.append( 'CH{}: function {}'.format(ch, func) )
+                continue
+            if func != 'DC' and not 0.0 < settings['freq'] <= MAX_FREQ[func]:
+                errors.append( 'CH{}: frequency {:g} Hz'.format(ch, settings['freq']) )
+            if not 0.0 < settings['vpp'] or \
+               abs(settings['offset']) + settings['vpp']/2 > MAX_VOLTAGE:
+                errors.append( 'CH{}: amplitude {:g} Vpp, offset {:g} V'.format(
+                               ch, settings['vpp'], settings['offset']) )
+            if not -180.0 <= settings['phase'] <= 180.0:
+                errors.append( 'CH{}: phase {:g} deg.'.format(ch, settings['phase']) )
+        if errors:
+            raise ValueError( 'Invalid generator settings: ' + '; '.join(errors) )
+
+    def _commands( self, ch, settings, sent ):
+        # the commands for the settings of one channel that have changed
+        suffix = '' if ch == 1 else ':CH2'
+        commands = []
+        if not sent:
+            commands.append( 'VOLT:UNIT%s VPP' % suffix )
+        if any( sent.get(key) != settings[key] for key in ('func', 'freq', 'vpp', 'offset') ):
+            commands.append( 'APPL:{}{} {:.6e},{:.4e},{:.4e}'.format(
+                settings['func'].upper(), suffix, settings['freq'],
+                settings['vpp'], settings['offset']) )
+        if sent.get('phase') != settings['phase']:
+            commands.append( 'PHAS{} {:.2f}'.format(suffix, settings['phase']) )
+        if sent.get('output') != settings['output']:
+            commands.append( 'OUTP{} {}'.format(suffix, 'ON' if settings['output'] else 'OFF') )
+        return commands
+
+    def configure( self, ch1=None, ch2=None, align=True ):
+        # ch1, ch2: dicts with the settings to change; returns the number
+        # of commands sent
+        state = [ dict(self.state[0]), dict(self.state[1]) ]
+        state[0].update( ch1 or {} )
+        state[1].update( ch2 or {} )
+        self.validate( state )
+        batch = []
+        for ch in (1, 2):
+            batch += self._commands( ch, state[ch-1], self.sent[ch-1] )
+        phase_changed = any( cmd.startswith(('APPL', 'PHAS')) for cmd in batch )
+        if align and phase_changed:
+            batch.append( 'PHAS:ALIGN' )
+        self.state = state
+        if batch:
+            self._send( batch )
+            self.sent = [ dict(state[0]), dict(state[1]) ]
+        return len( batch )
+
+    def align( self ):
+        self._send( ['PHAS:ALIGN'] )
+
+    def _send( self, batch ):
+        for cmd in batch:
+            cmdWrite( self.dg, cmd, 0.0 )
+        ok = wait_complete( self.dg, self.timeout )
+        error = read_error( self.dg )
+        if not ok or error is not None:
+            self.sent = [ {}, {} ]   # unknown: send everything next time
+            raise IOError( 'DG1022: {}'.format(error or 'timeout') )
+
+############################################################################
+
+def _upload_fixed_sleeps( dg, codes ):
+    # the upload as in test_dg1022_arb.py (ASCII, fixed sleeps)
+    cmdWrite( dg, 'OUTP OFF' )
+    cmdWrite( dg, 'FUNC USER' )
+    cmdWrite( dg, 'DATA:DELelete VOLATILE', 1.0 )
+    cmdWrite( dg, 'DATA:DAC VOLATILE,%s' % rigol_wave.dac_string(codes), 1.5 )
+    cmdWrite( dg, 'FUNC:USER VOLATILE', 1.0 )
+    cmdWrite( dg, 'OUTP ON' )
+
+def benchmark( points=4096 ):
+    from rigol_sim import SimGenerator
+    codes = rigol_wave.sine( points )
+    print ( '{:>26s} {:>10s} {:>10s}'.format('', 'payload', 'time') )
+    tests = [ ('ASCII, fixed sleeps', True, lambda dg: _upload_fixed_sleeps(dg, codes)),
+              ('ASCII, *OPC?', True, lambda dg: upload_user_waveform(dg, codes, binary=False)),
+              ('binary block, *OPC?', True, lambda dg: upload_user_waveform(dg, codes)),
+              ('binary -> ASCII fallback', False, lambda dg: upload_user_waveform(dg, codes)) ]
+    for name, binary, upload in tests:
+        dg = SimGenerator( binary=binary )
+        t_start = time.time()
+        upload( dg )
+        elapsed = time.time() - t_start
+        if not np.array_equal( dg.output, codes ):
+            print ( '{}: wrong output waveform !!!'.format(name) )
+        print ( '{:>26s} {:>8d} B {:>8.3f} s'.format(name, dg.bytes_written, elapsed) )
+
+    # a test sequence cycling through three waveforms
+    dg = SimGenerator()
+    cache = WaveformCache( dg )
+    waves = [ rigol_wave.sine(points), rigol_wave.square(points),
+              rigol_wave.sawtooth(points) ]
+    for rep in range( 3 ):
+        for wave in waves:
+            t_start = time.time()
+            result = cache.select( wave )
+            elapsed = time.time() - t_start
+            if not np.array_equal( dg.output, wave ):
+                print ( 'WaveformCache: wrong output waveform !!!' )
+            print ( '{:>26s} {:>8s}   {:>8.3f} s'.format('cache: ' + result, '', elapsed) )
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='DG1022 waveform upload benchmark' )
+    parser.add_argument( '--points', type=int, default=rigol_wave.MAX_POINTS )
+    args = parser.parse_args( argv )
+    benchmark( args.points )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
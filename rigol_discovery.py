@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Discovery of the Rigol instruments with a cache, so that scripts
+#    started one after the other do not enumerate the bus again
+#    (list_resources() is slow on USB, and with NI-VISA).
+#    The resource names are parsed into descriptors:
+#      interface ('USB', 'TCPIP', ...), board, vendor_id, product_id
+#      (int, from hex '0x1AB1' or decimal '6833'), serial, family
+#      (e.g. 'DS2000A', 'DS1000Z', 'DS1000E', 'DG1000'), model, '*IDN?'
+#    The enumeration of each interface and the '*IDN?' answers are saved
+#    in a JSON cache file (one entry per VISA library). An interface is
+#    enumerated again when its entry is older than the TTL, or with
+#    refresh(['USB']); '*IDN?' is only queried for new resources. Only
+#    Rigol instruments (USB vendor ID 0x1AB1, or unknown, e.g. TCPIP) are
+#    kept, the instruments of other vendors are never opened. If an
+#    instrument cannot be opened (e.g. unplugged), its interface is
+#    enumerated again.
+#    The cache file: $RIGOL_DISCOVERY_CACHE or ~/.cache/rigol_discovery.json
+############################################################################
+# Usage:
+#   discovery = rigol_discovery.Discovery()            # ResourceManager('')
+#   ds = discovery.open( discovery.find('DS') )
+#
+#   $ python3 ./rigol_discovery.py [--refresh] [--ttl 30] [--library @py]
+#
+############################################################################
+
+import os, re, sys, time, json
+import argparse
+import logging
+import collections
+
+from rigol_instr import cmdRead, open_instrument
+
+DEFAULT_TTL = 30.0   # s
+INTERFACES = {
+    'USB'  : 'USB?*::INSTR',
+    'TCPIP': 'TCPIP?*::INSTR',
+}
+RIGOL_VENDOR_ID = 0x1AB1
+
+# family from the model ('*IDN?'), the serial number and the USB product ID
+MODEL_FAMILIES = ( (r'DS2\d{3}A', 'DS2000A'), (r'DS1\d{3}Z', 'DS1000Z'),
+                   (r'DS1\d{3}[DE]', 'DS1000E'), (r'DG1\d{3}', 'DG1000') )
+SERIAL_FAMILIES = ( ('DS2A', 'DS2000A'), ('DS1Z', 'DS1000Z'), ('DS1E', 'DS1000E'),
+                    ('DG1D', 'DG1000') )
+PRODUCT_FAMILIES = { 0x04B0: 'DS2000A', 0x04CE: 'DS1000Z' }
+
+log = logging.getLogger( 'rigol_discovery' )
+
+Descriptor = collections.namedtuple( 'Descriptor', 'resource interface board '
+                                     'vendor_id product_id serial family model idn' )
+
+############################################################################
+
+def _int_id( text ):
+    # '0x1AB1' or '6833' -> 6833
+    text = text.strip()
+    if text.lower().startswith('0x'):
+        return int( text, 16 )
+    return int( text )
+
+def family_of( model=None, serial=None, product_id=None ):
+    for pattern, family in MODEL_FAMILIES:
+        if model and re.match( pattern, model.upper() ):
+            return family
+    for prefix, family in SERIAL_FAMILIES:
+        if serial and serial.upper().startswith( prefix ):
+            return family
+    return PRODUCT_FAMILIES.get( product_id )
+
+def parse_resource( name, idn=None ):
+    # 'USB0::0x1AB1::0x04B0::DS2A000000001::INSTR' -> Descriptor
+    fields = name.split('::')
+    match = re.match( r'([A-Za-z]+)(\d*)', fields[0] )
+    interface = match.group(1).upper() if match else fields[0].upper()
+    board = int( match.group(2) ) if match and match.group(2) else 0
+    vendor_id = product_id = serial = None
+    if interface == 'USB' and len(fields) >= 5:
+        try:
+            vendor_id, product_id = _int_id( fields[1] ), _int_id( fields[2] )
+        except ValueError:
+            pass
+        serial = fields[3]
+    model = None
+    if idn:
+        parts = [ part.strip() for part in idn.split(',') ]
+        if len(parts) >= 3:
+            model = parts[1]
+            serial = serial or parts[2]
+    return Descriptor( name, interface, board, vendor_id, product_id, serial,
+                       family_of(model, serial, product_id), model, idn )
+
+def is_rigol( device ):
+    # a Rigol instrument, or the vendor is not known from the name
+    return device.vendor_id is None or device.vendor_id == RIGOL_VENDOR_ID
+
+def default_cache_file():
+    return os.environ.get( 'RIGOL_DISCOVERY_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache',
+                                        'rigol_discovery.json') )
+
+############################################################################
+
+class Discovery(object):
+
+    def __init__( self, library='', cache_file=None, ttl=DEFAULT_TTL,
+                  interfaces=('USB',), identify=True, resources=None ):
+        # library: as for visa.ResourceManager ('' : $PYVISA_LIBRARY)
+        self.library = library or os.environ.get( 'PYVISA_LIBRARY', '' )
+        self.cache_file = cache_file or default_cache_file()
+        self.ttl = ttl
+        self.interfaces = tuple( interfaces )
+        self.identify = identify
+        self._resources = resources
+        self.enumerations = 0   # number of list_resources() calls
+        self.cache = self._load()
+
+    @property
+    def resources( self ):
+        # the ResourceManager, created when needed
+        if self._resources is None:
+            import visa
+            self._resources = visa.ResourceManager( self.library )
+        return self._resources
+
+    def _load( self ):
+        try:
+            with open( self.cache_file ) as f:
+                cache = json.load( f ).get( self.library, {} )
+        except (IOError, ValueError):
+            cache = {}
+        cache.setdefault( 'interfaces', {} )   # name -> {time, resources}
+        cache.setdefault( 'idn', {} )          # resource -> '*IDN?'
+        return cache
+
+    def _save( self ):
+        # the entries of the other libraries are kept
+        try:
+            with open( self.cache_file ) as f:
+                data = json.load( f )
+        except (IOError, ValueError):
+            data = {}
+        data[self.library] = self.cache
+        directory = os.path.dirname( self.cache_file )
+        if directory and not os.path.isdir( directory ):
+            os.makedirs( directory )
+        tmp_name = self.cache_file + '.%d.tmp' % os.getpid()
+        with open( tmp_name, 'w' ) as f:
+            json.dump( data, f, indent=1, sort_keys=True )
+        os.replace( tmp_name, self.cache_file )
+
+    ########################################################################
+
+    def _enumerate( self, interface ):
+        self.enumerations += 1
+        try:
+            return list( self.resources.list_resources(INTERFACES[interface]) )
+        except Exception:
+            return []   # e.g. VI_ERROR_RSRC_NFOUND: no instrument
+
+    def _identify( self, name ):
+        try:
+            instr = open_instrument( self.resources, name, probe=False )
+        except Exception as ex:
+            log.warning( 'Cannot open %s: %s', name, ex )
+            return None
+        try:
+            return cmdRead( instr, '*IDN?', 0.0 )
+        finally:
+            instr.close()
+
+    def refresh( self, interfaces=None ):
+        # enumerate the interfaces again (default: all)
+        for interface in interfaces or self.interfaces:
+            names = [ name for name in self._enumerate(interface)
+                      if is_rigol(parse_resource(name)) ]
+            self.cache['interfaces'][interface] = {'time': time.time(),
+                                                   'resources': names}
+            if self.identify:
+                for name in names:
+                    if self.cache['idn'].get( name ) is None:
+                        self.cache['idn'][name] = self._identify( name )
+        present = set( name for entry in self.cache['interfaces'].values()
+                       for name in entry['resources'] )
+        for name in list( self.cache['idn'] ):
+            if name not in present:
+                del self.cache['idn'][name]
+        self._save()
+
+    def stale( self ):
+        # the interfaces without a valid cache entry
+        now = time.time()
+        return [ interface for interface in self.interfaces
+                 if interface not in self.cache['interfaces'] or
+                    not 0 <= now - self.cache['interfaces'][interface]['time'] < self.ttl ]
+
+    def devices( self ):
+        # the descriptors of all instruments (stale interfaces enumerated)
+        stale = self.stale()
+        if stale:
+            self.refresh( stale )
+        return [ parse_resource(name, self.cache['idn'].get(name))
+                 for interface in self.interfaces
+                 for name in self.cache['interfaces'][interface]['resources'] ]
+
+    def find( self, prefix='DS', family=None ):
+        # the first instrument whose model (or serial) starts with prefix,
+        # or of the given family; None if not found
+        for device in self.devices():
+            if family is not None:
+                if device.family == family:
+                    return device
+            elif (device.model or device.serial or '').upper().startswith( prefix ):
+                return device
+        return None
+
+    def open( self, device, **kwargs ):
+        # open an instrument (Descriptor or resource name); if it fails,
+        # its interface is enumerated again and the instrument with the
+        # same serial number (other resource name) is opened, if any
+        if not isinstance( device, Descriptor ):
+            device = parse_resource( device )
+        try:
+            return open_instrument( self.resources, device.resource, **kwargs )
+        except Exception:
+            self.refresh( [device.interface] )
+            for other in self.devices():
+                if other.resource != device.resource and device.serial and \
+                   other.serial == device.serial:
+                    return open_instrument( self.resources, other.resource, **kwargs )
+            raise
+
+############################################################################
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Rigol instrument discovery' )
+    parser.add_argument( '--library', default='', help="VISA library, e.g. '@py'" )
+    parser.add_argument( '--ttl', type=float, default=DEFAULT_TTL )
+    parser.add_argument( '--refresh', action='store_true',
+                         help='enumerate the interfaces again' )
+    parser.add_argument( '--tcpip', action='store_true', help='also TCPIP' )
+    args = parser.parse_args( argv )
+
+    interfaces = ('USB', 'TCPIP') if args.tcpip else ('USB',)
+    discovery = Discovery( args.library, ttl=args.ttl, interfaces=interfaces )
+    t_start = time.time()
+    if args.refresh:
+        discovery.refresh()
+    devices = discovery.devices()
+    print ( 'Found #devices: {:d} ({:.3f} s, {:d} enumerations)'.format(
+            len(devices), time.time() - t_start, discovery.enumerations) )
+    for device in devices:
+        vid = '0x{:04X}'.format( device.vendor_id ) if device.vendor_id is not None else '-'
+        pid = '0x{:04X}'.format( device.product_id ) if device.product_id is not None else '-'
+        print ( '>> {} {} {} {} {} {}'.format(device.resource, vid, pid, device.serial,
+                                              device.family, device.model) )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Waveform reading functions for Rigol digital oscilloscopes
+#    (DS2000A Series, also DS1000Z) built on the command layer in
+#    rigol_instr.py.
+#     - NORM mode: the screen data (e.g. 1,400 points) in one transfer
+#     - RAW  mode: the memory data, read in chunks of 'chunk_points'
+#    and measurement queries: several ':MEAS:xxx?' queries are sent as
+#    one compound query (separated by ';'), i.e. one USB transaction.
+#    auto_range() selects the vertical scale (1-2-5 steps) of a channel
+#    from the range of the samples of a quick NORM mode read.
+############################################################################
+
+import time, math
+import numpy as np
+
+import rigol_capture
+import rigol_metrics
+from rigol_instr import cmdWrite, cmdRead, cmdReadRaw, parse_block, parse_value
+
+NORM_POINTS = 1400    # DS2000A: the screen data (NORM mode)
+BLOCK_OVERHEAD = 12   # '#9' + 9 digits + '\n'
+
+############################################################################
+
+def read_preamble( instr ):
+    return rigol_capture.parse_preamble( cmdRead(instr, ':WAV:PRE?', 0.05) )
+
+def setup_waveform( instr, channel=1, mode='NORM', points=None ):
+    cmdWrite( instr, ':WAV:SOUR CHAN{:d}'.format(channel), 0.02 )
+    cmdWrite( instr, ':WAV:MODE {}'.format(mode), 0.02 )
+    cmdWrite( instr, ':WAV:FORM BYTE', 0.02 )
+    if points is not None:
+        cmdWrite( instr, ':WAV:POIN {:d}'.format(points), 0.02 )
+
+def read_norm( instr, points=NORM_POINTS ):
+    # one ':WAV:DATA?' round-trip, returns the samples (uint8);
+    # 'points': the expected number (timeout of the link model)
+    rawdata = cmdReadRaw( instr, ':WAV:DATA?', 0.0, nbytes=points + BLOCK_OVERHEAD )
+    data = np.frombuffer( parse_block(rawdata), dtype=np.uint8 )
+    rigol_metrics.count( 'rigol_captures_total', 'Waveform captures' )
+    return data
+
+def read_channels( instr, channels=(1, 2), mode='NORM', points=None ):
+    # waveform data of several channels from the same acquisition:
+    # the oscilloscope is stopped while the channels are read
+    # (RAW mode: the first 'points' points of the memory)
+    # returns [(data, params), ...]
+    cmdWrite( instr, ':STOP', 0.0 )
+    result = []
+    try:
+        for channel in channels:
+            if mode == 'NORM':
+                setup_waveform( instr, channel, 'NORM', points )
+                params = read_preamble( instr )
+                result.append( (read_norm(instr, points or NORM_POINTS), params) )
+            else:
+                setup_waveform( instr, channel, 'RAW' )
+                cmdWrite( instr, ':WAV:STOP {:d}'.format(points), 0.0 )
+                params = read_preamble( instr )
+                result.append( (read_raw(instr, 1, points), params) )
+    finally:
+        cmdWrite( instr, ':RUN', 0.0 )
+    return result
+
+def read_raw( instr, start, stop, chunk_points=250000, out=None, on_chunk=None ):
+    # read the samples [start, stop] (1-based, inclusive) of the memory;
+    # on_chunk(samples) is called for each chunk as soon as it arrives
+    num = stop - start + 1
+    if out is None:
+        out = np.empty( num, dtype=np.uint8 )
+    pos = 0
+    while pos < num:
+        n = min( chunk_points, num - pos )
+        cmdWrite( instr, ':WAV:STAR {:d}'.format(start + pos), 0.0 )
+        cmdWrite( instr, ':WAV:STOP {:d}'.format(start + pos + n - 1), 0.0 )
+        # n samples + the block header ('#9' + 9 digits) + '\n'
+        block = parse_block( cmdReadRaw(instr, ':WAV:DATA?', 0.0, nbytes=n + BLOCK_OVERHEAD) )
+        out[pos:pos+len(block)] = np.frombuffer( block, dtype=np.uint8 )
+        if on_chunk is not None:
+            on_chunk( out[pos:pos+len(block)] )
+        pos += n
+    rigol_metrics.count( 'rigol_captures_total', 'Waveform captures' )
+    return out
+
+def wait_trigger_stop( instr, timeout=None, poll=0.05 ):
+    # wait until the single trigger has been completed ('STOP')
+    t_start = time.time()
+    while True:
+        status = cmdRead( instr, ':TRIG:STAT?', 0.0 )
+        if status is not None and status.strip() == 'STOP':
+            return True
+        if timeout is not None and time.time() - t_start > timeout:
+            return False
+        time.sleep( poll )
+
+############################################################################
+
+def measurement_query( spec ):
+    # ('VPP', 1) -> ':MEAS:VPP? CHAN1', ('RPH', 1, 2) -> ':MEAS:RPH? CHAN1,CHAN2'
+    if isinstance( spec, str ):
+        return spec
+    item, sources = spec[0], spec[1:]
+    query = ':MEAS:{}?'.format( item.upper() )
+    if len(sources) > 0:
+        query += ' ' + ','.join( 'CHAN{:d}'.format(s) if isinstance(s, int) else s
+                                 for s in sources )
+    return query
+
+def read_measurements( instr, specs, dly=0.2 ):
+    # read all measurements with one compound query, e.g.
+    #   vpp1, vpp2, freq1 = read_measurements( ds, [('VPP',1), ('VPP',2), ('FREQ',1)] )
+    # a value is None if the instrument cannot measure it (9.9E37)
+    query = ';'.join( measurement_query(spec) for spec in specs )
+    resp = cmdRead( instr, query, dly )
+    if resp is None:
+        return [None] * len(specs)
+    values = resp.strip().split(';')
+    if len(values) != len(specs):
+        raise ValueError( 'Unexpected measurement response: %r' % resp )
+    return [ parse_value(value) for value in values ]
+
+############################################################################
+
+SCREEN_DIVS_V = 8      # vertical divisions
+CODES_PER_DIV = 25     # DS2000A: yinc = (volts/div) / 25
+ADC_MIN, ADC_MAX = 0, 255
+MIN_CODES = 10         # min. signal deviation for a reliable estimate
+
+def scale_ladder( min_scale=500e-6, max_scale=10.0 ):
+    # 1-2-5 steps: 500uV, 1mV, 2mV, 5mV, ... 5V, 10V (per division)
+    ladder = []
+    for exp in range( int(math.floor(math.log10(min_scale))) - 1,
+                      int(math.ceil(math.log10(max_scale))) + 1 ):
+        for mant in (1.0, 2.0, 5.0):
+            scale = mant * 10**exp
+            if min_scale*(1-1e-9) <= scale <= max_scale*(1+1e-9):
+                ladder.append( scale )
+    return ladder
+
+def _best_scale( ladder, needed ):
+    # the smallest scale which is not smaller than needed
+    for scale in ladder:
+        if scale >= needed*(1-1e-9):
+            return scale
+    return ladder[-1]
+
+def auto_range( instr, channel, scale=None, probe=1, fill=0.8, wait=None,
+                max_steps=6 ):
+    # select the vertical scale so that the signal fills 'fill' of the
+    # screen height (the channel offset is kept). Starts from 'scale'
+    # (e.g. the last good scale) or from the current scale. After each
+    # change, waits 'wait' seconds (default: one screen acquisition).
+    # returns the selected scale
+    ladder = scale_ladder( 500e-6*probe, 10.0*probe )
+    if wait is None:
+        wait = 14 * float( cmdRead(instr, ':TIM:SCAL?', 0.0) )
+    if scale is None:
+        scale = float( cmdRead(instr, ':CHAN{:d}:SCAL?'.format(channel), 0.0) )
+    else:
+        cmdWrite( instr, ':CHAN{:d}:SCAL {:.3e}'.format(channel, scale), 0.0 )
+        time.sleep( wait )
+    scale = _best_scale( ladder, scale )
+    setup_waveform( instr, channel, 'NORM' )
+
+    for step in range( max_steps ):
+        params = read_preamble( instr )
+        data = read_norm( instr )
+        d_min, d_max = int(data.min()), int(data.max())
+        center = params['yref'] + params['yorg']
+        dev_codes = max( d_max - center, center - d_min, 1 )
+        if d_min <= ADC_MIN or d_max >= ADC_MAX:
+            # clipped: the amplitude is unknown, try a 10x larger scale
+            new_scale = _best_scale( ladder, 10*scale )
+        else:
+            # the largest deviation from the screen center (in volts)
+            dev = dev_codes * params['yinc']
+            new_scale = _best_scale( ladder, 2*dev / (SCREEN_DIVS_V*fill) )
+        if new_scale != scale:
+            scale = new_scale
+            cmdWrite( instr, ':CHAN{:d}:SCAL {:.3e}'.format(channel, scale), 0.0 )
+            time.sleep( wait )
+        elif d_min <= ADC_MIN or d_max >= ADC_MAX:
+            break   # clipped at the largest scale
+        if d_min > ADC_MIN and d_max < ADC_MAX and dev_codes >= MIN_CODES:
+            break   # the estimate was accurate enough, no need to verify
+    return scale
+
+############################################################################
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Arbitrary waveforms for the Rigol DG1022 defined by an expression,
+#    e.g. 'exp(-abs(4*t))*cos(4*pi*t)', instead of a Python function.
+#    The expression is parsed with the Python 'ast' module and only
+#    numbers, the variables below, + - * / ** % and comparisons, and the
+#    functions in FUNCTIONS are accepted (no attributes, no indexing, no
+#    other names), so it is safe to evaluate text typed by the user.
+#    It is compiled once and evaluated with NumPy on all points at once.
+#      t : time, -0.5 .. +0.5 (one period, as in rigol_wave.py)
+#      x : phase, 0 .. 1
+#      n : number of points
+#    The DAC codes are memoized (LRU cache) on (expression, points).
+#    The number of points is taken from 'DATA:ATTR:POIN? VOLATILE'.
+############################################################################
+# Usage:
+#   $ python3 ./rigol_expr.py 'exp(-abs(4*t))*cos(4*pi*t)' [--points N]
+#                             [--freq 1000] [--vpp 5.0] [--sim]
+#
+############################################################################
+
+import sys, ast
+import argparse
+import functools
+import numpy as np
+
+import rigol_wave
+import rigol_dg1022
+from rigol_discovery import Discovery
+
+MAX_LENGTH = 1000   # max. length of an expression (characters)
+
+FUNCTIONS = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'exp': np.exp, 'log': np.log, 'log10': np.log10, 'sqrt': np.sqrt,
+    'abs': np.abs, 'sign': np.sign, 'floor': np.floor, 'ceil': np.ceil,
+    'round': np.round, 'sinc': np.sinc, 'min': np.minimum, 'max': np.maximum,
+    'clip': np.clip, 'where': np.where,
+}
+CONSTANTS = { 'pi': np.pi, 'e': np.e }
+VARIABLES = ( 't', 'x', 'n' )
+
+_OPERATORS = ( ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod,
+               ast.UAdd, ast.USub, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+               ast.Eq, ast.NotEq )
+
+class ExpressionError(ValueError):
+    pass
+
+############################################################################
+
+class _Checker(ast.NodeTransformer):
+    # accepts only the allowed nodes; numbers are converted to float
+    # (so that e.g. 9**9**9 is an overflow, not a very long computation)
+
+    def generic_visit( self, node ):
+        if not isinstance( node, (ast.Expression, ast.BinOp, ast.UnaryOp,
+                                  ast.Compare, ast.Load) + _OPERATORS ):
+            raise ExpressionError( 'Not allowed: %s' % type(node).__name__ )
+        return ast.NodeTransformer.generic_visit( self, node )
+
+    def visit_Constant( self, node ):
+        if isinstance( node.value, bool ) or not isinstance( node.value, (int, float) ):
+            raise ExpressionError( 'Not a number: %r' % (node.value,) )
+        return ast.copy_location( ast.Constant(value=float(node.value)), node )
+
+    def visit_Name( self, node ):
+        if node.id not in VARIABLES and node.id not in CONSTANTS:
+            raise ExpressionError( 'Unknown name: %s' % node.id )
+        return node
+
+    def visit_Call( self, node ):
+        if not isinstance( node.func, ast.Name ):
+            raise ExpressionError( 'Not allowed: %s' % type(node.func).__name__ )
+        if node.func.id not in FUNCTIONS:
+            raise ExpressionError( 'Unknown function: %s' % node.func.id )
+        if node.keywords:
+            raise ExpressionError( 'Keyword arguments are not allowed' )
+        node.args = [ self.visit(arg) for arg in node.args ]
+        return node
+
+@functools.lru_cache( maxsize=128 )
+def compile_expression( expr ):
+    if len(expr) > MAX_LENGTH:
+        raise ExpressionError( 'Expression too long' )
+    try:
+        tree = ast.parse( expr.strip(), mode='eval' )
+    except SyntaxError as ex:
+        raise ExpressionError( 'Syntax error: %s' % ex.msg )
+    tree = ast.fix_missing_locations( _Checker().visit(tree) )
+    return compile( tree, '<waveform>', 'eval' )
+
+def evaluate( expr, n ):
+    # the expression on n points (float64 array)
+    code = compile_expression( expr )
+    names = dict( FUNCTIONS )
+    names.update( CONSTANTS )
+    names.update( t=rigol_wave.time_base(n), x=np.arange(n) / float(n), n=float(n) )
+    try:
+        with np.errstate( all='ignore' ):
+            y = eval( code, {'__builtins__': {}}, names )
+        y = np.broadcast_to( np.asarray(y, dtype=np.float64), (n,) )
+    except (TypeError, ValueError, ArithmeticError) as ex:
+        raise ExpressionError( str(ex) )
+    if not np.all( np.isfinite(y) ):
+        raise ExpressionError( 'Not finite at %d points'
+                               % np.count_nonzero(~np.isfinite(y)) )
+    return y
+
+@functools.lru_cache( maxsize=32 )
+def waveform( expr, n=rigol_wave.MAX_POINTS, normalize=False ):
+    # DAC codes (read-only uint16 array); the expression is -1.0..+1.0
+    # (clipped), or scaled to -1.0..+1.0 if normalize is True
+    y = evaluate( expr, n )
+    if normalize:
+        y = rigol_wave.normalize( y )
+    codes = rigol_wave.to_dac( y )
+    codes.setflags( write=False )
+    return codes
+
+def device_waveform( dg, expr, normalize=False ):
+    # DAC codes with the max. number of points of the instrument
+    return waveform( expr, rigol_dg1022.max_points(dg), normalize )
+
+############################################################################
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='DG1022 waveform from an expression' )
+    parser.add_argument( 'expr', help="e.g. 'exp(-abs(4*t))*cos(4*pi*t)'" )
+    parser.add_argument( '--points', type=int, default=None,
+                         help='default: DATA:ATTR:POIN? VOLATILE' )
+    parser.add_argument( '--normalize', action='store_true' )
+    parser.add_argument( '--freq', type=float, default=1000.0 )
+    parser.add_argument( '--vpp', type=float, default=5.0 )
+    parser.add_argument( '--sim', action='store_true',
+                         help='use the simulated DG1022 (rigol_sim.py)' )
+    args = parser.parse_args( argv )
+
+    try:
+        compile_expression( args.expr )
+    except ExpressionError as ex:
+        print ( 'Invalid expression: {}'.format(ex) )
+        return -1
+    if args.sim:
+        from rigol_sim import SimGenerator
+        dg = SimGenerator()
+    else:
+        discovery = Discovery()
+        device = discovery.find( 'DG' )
+        if device is None:
+            print ( 'No DG1022 instrument found !!!' )
+            return -1
+        dg = discovery.open( device )
+    try:
+        points = args.points or rigol_dg1022.max_points( dg )
+        codes = waveform( args.expr, points, args.normalize )
+    except ExpressionError as ex:
+        print ( 'Invalid expression: {}'.format(ex) )
+        return -1
+    result = rigol_dg1022.WaveformCache( dg ).select( codes, args.freq, args.vpp )
+    print ( '{} points, {}'.format(len(codes), result) )
+    dg.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Single-shot frequency response measurement (Bode plot) with a
+#    Rigol DG1022 function generator and a Rigol DS2000A oscilloscope.
+#    A wideband excitation (a multitone or a log-chirp) is uploaded to
+#    the DG1022 as a user-defined (arbitrary) waveform and repeated at
+#    f_rep = f_min. The input (CHAN1) and the output (CHAN2) are captured
+#    at the same time, and the transfer function is computed on the host
+#    by FFT division H(f) = Y(f) / X(f) at the harmonics of f_rep.
+#    The capture is cut to an integer number of periods of the waveform,
+#    so the harmonics fall on the FFT bins (no leakage).
+#    The highest harmonic must be below the Nyquist frequency of the
+#    capture; if NORM mode (1400 points) has too few samples per period,
+#    the memory depth is set and the RAW memory is captured instead.
+############################################################################
+# Usage:
+#   $ python3 ./rigol_fresp.py [--fmin 1] [--fmax 1000] [--chirp]
+#
+############################################################################
+
+import sys, time
+import argparse
+import numpy as np
+
+import rigol_capture
+import rigol_wave
+import rigol_dg1022
+from rigol_instr import cmdWrite
+from rigol_discovery import Discovery
+from rigol_ds import read_channels
+
+SCREEN_DIVS = 14
+NORM_POINTS = 1400                       # DS2000A: NORM mode waveform
+RAW_DEPTHS = (14000, 140000, 1400000)    # memory depths for RAW mode
+OVERSAMPLE = 4   # min. samples per period of the highest harmonic (auto RAW)
+
+############################################################################
+
+def transfer_function( data_in, data_out, xinc, f_rep, harmonics=None,
+                       params_in=None, params_out=None, min_level=1e-3,
+                       h_max=None ):
+    # returns (freqs, gain, phase in degrees) at the harmonics of f_rep
+    # (or, if harmonics is None, at all bins with enough excitation);
+    # raises ValueError if a harmonic (up to h_max) is above the Nyquist
+    # frequency: it would alias onto the bins of the lower harmonics
+    x = np.asarray( data_in )
+    y = np.asarray( data_out )
+    if params_in is not None:
+        x = rigol_capture.to_volts( x, params_in, np.float64 )
+    if params_out is not None:
+        y = rigol_capture.to_volts( y, params_out, np.float64 )
+
+    samples_per_period = 1.0 / (f_rep * xinc)
+    periods = int( min(len(x), len(y)) / samples_per_period )
+    if periods < 1:
+        raise ValueError( 'The capture is shorter than one period' )
+    if harmonics is not None:
+        h_max = max( harmonics )
+    if h_max is not None and h_max >= samples_per_period / 2:
+        raise ValueError( 'Harmonic {:d} is above the Nyquist frequency '
+                          '({:.0f} samples per period)'.format(int(h_max),
+                                                              samples_per_period) )
+    n = min( int(round(periods * samples_per_period)), len(x), len(y) )
+    spec_x = np.fft.rfft( x[:n] - x[:n].mean() )
+    spec_y = np.fft.rfft( y[:n] - y[:n].mean() )
+    freqs = np.fft.rfftfreq( n, xinc )
+
+    if harmonics is not None:
+        bins = np.rint( np.asarray(harmonics) * periods ).astype( int )
+    else:
+        # the excitation repeats at f_rep: only its harmonics (every
+        # 'periods' bins) carry signal, the bins between them only leakage
+        level = np.abs( spec_x )
+        bins = np.flatnonzero( level > min_level * level[1:].max() )
+        bins = bins[ (bins > 0) & (bins % periods == 0) ]
+        if h_max is not None:
+            bins = bins[ bins <= h_max * periods ]
+    h = spec_y[bins] / spec_x[bins]
+    return freqs[bins], np.abs( h ), np.degrees( np.angle(h) )
+
+def excitation( kind, points, h_max, tones=50 ):
+    # returns (waveform, harmonics)
+    if kind == 'chirp':
+        return rigol_wave.log_chirp( points, 1, h_max ), None
+    harmonics = rigol_wave.log_harmonics( h_max, tones )
+    return rigol_wave.multitone( points, harmonics ), harmonics
+
+def measure_response( ds, dg, f_min=1.0, f_max=1000.0, kind='multitone',
+                      tones=50, points=4096, vpp=5.0, periods=2,
+                      raw_points=None ):
+    h_max = int( f_max / f_min )
+    if h_max >= points // 2:
+        raise ValueError( 'f_max/f_min must be less than points/2' )
+    wave, harmonics = excitation( kind, points, h_max, tones )
+    rigol_dg1022.upload_user_waveform( dg, rigol_wave.to_dac(wave),
+                                       f_min, vpp, 0.0 )
+
+    # show 'periods' repetitions of the waveform on the screen and
+    # wait for (at least) one complete new acquisition
+    time_per_div = periods / (SCREEN_DIVS * f_min)
+    cmdWrite( ds, ':TIM:SCAL {:.3e}'.format(time_per_div), 0.0 )
+    if raw_points is None and NORM_POINTS / periods < OVERSAMPLE * h_max:
+        # too few samples per period in NORM mode: capture the RAW memory
+        depths = [ d for d in RAW_DEPTHS if d / periods >= OVERSAMPLE * h_max ]
+        if not depths:
+            raise ValueError( 'f_max/f_min is too large for the memory depth' )
+        raw_points = depths[0]
+        cmdWrite( ds, ':ACQ:MDEP {:d}'.format(raw_points), 0.0 )
+    time.sleep( 2 * SCREEN_DIVS * time_per_div )
+
+    if raw_points:
+        captures = read_channels( ds, (1, 2), 'RAW', raw_points )
+    else:
+        captures = read_channels( ds, (1, 2) )
+    (data_in, params_in), (data_out, params_out) = captures
+    return transfer_function( data_in, data_out, params_in['xinc'], f_min,
+                              harmonics, params_in, params_out, h_max=h_max )
+
+############################################################################
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Single-shot frequency response' )
+    parser.add_argument( '--fmin', type=float, default=1.0 )
+    parser.add_argument( '--fmax', type=float, default=1000.0 )
+    parser.add_argument( '--tones', type=int, default=50 )
+    parser.add_argument( '--chirp', action='store_true',
+                         help='use a log-chirp instead of a multitone' )
+    parser.add_argument( '--raw', type=int, default=None, metavar='POINTS',
+                         help='capture POINTS raw memory points (default: NORM)' )
+    args = parser.parse_args( argv )
+
+    discovery = Discovery()
+    ds, dg = discovery.find( 'DS' ), discovery.find( 'DG' )
+    if ds is None or dg is None:
+        print ( 'Rigol DS oscilloscope and DG function generator required !!!' )
+        return -1
+    ds, dg = discovery.open( ds ), discovery.open( dg )
+
+    try:
+        freqs, gain, phase = measure_response(
+            ds, dg, args.fmin, args.fmax, 'chirp' if args.chirp else 'multitone',
+            args.tones, raw_points=args.raw )
+    except ValueError as ex:
+        print ( ex )
+        return -1
+    for f, g, p in zip( freqs, gain, phase ):
+        print ( "Freq(Hz): {:.1f}, Vpp2/Vpp1: {:.3f}, Phase(Deg.): {:.1f}".format(f, g, p) )
+    ds.close()
+    dg.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Common command layer for Rigol instruments (oscilloscopes and
+#    function generators) opened with pyvisa. The functions take the
+#    instrument (resource) as the first argument, so that the same code
+#    can talk to more than one instrument, e.g. a DS2072A and a DG1022.
+#    With a tracer (rigol_trace.py), each command is recorded as a span.
+#    open_instrument() opens a resource and measures the command latency
+#    (a few '*IDN?' queries); the throughput of the link is refined by
+#    each large read (cmdReadRaw with the expected size 'nbytes'), which
+#    gets its timeout and chunk_size from the link model (LinkModel)
+#    instead of fixed numbers.
+############################################################################
+
+import time
+import logging
+import weakref
+
+TOO_LARGE_VALUE = (9e+37)   # invalid measurement value: 9.9E37
+
+tracer = None   # rigol_trace.Tracer while tracing
+
+TIMEOUT_MARGIN = 3.0       # timeout = margin * expected time + slack
+TIMEOUT_SLACK = 0.1        # s
+MIN_TIMEOUT = 0.5          # s: the processing time of the instrument
+                           # (e.g. ':MEAS:xxx?', a NORM waveform), not
+                           # only the latency of '*IDN?'
+CHUNK_SECONDS = 0.1        # chunk_size: the data of 100 ms
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+SMALL_REPLY = 1024         # bytes: the size of a (non-waveform) reply
+MIN_RATE_REPLY = 16 * 1024 # bytes: smaller reads (e.g. NORM waveforms) are
+                           # mostly processing time, not a throughput sample
+
+_links = weakref.WeakKeyDictionary()   # instrument -> LinkModel
+
+log = logging.getLogger( 'rigol_instr' )
+
+############################################################################
+
+def cmdWrite(instr, cmd, dly=0.1):
+    if tracer is not None:
+        return tracer.command( instr, cmd, dly, 'write' )
+    instr.write( cmd )
+    time.sleep( dly )
+
+def cmdWriteRaw(instr, data, dly=0.1):
+    # bytes, e.g. a command with a binary block (no termination added)
+    if tracer is not None:
+        return tracer.command( instr, data, dly, 'write_raw' )
+    instr.write_raw( data )
+    time.sleep( dly )
+
+def cmdRead(instr, cmd, dly=0.1):
+    if tracer is not None:
+        return tracer.command( instr, cmd, dly, 'read' )
+    instr.write( cmd )
+    time.sleep( dly )
+    try:
+        resp = instr.read()
+    except Exception as ex:
+        log.warning( '%s: %s', cmd, ex )
+        return None
+    return resp.rstrip('\r\n')
+
+def cmdReadRaw(instr, cmd, dly=0.1, nbytes=None):
+    # nbytes: the expected size of a large reply; then the timeout and the
+    # chunk size are set from the link model, which learns from the read
+    if nbytes is not None:
+        link = link_model( instr )
+        saved = link.apply( instr, nbytes )
+        t_start = time.perf_counter()
+        try:
+            data = cmdReadRaw( instr, cmd, dly )
+        finally:
+            link.restore( instr, saved )
+        if data is not None:
+            link.observe( len(data), time.perf_counter() - t_start - dly )
+        return data
+    if tracer is not None:
+        return tracer.command( instr, cmd, dly, 'read_raw' )
+    instr.write( cmd )
+    time.sleep( dly )
+    try:
+        data = instr.read_raw()
+    except Exception as ex:
+        log.warning( '%s: %s', cmd, ex )
+        data = None
+    return data
+
+def wait_complete(instr, timeout=10.0):
+    # wait until all pending operations are complete ('*OPC?' -> '1')
+    # instead of a fixed sleep; returns False on timeout. A read may time
+    # out while the instrument is busy, then the answer is read again.
+    t_end = time.time() + timeout
+    instr.write( '*OPC?' )
+    while True:
+        try:
+            if instr.read().strip() == '1':
+                return True
+        except Exception:
+            pass
+        if time.time() > t_end:
+            return False
+
+def read_error(instr):
+    # the next entry of the error queue, or None if there is no error
+    resp = cmdRead( instr, 'SYST:ERR?', 0.0 )
+    if resp is None:
+        return 'No response'
+    if resp.strip().startswith( ('0,', '+0,') ):
+        return None
+    return resp.strip()
+
+############################################################################
+
+class LinkModel(object):
+    # time of a read = latency + bytes / throughput; the estimates start
+    # from conservative values and are refined by the measured reads
+
+    def __init__( self, latency=0.005, bytes_per_sec=0.5e6, alpha=0.3 ):
+        self.latency = latency
+        self.bytes_per_sec = bytes_per_sec
+        self.alpha = alpha          # weight of a new measurement
+        self.measured = False       # the throughput has been measured
+
+    def probe( self, instr, count=5 ):
+        # the latency: the median time of 'count' '*IDN?' queries
+        times = []
+        for i in range( count ):
+            t_start = time.perf_counter()
+            resp = cmdRead( instr, '*IDN?', 0.0 )
+            if resp is not None:
+                times.append( time.perf_counter() - t_start )
+        if times:
+            self.latency = sorted( times )[len(times) // 2]
+        return self.latency
+
+    def observe( self, nbytes, seconds ):
+        transfer = seconds - self.latency
+        if nbytes < MIN_RATE_REPLY or transfer <= 0:
+            # a small reply (or faster than expected): the latency
+            self.latency += self.alpha * (seconds - self.latency)
+            return
+        rate = nbytes / transfer
+        if not self.measured:
+            self.bytes_per_sec, self.measured = rate, True
+        else:
+            self.bytes_per_sec += self.alpha * (rate - self.bytes_per_sec)
+
+    def expected( self, nbytes ):
+        return self.latency + nbytes / self.bytes_per_sec
+
+    def timeout_ms( self, nbytes=SMALL_REPLY ):
+        seconds = TIMEOUT_MARGIN * self.expected( nbytes ) + TIMEOUT_SLACK
+        return int( 1000 * max(MIN_TIMEOUT, seconds) + 0.5 )
+
+    def chunk_size( self, nbytes=None ):
+        # about CHUNK_SECONDS of data per read call (fewer calls for a
+        # fast link), but not more than the reply (memory)
+        chunk = int( min(max(self.bytes_per_sec * CHUNK_SECONDS, MIN_CHUNK), MAX_CHUNK) )
+        if nbytes is not None:
+            chunk = min( chunk, (nbytes // 1024 + 1) * 1024 )
+        return chunk
+
+    def apply( self, instr, nbytes ):
+        # set the timeout and the chunk size for a read of nbytes;
+        # returns the previous values (for restore)
+        saved = (instr.timeout, instr.chunk_size)
+        instr.timeout = self.timeout_ms( nbytes )
+        instr.chunk_size = self.chunk_size( nbytes )
+        return saved
+
+    def restore( self, instr, saved ):
+        instr.timeout, instr.chunk_size = saved
+
+def link_model( instr ):
+    # the link model of an instrument (created with the default values)
+    link = _links.get( instr )
+    if link is None:
+        link = _links[instr] = LinkModel()
+    return link
+
+def open_instrument( resources, name, probe=True, **kwargs ):
+    # open a resource (pyvisa ResourceManager) with the timeout and the
+    # chunk size from the link model; probe: measure the latency first
+    link = LinkModel()
+    kwargs.setdefault( 'timeout', link.timeout_ms() )
+    kwargs.setdefault( 'chunk_size', link.chunk_size() )
+    instr = resources.open_resource( name, **kwargs )
+    _links[instr] = link
+    if probe:
+        link.probe( instr )
+        instr.timeout = link.timeout_ms()
+    return instr
+
+############################################################################
+
+def parse_block( rawdata ):
+    # IEEE 488.2 definite-length block: #<n><n digits: length><data>
+    # DS1000E: '#8' + 8 digits, DS2000A/DS1000Z: '#9' + 9 digits (+ '\n')
+    if rawdata is None or rawdata[0:1] != b'#':
+        raise ValueError( 'Invalid data block header' )
+    n = int( rawdata[1:2] )
+    if n == 0:   # indefinite-length block
+        return rawdata[2:].rstrip(b'\n')
+    length = int( rawdata[2:2+n] )
+    start = 2 + n
+    return rawdata[start:start+length]
+
+def make_block( data, digits=None ):
+    # build a definite-length block from bytes; 'digits': the fixed
+    # number of length digits (e.g. 9 for the DS2000A), default: minimal
+    length = '{:d}'.format( len(data) )
+    if digits is not None:
+        length = length.zfill( digits )
+    return b'#' + str(len(length)).encode() + length.encode() + bytes(data)
+
+def parse_value( resp ):
+    # a measurement value, or None if the instrument cannot measure it
+    try:
+        value = float( resp )
+    except (TypeError, ValueError):
+        return None
+    if abs(value) > TOO_LARGE_VALUE:
+        return None
+    return value
+
+############################################################################
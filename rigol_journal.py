@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Durable journal of completed measurement steps, so that a long sweep
+#    or test sequence can be resumed after an interruption (USB error,
+#    Ctrl-C, power failure) instead of starting over.
+#    The journal is a text file with one JSON record per line:
+#      {"header": {...}}                      the settings of the run
+#      {"key": "1000", "result": [...]}       one completed step
+#    Each record is flushed to the disk (fsync) before the next step
+#    starts. A partly written last line (crash while writing) is ignored.
+#    run_steps() is a simple sequence runner: it skips the completed
+#    steps, (re)configures the instruments with setup() on start and
+#    after an error, and retries a failed step. An invalid result (None,
+#    or containing None, e.g. a measurement 9.9E37) is not journaled, so
+#    the step is measured again when the run is resumed.
+############################################################################
+
+import os, json, time
+import logging
+import numbers
+
+import rigol_metrics
+
+log = logging.getLogger( 'rigol_journal' )
+
+############################################################################
+
+def step_key( step ):
+    # e.g. 1000.0 -> '1000', (1, 'VPP') -> '[1, "VPP"]'
+    if isinstance( step, numbers.Real ):
+        return '{:.9g}'.format( step )
+    if isinstance( step, str ):
+        return step
+    return json.dumps( step )
+
+def is_valid( result ):
+    # False for None and for lists / dicts containing None
+    if result is None:
+        return False
+    if isinstance( result, (list, tuple) ):
+        return all( is_valid(item) for item in result )
+    if isinstance( result, dict ):
+        return all( is_valid(item) for item in result.values() )
+    return True
+
+class Journal(object):
+
+    def __init__( self, filename, header=None ):
+        self.filename = filename
+        self.header = json.loads( json.dumps(header) )   # as stored in JSON
+        self.done = {}   # key -> result (in the order of completion)
+        if os.path.exists( filename ):
+            self._load()
+        else:
+            self._append( {'header': header} )
+
+    def _load( self ):
+        with open( self.filename ) as f:
+            lines = f.read().split('\n')
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append( json.loads(line) )
+            except ValueError:
+                break   # incomplete last record
+        if records and 'header' in records[0]:
+            stored = records.pop( 0 )['header']
+            if self.header is not None and stored != self.header:
+                raise ValueError( 'Journal %s was written with other settings'
+                                  % self.filename )
+            self.header = stored
+        for record in records:
+            if is_valid( record['result'] ):   # (older journals)
+                self.done[record['key']] = record['result']
+        # drop an incomplete record, so that new records start on a new line;
+        # the file is replaced atomically (a crash keeps the old journal)
+        tmp_name = self.filename + '.%d.tmp' % os.getpid()
+        with open( tmp_name, 'w' ) as f:
+            f.write( '\n'.join(json.dumps(r) for r in
+                               [{'header': self.header}] + records) + '\n' )
+            f.flush()
+            os.fsync( f.fileno() )
+        os.replace( tmp_name, self.filename )
+
+    def _append( self, record ):
+        with open( self.filename, 'a' ) as f:
+            f.write( json.dumps(record) + '\n' )
+            f.flush()
+            os.fsync( f.fileno() )
+
+    def __contains__( self, step ):
+        return step_key( step ) in self.done
+
+    def get( self, step, default=None ):
+        return self.done.get( step_key(step), default )
+
+    def add( self, step, result ):
+        key = step_key( step )
+        self.done[key] = result
+        self._append( {'key': key, 'result': result, 'time': time.time()} )
+
+############################################################################
+
+def run_steps( steps, do_step, journal, setup=None, retries=2, retry_delay=1.0 ):
+    # do_step(step) -> result (JSON serializable); yields (step, result)
+    # for all steps, the completed ones are taken from the journal
+    configured = False
+    for step in steps:
+        if step in journal:
+            yield step, journal.get( step )
+            continue
+        for attempt in range( retries + 1 ):
+            try:
+                if setup is not None and not configured:
+                    setup()
+                    configured = True
+                result = do_step( step )
+                break
+            except KeyboardInterrupt:
+                raise
+            except Exception as ex:
+                if attempt == retries:
+                    raise
+                log.warning( 'Step %s failed (%s), retrying...', step, ex )
+                rigol_metrics.count( 'rigol_step_retries_total', 'Retried steps' )
+                configured = False
+                time.sleep( retry_delay )
+        if is_valid( result ):
+            journal.add( step, result )
+        yield step, result
+
+############################################################################
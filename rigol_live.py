@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Live (continuous) display of the waveform on a Rigol oscilloscope.
+#    The waveform is read repeatedly (NORM mode, or a min/max decimated
+#    view of the RAW memory) in a background thread. The display loop
+#    runs at a target frame rate and always shows the newest frame;
+#    older frames which have not been shown yet are dropped. Failed reads
+#    are counted; after MAX_ERRORS in a row the view stops with the error.
+#    The plot is updated with blitting: only the (reused) Line2D is
+#    redrawn on top of a saved background, not the whole figure.
+############################################################################
+# Usage:
+#   $ python3 ./rigol_live.py                 # first DS oscilloscope on USB
+#   $ python3 ./rigol_live.py --sim           # simulated DS2072A
+#   $ python3 ./rigol_live.py --sim --raw 140000 --fps 30
+#
+############################################################################
+
+import sys, time
+import argparse
+import threading
+
+import numpy as np
+
+import rigol_capture
+import rigol_ds
+from rigol_discovery import Discovery
+
+PLOT_WIDTH = 1400   # max. number of min/max pairs per frame (RAW mode)
+MAX_ERRORS = 5      # the grabber stops after this many failed reads in a row
+
+############################################################################
+
+class FrameGrabber(threading.Thread):
+    # reads frames from the instrument and keeps only the newest one
+
+    def __init__( self, instr, channel=1, raw_points=None ):
+        threading.Thread.__init__( self )
+        self.daemon = True
+        self.instr = instr
+        self.channel = channel
+        self.raw_points = raw_points
+        self.params = None
+        self.frames = 0      # number of frames read
+        self.dropped = 0     # number of frames never displayed
+        self.errors = 0      # number of failed reads
+        self.error = None    # the last error (str)
+        self._frame = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def setup( self ):
+        if self.raw_points:
+            rigol_ds.setup_waveform( self.instr, self.channel, 'RAW' )
+            self._buf = np.empty( self.raw_points, dtype=np.uint8 )
+        else:
+            rigol_ds.setup_waveform( self.instr, self.channel, 'NORM' )
+        self.params = rigol_ds.read_preamble( self.instr )
+
+    def read_frame( self ):
+        if self.raw_points:
+            data = rigol_ds.read_raw( self.instr, 1, self.raw_points,
+                                      out=self._buf )
+            idx, data = rigol_capture.decimate_minmax( data, PLOT_WIDTH )
+            if data is self._buf:
+                # not decimated: the next read would overwrite the frame
+                data = data.copy()
+            return idx, data
+        data = rigol_ds.read_norm( self.instr )
+        return None, data
+
+    def run( self ):
+        self._running = True
+        failed = 0
+        while self._running:
+            try:
+                frame = self.read_frame()
+            except Exception as ex:   # e.g. a timeout: no data block
+                self.errors += 1
+                self.error = str( ex )
+                failed += 1
+                if failed >= MAX_ERRORS:
+                    self._running = False
+                continue
+            failed = 0
+            with self._lock:
+                if self._frame is not None:
+                    self.dropped += 1
+                self._frame = frame
+                self.frames += 1
+
+    def stop( self ):
+        self._running = False
+        if self.is_alive():
+            self.join()
+
+    def latest( self ):
+        with self._lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+############################################################################
+
+class LiveView(object):
+
+    def __init__( self, grabber, fps=25.0 ):
+        import matplotlib.pyplot as plot
+        self.plot = plot
+        self.grabber = grabber
+        self.fps = fps
+        self.shown = 0
+        self.fig = None
+
+    def _make_figure( self ):
+        params = self.grabber.params
+        idx, data = self.grabber.read_frame()
+        if idx is None:
+            idx = np.arange( len(data) )
+        ts = rigol_capture.time_axis( params, idx )
+        scale, ts_unit = rigol_capture.time_unit( ts[-1] )
+        self._scale = scale
+        self.fig = self.plot.figure( figsize=(12, 4), dpi=100 )
+        self.ax = self.fig.add_subplot( 111 )
+        self.line, = self.ax.plot( ts*scale, rigol_capture.to_volts(data, params),
+                                   animated=True )
+        v_range = rigol_capture.to_volts( np.array([0, 255]), params )
+        self.ax.set_ylim( v_range[0], v_range[1] )
+        self.ax.set_xlim( ts[0]*scale, ts[-1]*scale )
+        self.ax.set_title( 'Live View [CH{:d}]'.format(self.grabber.channel) )
+        self.ax.set_ylabel( 'Voltage [V]' )
+        self.ax.set_xlabel( 'Time [%s]' % ts_unit )
+        self.ax.grid( True )
+        if self.plot.get_backend().lower() != 'agg':
+            self.plot.show( block=False )
+        self.fig.canvas.draw()
+        self._background = self.fig.canvas.copy_from_bbox( self.fig.bbox )
+        self.fig.canvas.mpl_connect( 'draw_event', self._on_draw )
+
+    def _on_draw( self, event ):
+        # the figure was redrawn (e.g. resized): save the new background
+        self._background = self.fig.canvas.copy_from_bbox( self.fig.bbox )
+
+    def _show( self, frame ):
+        idx, data = frame
+        params = self.grabber.params
+        canvas = self.fig.canvas
+        if idx is not None:
+            self.line.set_xdata( rigol_capture.time_axis(params, idx) * self._scale )
+        self.line.set_ydata( rigol_capture.to_volts(data, params) )
+        canvas.restore_region( self._background )
+        self.ax.draw_artist( self.line )
+        canvas.blit( self.fig.bbox )
+        canvas.flush_events()
+        self.shown += 1
+
+    def run( self, duration=None ):
+        self.grabber.setup()
+        self._make_figure()
+        self.grabber.start()
+        period = 1.0 / self.fps
+        t_start = time.time()
+        t_next = t_start
+        try:
+            while self.plot.fignum_exists( self.fig.number ):
+                now = time.time()
+                if duration is not None and now - t_start > duration:
+                    break
+                if not self.grabber.is_alive():
+                    print ( 'Stopped: {}'.format(self.grabber.error) )
+                    break
+                if now < t_next:
+                    time.sleep( t_next - now )
+                t_next = max( t_next + period, time.time() )
+                frame = self.grabber.latest()
+                if frame is not None:
+                    self._show( frame )
+        except KeyboardInterrupt:
+            print ( 'Terminated...' )
+        finally:
+            self.grabber.stop()
+        t_used = time.time() - t_start
+        return dict( seconds=t_used, shown=self.shown,
+                     frames=self.grabber.frames, dropped=self.grabber.dropped,
+                     errors=self.grabber.errors,
+                     fps=self.shown / t_used )
+
+############################################################################
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Rigol oscilloscope live view' )
+    parser.add_argument( '--chan', type=int, default=1 )
+    parser.add_argument( '--fps', type=float, default=25.0,
+                         help='target frame rate' )
+    parser.add_argument( '--raw', type=int, default=None, metavar='POINTS',
+                         help='decimated view of POINTS raw memory points' )
+    parser.add_argument( '--sim', action='store_true',
+                         help='use a simulated oscilloscope' )
+    parser.add_argument( '--duration', type=float, default=None )
+    parser.add_argument( '--headless', action='store_true',
+                         help='use the Agg backend (for benchmarking)' )
+    args = parser.parse_args( argv )
+
+    if args.headless:
+        import matplotlib
+        matplotlib.use( 'Agg' )
+
+    if args.sim:
+        import rigol_sim
+        instr = rigol_sim.SimScope()
+    else:
+        discovery = Discovery()
+        device = discovery.find( 'DS' )
+        if device is None:
+            print ( 'No Rigol oscilloscope instrument found !!!' )
+            return -1
+        instr = discovery.open( device )
+
+    grabber = FrameGrabber( instr, args.chan, args.raw )
+    stats = LiveView( grabber, args.fps ).run( args.duration )
+    print ( 'Shown {shown:d} of {frames:d} frames ({dropped:d} dropped, '
+            '{errors:d} failed reads) in {seconds:.1f} sec: {fps:.1f} fps'.format(**stats) )
+    instr.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
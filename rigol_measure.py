@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Host-side waveform measurements on captured data (numpy arrays).
+#    One captured record replaces the ':MEAS:xxx?' queries, e.g.
+#    FREQ, PER, VPP, VRMS, RTIM, FTIM, PDUT, RDEL and RPH.
+#    The definitions follow the Rigol DS2000A measurements:
+#     - Vtop/Vbase : the most probable values above/below the middle
+#     - thresholds : 10% (lower), 50% (middle), 90% (upper) of Vbase..Vtop
+#     - rise time  : from the lower to the upper threshold (rising edge)
+#     - fall time  : from the upper to the lower threshold (falling edge)
+#     - period     : between the middle threshold crossings of the
+#                    consecutive rising edges
+#     - delay      : from a rising edge of A to the nearest rising edge of B
+#     - phase      : 360 * delay / period (in degrees)
+#    Edges are detected with hysteresis (a rising edge has to cross the
+#    lower and then the upper threshold), so that noise on a slow edge
+#    does not produce false edges.
+#    The data is either voltages (float) or the raw bytes (uint8) read
+#    from the instrument together with the waveform parameters
+#    (see rigol_capture.parse_preamble). For raw bytes, all amplitude
+#    values are computed from one histogram of the 256 codes.
+#    A value which cannot be measured is returned as None.
+#    For a sine wave of a known frequency (e.g. from the DG1022), the
+#    amplitude and phase are estimated by a least-squares sine fit
+#    (like a lock-in amplifier), which uses all samples and is much less
+#    sensitive to noise than the peak-to-peak or edge based measurements.
+############################################################################
+
+import numpy as np
+
+LOWER  = 0.1   # threshold levels (relative to Vbase..Vtop)
+MIDDLE = 0.5
+UPPER  = 0.9
+
+############################################################################
+
+def _histogram( data ):
+    # returns (counts, values) of the data
+    if data.dtype == np.uint8:
+        return np.bincount( data, minlength=256 ), np.arange( 256.0 )
+    v_min, v_max = float(data.min()), float(data.max())
+    if v_max == v_min:
+        return np.array([len(data)]), np.array([v_min])
+    counts, edges = np.histogram( data, bins=256, range=(v_min, v_max) )
+    values = 0.5 * (edges[:-1] + edges[1:])
+    values[0], values[-1] = v_min, v_max
+    return counts, values
+
+def _amplitudes( data ):
+    counts, values = _histogram( data )
+    used = np.flatnonzero( counts )
+    v_min, v_max = values[used[0]], values[used[-1]]
+    mid = 0.5 * (v_min + v_max)
+    upper = values >= mid
+    v_top = values[upper][ np.argmax(counts[upper]) ]
+    v_base = values[~upper][ np.argmax(counts[~upper]) ] if (~upper).any() else v_min
+    n = float( counts.sum() )
+    if data.dtype == np.uint8:
+        v_avg = np.dot( counts, values ) / n
+        v_ms = np.dot( counts, values*values ) / n
+    else:
+        v_avg = float( data.mean(dtype=np.float64) )
+        v_ms = float( np.dot(data, data) ) / n
+    return dict( vmin=v_min, vmax=v_max, vtop=v_top, vbase=v_base,
+                 vavg=v_avg, vms=v_ms )
+
+def _crossings( data, level, rising ):
+    # indices k where the data crosses the level between k-1 and k
+    if rising:
+        return np.flatnonzero( (data[:-1] < level) & (data[1:] >= level) ) + 1
+    return np.flatnonzero( (data[:-1] > level) & (data[1:] <= level) ) + 1
+
+def _cross_time( data, index, level ):
+    # linear interpolation of the crossing time (in samples)
+    y0 = data[index-1].astype( np.float64 )
+    y1 = data[index].astype( np.float64 )
+    dy = y1 - y0
+    dy[dy == 0] = 1.0
+    return (index - 1) + (level - y0) / dy
+
+def _alternate( up, down ):
+    # keep the first crossing of each run (hysteresis): an up-crossing
+    # counts as an edge only if the last edge was a down-crossing
+    index = np.concatenate( (up, down) )
+    label = np.concatenate( (np.ones(len(up), np.int8), -np.ones(len(down), np.int8)) )
+    order = np.argsort( index, kind='mergesort' )
+    index, label = index[order], label[order]
+    first = np.ones( len(label), dtype=bool )
+    first[1:] = label[1:] != label[:-1]
+    index, label = index[first], label[first]
+    return index[label > 0], index[label < 0]
+
+def _last_before( crossings, index ):
+    # the last crossing at or before each index
+    # (none found: all-False mask, e.g. no crossings at all)
+    if len(crossings) == 0:
+        return np.zeros( len(index), dtype=np.int64 ), np.zeros( len(index), dtype=bool )
+    pos = np.searchsorted( crossings, index, side='right' ) - 1
+    return crossings[ np.maximum(pos, 0) ], pos >= 0
+
+def _first_after( crossings, index ):
+    if len(crossings) == 0:
+        return np.zeros( len(index), dtype=np.int64 ), np.zeros( len(index), dtype=bool )
+    pos = np.searchsorted( crossings, index, side='left' )
+    ok = pos < len(crossings)
+    return crossings[ np.minimum(pos, len(crossings)-1) ], ok
+
+############################################################################
+
+class Edges(object):
+    # rising and falling edge times (in samples) of one waveform
+
+    def __init__( self, data, levels=None ):
+        if levels is None:
+            levels = _amplitudes( data )
+        base, amp = levels['vbase'], levels['vtop'] - levels['vbase']
+        lower = base + LOWER*amp
+        middle = base + MIDDLE*amp
+        upper = base + UPPER*amp
+
+        if amp <= 0 or len(data) < 3:
+            self.rise_mid = self.fall_mid = np.empty( 0 )
+            self.rise_time = self.fall_time = np.empty( 0 )
+            return
+
+        up_lower = _crossings( data, lower, True )
+        up_upper = _crossings( data, upper, True )
+        dn_lower = _crossings( data, lower, False )
+        dn_upper = _crossings( data, upper, False )
+        up_mid = _crossings( data, middle, True )
+        dn_mid = _crossings( data, middle, False )
+
+        # edges with hysteresis between the lower and upper thresholds
+        rise, fall = _alternate( up_upper, dn_lower )
+        # a rising edge must start below the lower threshold
+        start, ok = _last_before( up_lower, rise )
+        rise, start = rise[ok], start[ok]
+        stop_f, ok = _last_before( dn_upper, fall )
+        fall, stop_f = fall[ok], stop_f[ok]
+
+        t_up = _cross_time( data, rise, upper )
+        t_lo = _cross_time( data, start, lower )
+        self.rise_time = t_up - t_lo
+        mid, _ = _last_before( up_mid, rise )
+        self.rise_mid = _cross_time( data, mid, middle )
+
+        t_lo = _cross_time( data, fall, lower )
+        t_up = _cross_time( data, stop_f, upper )
+        self.fall_time = t_lo - t_up
+        mid, _ = _last_before( dn_mid, fall )
+        self.fall_mid = _cross_time( data, mid, middle )
+
+    def period( self ):
+        if len(self.rise_mid) >= 2:
+            return (self.rise_mid[-1] - self.rise_mid[0]) / (len(self.rise_mid) - 1)
+        if len(self.fall_mid) >= 2:
+            return (self.fall_mid[-1] - self.fall_mid[0]) / (len(self.fall_mid) - 1)
+        return None
+
+    def positive_width( self ):
+        if len(self.rise_mid) == 0:
+            return None
+        fall, ok = _first_after( self.fall_mid, self.rise_mid )
+        if not ok.any():
+            return None
+        return float( np.mean(fall[ok] - self.rise_mid[ok]) )
+
+############################################################################
+
+def _to_volts( value, params, offset=True ):
+    if value is None or params is None:
+        return value
+    if offset:
+        value = value - params['yref'] - params['yorg']
+    return value * params['yinc']
+
+def _to_seconds( value, xinc ):
+    if value is None:
+        return None
+    return float( value * xinc )
+
+def measure( data, xinc=None, params=None ):
+    # all single-channel measurements of the data as a dict:
+    #   vmax, vmin, vpp, vtop, vbase, vamp, vavg, vrms,
+    #   period, freq, rtime, ftime, pwidth, nwidth, pduty
+    # 'xinc' is the sample interval (from params if not given)
+    data = np.asarray( data ).ravel()
+    if xinc is None:
+        xinc = params['xinc'] if params is not None else 1.0
+    levels = _amplitudes( data )
+    edges = Edges( data, levels )
+
+    result = {}
+    for name in ('vmax', 'vmin', 'vtop', 'vbase', 'vavg'):
+        result[name] = float( _to_volts(levels[name], params) )
+    result['vpp'] = float( _to_volts(levels['vmax'] - levels['vmin'], params, False) )
+    result['vamp'] = float( _to_volts(levels['vtop'] - levels['vbase'], params, False) )
+
+    vms = levels['vms']
+    if params is not None and data.dtype == np.uint8:
+        # E[(c - off)^2] = E[c^2] - 2 off E[c] + off^2
+        off = params['yref'] + params['yorg']
+        vms = (vms - 2*off*levels['vavg'] + off*off) * params['yinc']**2
+    result['vrms'] = float( np.sqrt(vms) )
+
+    period = edges.period()
+    result['period'] = _to_seconds( period, xinc )
+    result['freq'] = (1.0 / result['period']) if period else None
+    result['rtime'] = _to_seconds( np.mean(edges.rise_time), xinc ) \
+                          if len(edges.rise_time) else None
+    result['ftime'] = _to_seconds( np.mean(edges.fall_time), xinc ) \
+                          if len(edges.fall_time) else None
+    pwidth = edges.positive_width()
+    result['pwidth'] = _to_seconds( pwidth, xinc )
+    if period and pwidth is not None:
+        result['nwidth'] = _to_seconds( period - pwidth, xinc )
+        result['pduty'] = float( pwidth / period )
+    else:
+        result['nwidth'] = result['pduty'] = None
+    return result
+
+def _delay( data_a, data_b, rising ):
+    # mean delay from A to B and the period of A (both in samples)
+    edges_a = Edges( np.asarray(data_a).ravel() )
+    edges_b = Edges( np.asarray(data_b).ravel() )
+    if rising:
+        t_a, t_b = edges_a.rise_mid, edges_b.rise_mid
+    else:
+        t_a, t_b = edges_a.fall_mid, edges_b.fall_mid
+    period = edges_a.period()
+    if len(t_a) == 0 or len(t_b) == 0 or period is None:
+        return None, period
+    nearest, ok = _first_after( t_b, t_a - 0.5*period )
+    if not ok.any():
+        return None, period
+    return float( np.mean(nearest[ok] - t_a[ok]) ), period
+
+def delay( data_a, data_b, xinc=1.0, rising=True ):
+    # delay (in seconds) from the edges of A to the nearest edges of B
+    dt, _ = _delay( data_a, data_b, rising )
+    return _to_seconds( dt, xinc )
+
+def phase( data_a, data_b, rising=True ):
+    # phase difference (in degrees) from A to B, in -180..+180
+    dt, period = _delay( data_a, data_b, rising )
+    if dt is None:
+        return None
+    return 360.0 * dt / period
+
+############################################################################
+
+def sine_fit( data, freq, xinc, params=None ):
+    # fit data = a*cos(w*t) + b*sin(w*t) + c at the known frequency,
+    # returns (amplitude, phase in degrees, offset), phase of a cosine
+    data = np.asarray( data ).ravel()
+    wt = (2*np.pi*freq*xinc) * np.arange( len(data) )
+    cos_wt, sin_wt = np.cos( wt ), np.sin( wt )
+    y = data.astype( np.float64 )
+    # normal equations of the least-squares problem
+    m = np.empty( (3, 3) )
+    m[0, 0] = np.dot( cos_wt, cos_wt )
+    m[1, 1] = np.dot( sin_wt, sin_wt )
+    m[0, 1] = m[1, 0] = np.dot( cos_wt, sin_wt )
+    m[0, 2] = m[2, 0] = cos_wt.sum()
+    m[1, 2] = m[2, 1] = sin_wt.sum()
+    m[2, 2] = len(y)
+    v = np.array( [np.dot(cos_wt, y), np.dot(sin_wt, y), y.sum()] )
+    a, b, c = np.linalg.solve( m, v )
+    amplitude = np.hypot( a, b )
+    phase = np.degrees( np.arctan2(-b, a) )
+    if params is not None:
+        amplitude = _to_volts( amplitude, params, False )
+        c = _to_volts( c, params )
+    return float(amplitude), float(phase), float(c)
+
+def gain_phase( data_in, data_out, freq, xinc, params_in=None, params_out=None ):
+    # amplitude ratio (out/in) and phase shift (out - in, in degrees,
+    # -180..+180) of two channels captured at the same time
+    amp_in, phase_in, _ = sine_fit( data_in, freq, xinc, params_in )
+    amp_out, phase_out, _ = sine_fit( data_out, freq, xinc, params_out )
+    if amp_in == 0:
+        return None, None
+    phase = (phase_out - phase_in + 180.0) % 360.0 - 180.0
+    return amp_out / amp_in, phase
+
+############################################################################
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Metrics of the instruments of a bench: counters, gauges and latency
+#    histograms in a registry, exported
+#     - on a local HTTP endpoint in the Prometheus text format (/metrics)
+#     - as periodic JSON snapshots (written to a temporary file, then
+#       renamed, so a reader never sees a partly written file)
+#    start() feeds the registry from the command layer (a listener of
+#    the command tracer, rigol_trace.py, which does not keep the spans):
+#      rigol_commands_total{instrument,kind}    commands
+#      rigol_command_seconds{kind}              latency histogram
+#      rigol_bytes_written_total{instrument}    bytes to the instrument
+#      rigol_bytes_read_total{instrument}       bytes from the instrument
+#      rigol_timeouts_total{instrument}         timed out reads
+#      rigol_read_errors_total{instrument}      other failed reads
+#      rigol_instrument_errors_total{instrument} 'SYST:ERR?' entries
+#      rigol_sleep_seconds_total                fixed sleeps ('dly')
+#      rigol_transfer_bytes_per_second{instrument} the last waveform read
+#    and from the other modules (also without start()):
+#      rigol_captures_total                     rigol_ds.read_norm/read_raw
+#      rigol_step_retries_total                 rigol_journal.run_steps
+#    scrape() is a simple scraper of the endpoint (e.g. for tests).
+############################################################################
+# Usage:
+#   rigol_metrics.start()                      # collect the metrics
+#   rigol_metrics.serve( port=9105 )           # http://127.0.0.1:9105/metrics
+#   rigol_metrics.SnapshotWriter( 'metrics.json', interval=10.0 ).start()
+#
+#   $ python3 ./rigol_metrics.py --sim [--port 9105] [--snapshot metrics.json]
+#   $ python3 ./rigol_metrics.py --scrape http://127.0.0.1:9105/metrics
+#
+############################################################################
+
+import os, sys, time, json
+import argparse
+import threading
+import bisect
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.request import urlopen
+
+import rigol_instr
+import rigol_trace
+
+LATENCY_BUCKETS = ( 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+                    1.0, 2.0, 5.0, 10.0 )
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+############################################################################
+
+def _escape( value ):
+    return str( value ).replace( '\\', '\\\\' ).replace( '"', '\\"' ).replace( '\n', '\\n' )
+
+def _label_text( names, values, extra=() ):
+    pairs = list( zip(names, values) ) + list( extra )
+    if not pairs:
+        return ''
+    return '{' + ','.join( '%s="%s"' % (n, _escape(v)) for n, v in pairs ) + '}'
+
+def _number( value ):
+    if value == float('inf'):
+        return '+Inf'
+    return repr( float(value) )
+
+class Metric(object):
+
+    TYPE = 'untyped'
+
+    def __init__( self, name, help='', labels=() ):
+        self.name = name
+        self.help = help
+        self.labels = tuple( labels )
+        self.values = {}   # label values -> value
+        self._lock = threading.Lock()
+
+    def _key( self, labels ):
+        if set( labels ) != set( self.labels ):
+            raise ValueError( '%s: labels %s expected' % (self.name, self.labels) )
+        return tuple( str(labels[name]) for name in self.labels )
+
+    def samples( self ):
+        # [(name, label text, value)]
+        with self._lock:
+            return [ (self.name, _label_text(self.labels, key), value)
+                     for key, value in sorted(self.values.items()) ]
+
+    def snapshot( self ):
+        with self._lock:
+            return [ {'labels': dict(zip(self.labels, key)), 'value': value}
+                     for key, value in sorted(self.values.items()) ]
+
+class Counter(Metric):
+
+    TYPE = 'counter'
+
+    def inc( self, amount=1.0, **labels ):
+        key = self._key( labels )
+        with self._lock:
+            self.values[key] = self.values.get( key, 0.0 ) + amount
+
+class Gauge(Metric):
+
+    TYPE = 'gauge'
+
+    def set( self, value, **labels ):
+        key = self._key( labels )
+        with self._lock:
+            self.values[key] = float( value )
+
+class Histogram(Metric):
+
+    TYPE = 'histogram'
+
+    def __init__( self, name, help='', labels=(), buckets=LATENCY_BUCKETS ):
+        Metric.__init__( self, name, help, labels )
+        self.buckets = tuple( sorted(buckets) )
+
+    def observe( self, value, **labels ):
+        key = self._key( labels )
+        with self._lock:
+            entry = self.values.get( key )
+            if entry is None:
+                # [count per bucket (+Inf last), sum, count]
+                entry = self.values[key] = [ [0] * (len(self.buckets) + 1), 0.0, 0 ]
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples( self ):
+        result = []
+        with self._lock:
+            for key, (counts, total, count) in sorted( self.values.items() ):
+                cumulative = 0
+                for le, n in zip( self.buckets + (float('inf'),), counts ):
+                    cumulative += n
+                    result.append( (self.name + '_bucket',
+                                    _label_text(self.labels, key, [('le', _number(le))]),
+                                    cumulative) )
+                labels = _label_text( self.labels, key )
+                result.append( (self.name + '_sum', labels, total) )
+                result.append( (self.name + '_count', labels, count) )
+        return result
+
+    def snapshot( self ):
+        with self._lock:
+            return [ {'labels': dict(zip(self.labels, key)),
+                      'buckets': dict(zip([_number(le) for le in self.buckets + (float('inf'),)],
+                                          counts)),
+                      'sum': total, 'count': count}
+                     for key, (counts, total, count) in sorted(self.values.items()) ]
+
+############################################################################
+
+class Registry(object):
+
+    def __init__( self ):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get( self, cls, name, help, labels, **options ):
+        with self._lock:
+            metric = self.metrics.get( name )
+            if metric is None:
+                metric = self.metrics[name] = cls( name, help, labels, **options )
+            elif not isinstance( metric, cls ):
+                raise ValueError( '%s is a %s' % (name, metric.TYPE) )
+            return metric
+
+    def counter( self, name, help='', labels=() ):
+        return self._get( Counter, name, help, labels )
+
+    def gauge( self, name, help='', labels=() ):
+        return self._get( Gauge, name, help, labels )
+
+    def histogram( self, name, help='', labels=(), buckets=LATENCY_BUCKETS ):
+        return self._get( Histogram, name, help, labels, buckets=buckets )
+
+    def render( self ):
+        # the Prometheus text format
+        lines = []
+        for name in sorted( self.metrics ):
+            metric = self.metrics[name]
+            if metric.help:
+                lines.append( '# HELP %s %s' % (name, metric.help.replace('\n', ' ')) )
+            lines.append( '# TYPE %s %s' % (name, metric.TYPE) )
+            for sample, labels, value in metric.samples():
+                lines.append( '%s%s %s' % (sample, labels, _number(value)) )
+        return '\n'.join( lines ) + '\n'
+
+    def snapshot( self ):
+        return { 'time': time.time(),
+                 'metrics': dict( (name, {'type': m.TYPE, 'values': m.snapshot()})
+                                  for name, m in self.metrics.items() ) }
+
+REGISTRY = Registry()
+
+############################################################################
+
+class InstrumentMetrics(object):
+    # listener of the command tracer: updates the registry for each command
+
+    def __init__( self, registry=REGISTRY ):
+        labels = ('instrument',)
+        self.commands = registry.counter( 'rigol_commands_total', 'Commands sent',
+                                          ('instrument', 'kind') )
+        self.latency = registry.histogram( 'rigol_command_seconds',
+                                           'Command latency (write, sleep, read)', ('kind',) )
+        self.written = registry.counter( 'rigol_bytes_written_total',
+                                         'Bytes written to the instrument', labels )
+        self.read = registry.counter( 'rigol_bytes_read_total',
+                                      'Bytes read from the instrument', labels )
+        self.timeouts = registry.counter( 'rigol_timeouts_total', 'Timed out reads', labels )
+        self.errors = registry.counter( 'rigol_read_errors_total', 'Failed reads', labels )
+        self.instrument_errors = registry.counter( 'rigol_instrument_errors_total',
+                                                   'Error queue entries (SYST:ERR?)', labels )
+        self.sleep = registry.counter( 'rigol_sleep_seconds_total', 'Fixed sleeps' )
+        self.rate = registry.gauge( 'rigol_transfer_bytes_per_second',
+                                    'Throughput of the last waveform read', labels )
+
+    def __call__( self, span, resp ):
+        name = rigol_trace.instrument_name( span.instr )
+        self.commands.inc( instrument=name, kind=span.kind )
+        self.latency.observe( span.write + span.sleep + span.read, kind=span.kind )
+        self.written.inc( span.bytes_out, instrument=name )
+        self.sleep.inc( span.sleep )
+        if span.error is not None:
+            if 'TMO' in span.error or 'imeout' in span.error:
+                self.timeouts.inc( instrument=name )
+            else:
+                self.errors.inc( instrument=name )
+            return
+        if span.bytes_in:
+            self.read.inc( span.bytes_in, instrument=name )
+        head = span.command.split(' ')[0].upper().lstrip(':')
+        if head in ('SYST:ERR?', 'SYSTEM:ERROR?') and resp is not None and \
+           not resp.strip().startswith( ('0,', '+0,') ):
+            self.instrument_errors.inc( instrument=name )
+        if head in ('WAV:DATA?', 'WAVEFORM:DATA?') and span.read > 0:
+            self.rate.set( span.bytes_in / span.read, instrument=name )
+
+def start( registry=REGISTRY ):
+    # collect the metrics of the command layer (also while tracing: the
+    # listeners are kept by rigol_trace.start() and stop())
+    tracer = rigol_instr.tracer
+    if tracer is None:
+        tracer = rigol_instr.tracer = rigol_trace.Tracer( keep=False )
+    listener = InstrumentMetrics( registry )
+    tracer.listeners.append( listener )
+    return listener
+
+def stop( listener ):
+    tracer = rigol_instr.tracer
+    if tracer is None:
+        return
+    if listener in tracer.listeners:
+        tracer.listeners.remove( listener )
+    if not tracer.listeners and not tracer.keep:
+        rigol_instr.tracer = None
+
+def count( name, help='', amount=1.0 ):
+    # increment a counter without labels of the default registry
+    REGISTRY.counter( name, help ).inc( amount )
+
+############################################################################
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+def serve( registry=REGISTRY, port=9105, host='127.0.0.1' ):
+    # the endpoint http://host:port/metrics in a background thread;
+    # returns the server (server.shutdown() stops it)
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET( self ):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error( 404 )
+                return
+            body = registry.render().encode( 'utf-8' )
+            self.send_response( 200 )
+            self.send_header( 'Content-Type', CONTENT_TYPE )
+            self.send_header( 'Content-Length', str(len(body)) )
+            self.end_headers()
+            self.wfile.write( body )
+        def log_message( self, format, *args ):
+            pass
+    server = _ThreadingHTTPServer( (host, port), Handler )
+    thread = threading.Thread( target=server.serve_forever, daemon=True )
+    thread.start()
+    return server
+
+class SnapshotWriter(threading.Thread):
+    # writes registry.snapshot() to a JSON file every 'interval' seconds
+
+    def __init__( self, filename, interval=10.0, registry=REGISTRY ):
+        threading.Thread.__init__( self, daemon=True )
+        self.filename = filename
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+
+    def write( self ):
+        tmp_name = self.filename + '.tmp'
+        with open( tmp_name, 'w' ) as f:
+            json.dump( self.registry.snapshot(), f, indent=1, sort_keys=True )
+        os.replace( tmp_name, self.filename )
+
+    def run( self ):
+        while not self._stop_event.wait( self.interval ):
+            self.write()
+
+    def stop( self ):
+        self._stop_event.set()
+        self.join()
+        self.write()
+
+############################################################################
+
+def parse_text( text ):
+    # Prometheus text format -> {'name{labels}': value}
+    values = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        sample, _, value = line.rpartition( ' ' )
+        values[sample] = float( value )
+    return values
+
+def scrape( url, timeout=5.0 ):
+    with urlopen( url, timeout=timeout ) as resp:
+        return parse_text( resp.read().decode('utf-8') )
+
+############################################################################
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Metrics of the Rigol instruments' )
+    parser.add_argument( '--sim', action='store_true',
+                         help='capture from a simulated DS2000A (rigol_sim.py)' )
+    parser.add_argument( '--port', type=int, default=9105 )
+    parser.add_argument( '--snapshot', default=None, help='JSON snapshot file' )
+    parser.add_argument( '--interval', type=float, default=10.0 )
+    parser.add_argument( '--duration', type=float, default=None )
+    parser.add_argument( '--scrape', metavar='URL', default=None,
+                         help='read and print the metrics of an endpoint' )
+    args = parser.parse_args( argv )
+
+    if args.scrape:
+        for sample, value in sorted( scrape(args.scrape).items() ):
+            print ( '{} {}'.format(sample, value) )
+        return 0
+    if not args.sim:
+        print ( 'Use --sim or --scrape' )
+        return -1
+
+    # the registry of the imported module (also used by rigol_ds), not __main__
+    import rigol_ds, rigol_sim
+    import rigol_metrics
+    rigol_metrics.start()
+    server = rigol_metrics.serve( port=args.port )
+    writer = None
+    if args.snapshot:
+        writer = rigol_metrics.SnapshotWriter( args.snapshot, args.interval )
+        writer.start()
+    print ( 'Metrics on http://127.0.0.1:{:d}/metrics'.format(args.port) )
+    ds = rigol_sim.SimScope( faults={'timeout': 0.01, 'error': 0.01},
+                              seed=int(time.time()) )
+    ds.timeout = 100
+    t_end = time.time() + args.duration if args.duration else None
+    try:
+        while t_end is None or time.time() < t_end:
+            try:
+                rigol_ds.read_channels( ds, (1, 2) )
+            except ValueError:
+                pass   # no data (timeout), counted by the metrics
+            rigol_instr.read_error( ds )
+    except KeyboardInterrupt:
+        pass
+    if writer is not None:
+        writer.stop()
+    server.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
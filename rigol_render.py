@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Headless (batch) rendering of saved waveform captures to PNG files.
+#    Matplotlib runs on the Agg backend (no GUI, no plot.show()) and the
+#    captures are rendered in parallel by a pool of worker processes.
+#    Each worker creates its figure only once and reuses it as a template
+#    for all captures it renders (only the line data and labels change).
+############################################################################
+# Usage:
+#   $ python3 ./rigol_render.py <capture_dir> [-o <png_dir>] [-j <procs>]
+#
+############################################################################
+
+import os, sys, time
+import argparse
+import functools
+import multiprocessing
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plot
+
+import rigol_capture
+
+FIG_SIZE   = (12, 4)
+FIG_DPI    = 100
+SAVE_DPI   = 200
+PLOT_WIDTH = 4000   # max. number of min/max pairs to be plotted
+
+_template = None    # (figure, axes, line) reused by the current process
+
+############################################################################
+
+def _get_template():
+    global _template
+    if _template is None:
+        fig = plot.figure( figsize=FIG_SIZE, dpi=FIG_DPI )
+        ax = fig.add_subplot( 111 )
+        line, = ax.plot( [], [] )
+        ax.set_ylabel( 'Voltage [V]' )
+        ax.grid( True )
+        _template = (fig, ax, line)
+    return _template
+
+def render_capture( basename, out_dir=None, dpi=SAVE_DPI ):
+    fig, ax, line = _get_template()
+    data, params = rigol_capture.load_capture( basename )
+
+    idx, values = rigol_capture.decimate_minmax( data, PLOT_WIDTH )
+    volts = rigol_capture.to_volts( values, params )
+    ts = rigol_capture.time_axis( params, idx )
+    scale, ts_unit = rigol_capture.time_unit( ts[-1] )
+    ts *= scale
+
+    line.set_data( ts, volts )
+    ax.set_xlim( ts[0], ts[-1] )
+    v_min, v_max = float(volts.min()), float(volts.max())
+    margin = 0.05 * (v_max - v_min) or 0.1
+    ax.set_ylim( v_min - margin, v_max + margin )
+
+    title = 'Waveform Capture [CH{:d}; {:,} Points'.format(
+                 int(params.get('channel', 1)), len(data) )
+    if params.get('sampling_rate'):
+        title += '; {:,} Ksps'.format( int(1e-3*params['sampling_rate']) )
+    ax.set_title( title + ']' )
+    ax.set_xlabel( 'Time [%s]' % ts_unit )
+
+    if out_dir is None:
+        png_file = basename + '.png'
+    else:
+        png_file = os.path.join( out_dir, os.path.basename(basename) + '.png' )
+    fig.savefig( png_file, dpi=dpi, bbox_inches='tight' )
+    return png_file
+
+def render_directory( directory, out_dir=None, processes=None, dpi=SAVE_DPI ):
+    captures = rigol_capture.list_captures( directory )
+    if out_dir is not None and not os.path.isdir( out_dir ):
+        os.makedirs( out_dir )
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = max( 1, min(processes, len(captures)) )
+
+    render = functools.partial( render_capture, out_dir=out_dir, dpi=dpi )
+    if processes == 1:
+        return [ render(name) for name in captures ]
+
+    chunk_size = max( 1, len(captures) // (4*processes) )
+    pool = multiprocessing.Pool( processes )
+    try:
+        png_files = pool.map( render, captures, chunk_size )
+    finally:
+        pool.close()
+        pool.join()
+    return png_files
+
+############################################################################
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser(
+        description='Render saved Rigol waveform captures to PNG files' )
+    parser.add_argument( 'directory', help='directory of saved captures' )
+    parser.add_argument( '-o', '--out-dir', default=None,
+                         help='output directory (default: next to captures)' )
+    parser.add_argument( '-j', '--processes', type=int, default=None,
+                         help='number of worker processes (default: #cores)' )
+    parser.add_argument( '--dpi', type=int, default=SAVE_DPI )
+    args = parser.parse_args( argv )
+
+    t_start = time.time()
+    png_files = render_directory( args.directory, args.out_dir,
+                                  args.processes, args.dpi )
+    t_used = time.time() - t_start
+    print ( 'Rendered {:d} captures in {:.2f} sec'.format(len(png_files), t_used) )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Record and replay of the SCPI traffic with an instrument, e.g. to
+#    benchmark changes of the read pipeline (chunk size, decoding) with a
+#    recorded 14M-point session, without the oscilloscope.
+#     - SessionRecorder : a wrapper of an opened resource (pyvisa or
+#                         rigol_sim.py); every write, write_raw, read and
+#                         read_raw is saved to a binary session file
+#     - SessionReplay   : a resource which answers with the recorded
+#                         replies, with the recorded timing (or faster /
+#                         slower: 'speed'), or without delays (speed=0)
+#    The session file: 'RIGOLSES' + version (1 byte), then one record per
+#    operation: kind (1 byte), start time (s, float64, from the start of
+#    the session), duration (s, float32), payload length (uint32), payload.
+#      'w' write (command text)     'W' write_raw (bytes)
+#      'r' read  (reply text)       'R' read_raw  (bytes)
+#      'x' failed read (the error message, e.g. a timeout)
+#    Replay: the n-th read after a query gets the n-th recorded reply of
+#    the same query, so added or removed setting commands do not matter
+#    (the last reply is repeated when all replies have been used).
+#    The reply of ':WAV:DATA?' (RAW mode) also depends on the source and
+#    the ':WAV:STAR'/':WAV:STOP' range: a range which was not recorded as
+#    one read is cut from the recorded memory data (other chunking), and
+#    its transfer time is estimated from the recorded reads (latency +
+#    bytes / throughput).
+############################################################################
+# Usage:
+#   ds = rigol_session.SessionRecorder( ds, 'run1.ses' )   # record
+#   ...
+#   ds.close()
+#   ds = rigol_session.SessionReplay( 'run1.ses', speed=1.0 )   # replay
+#
+#   $ python3 ./rigol_session.py run1.ses      (summary of a session)
+#
+############################################################################
+
+import sys, time, struct
+import collections
+import numpy as np
+
+from rigol_instr import make_block, parse_block
+from rigol_sim import normalize_header
+
+MAGIC = b'RIGOLSES'
+VERSION = 1
+RECORD = struct.Struct( '<cdfI' )   # kind, start, duration, payload length
+
+WRITE_KINDS = ( b'w', b'W' )
+
+class ReplayError(Exception):
+    pass
+
+############################################################################
+
+class SessionRecorder(object):
+
+    def __init__( self, instr, filename ):
+        self.__dict__['instr'] = instr
+        self.__dict__['_file'] = open( filename, 'wb' )
+        self.__dict__['_t0'] = time.time()
+        self._file.write( MAGIC + struct.pack('<B', VERSION) )
+
+    # the other attributes are those of the resource (timeout, chunk_size)
+    def __getattr__( self, name ):
+        return getattr( self.instr, name )
+
+    def __setattr__( self, name, value ):
+        setattr( self.instr, name, value )
+
+    def _record( self, kind, t_start, payload ):
+        if isinstance( payload, str ):
+            payload = payload.encode( 'utf-8' )
+        self._file.write( RECORD.pack(kind, t_start - self._t0,
+                                      time.time() - t_start, len(payload)) )
+        self._file.write( payload )
+
+    def write( self, cmd ):
+        t_start = time.time()
+        result = self.instr.write( cmd )
+        self._record( b'w', t_start, cmd )
+        return result
+
+    def write_raw( self, data ):
+        t_start = time.time()
+        result = self.instr.write_raw( data )
+        self._record( b'W', t_start, bytes(data) )
+        return result
+
+    def read( self ):
+        t_start = time.time()
+        try:
+            resp = self.instr.read()
+        except Exception as ex:
+            self._record( b'x', t_start, str(ex) )
+            raise
+        self._record( b'r', t_start, resp )
+        return resp
+
+    def read_raw( self, size=None ):
+        t_start = time.time()
+        try:
+            data = self.instr.read_raw() if size is None else self.instr.read_raw( size )
+        except Exception as ex:
+            self._record( b'x', t_start, str(ex) )
+            raise
+        self._record( b'R', t_start, bytes(data) )
+        return data
+
+    def query( self, cmd ):
+        self.write( cmd )
+        return self.read()
+
+    def close( self ):
+        if not self._file.closed:
+            self._file.close()
+        self.instr.close()
+
+############################################################################
+
+def read_session( filename ):
+    # returns the records [(kind, start, duration, payload), ...]
+    with open( filename, 'rb' ) as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError( 'Not a session file: %s' % filename )
+    pos = len(MAGIC) + 1
+    records = []
+    while pos + RECORD.size <= len(data):
+        kind, start, duration, length = RECORD.unpack_from( data, pos )
+        pos += RECORD.size
+        if pos + length > len(data):
+            break   # incomplete last record (interrupted recording)
+        records.append( (kind, start, duration, data[pos:pos+length]) )
+        pos += length
+    return records
+
+def _queries( cmd ):
+    # the queries of a message, e.g. ':MEAS:VPP? CHAN1;:MEAS:FREQ?'
+    return [ part.strip() for part in cmd.split(';') if '?' in part.split(' ')[0] ]
+
+class _WaveState(object):
+    # the settings which select the data of ':WAV:DATA?'
+
+    def __init__( self ):
+        self.source, self.mode, self.start, self.stop = 'CHAN1', 'NORM', 1, 1200
+
+    def update( self, cmd ):
+        for part in cmd.split(';'):
+            head, _, arg = part.strip().partition( ' ' )
+            head = normalize_header( head )
+            if head == 'WAV:SOUR':
+                self.source = arg.strip().upper()
+            elif head == 'WAV:MODE':
+                self.mode = 'RAW' if arg.strip().upper().startswith( ('RAW', 'MAX') ) else 'NORM'
+            elif head == 'WAV:STAR':
+                self.start = int( arg )
+            elif head == 'WAV:STOP':
+                self.stop = int( arg )
+
+    def key( self, cmd ):
+        # the key of the reply of a query
+        heads = [ normalize_header(q.split(' ')[0]) for q in _queries(cmd) ]
+        if 'WAV:DATA?' in heads and self.mode == 'RAW':
+            return (cmd.strip(), self.source, self.start, self.stop)
+        return cmd.strip()
+
+class SessionReplay(object):
+
+    def __init__( self, filename, speed=1.0, strict=False ):
+        self.speed = speed     # 2.0: twice as fast, 0 or None: no delays
+        self.strict = strict   # the writes must be the recorded writes
+        self.timeout = 1000
+        self.chunk_size = 102400
+        self.records = read_session( filename )
+        self.replies = collections.defaultdict( collections.deque )
+        self.memory = {}       # source -> {start: samples} (RAW mode reads)
+        self.block_digits, self.block_end = 9, b'\n'
+        self._writes = [ r for r in self.records if r[0] in WRITE_KINDS ]
+        self._load()
+        self._state = _WaveState()
+        self._key = None       # the key of the last query
+        self._write_index = 0
+
+    def _load( self ):
+        # the time of a query write is added to the time of its first read
+        # (the instrument may prepare the reply while the query is written)
+        state = _WaveState()
+        key = None
+        query_time = 0.0
+        sizes, durations, write_durations = [], [], []
+        for kind, start, duration, payload in self.records:
+            if kind in WRITE_KINDS:
+                cmd = payload.decode( 'ascii', 'replace' ) if kind == b'w' else \
+                      payload[:200].decode( 'ascii', 'replace' )
+                state.update( cmd )
+                if _queries( cmd ):
+                    key = state.key( cmd )
+                    query_time = duration
+                else:
+                    write_durations.append( duration )
+            elif key is not None:
+                duration += query_time
+                query_time = 0.0
+                self.replies[key].append( (kind, duration, payload) )
+                sizes.append( len(payload) )
+                durations.append( duration )
+                if kind == b'R' and isinstance( key, tuple ):
+                    block = parse_block( payload )
+                    self.memory.setdefault( key[1], {} )[key[2]] = \
+                        np.frombuffer( block, dtype=np.uint8 )
+                    # the same block format (e.g. '#9' and '\n')
+                    self.block_digits = int( payload[1:2] )
+                    self.block_end = payload[2+self.block_digits+len(block):]
+        # transfer time of a read: latency + bytes / throughput (least squares)
+        self.latency, self.seconds_per_byte = 0.0, 0.0
+        if len(set(sizes)) > 1:
+            slope, intercept = np.polyfit( sizes, durations, 1 )
+            self.latency, self.seconds_per_byte = max(intercept, 0.0), max(slope, 0.0)
+        self.write_time = float( np.median(write_durations) ) if write_durations else 0.0
+
+    def _delay( self, seconds ):
+        if self.speed:
+            time.sleep( seconds / self.speed )
+
+    def _memory_block( self, source, start, stop ):
+        # the samples start..stop cut from the recorded RAW mode reads
+        chunks = self.memory.get( source, {} )
+        out = np.empty( stop - start + 1, dtype=np.uint8 )
+        pos = start
+        while pos <= stop:
+            for first in sorted( chunks ):
+                if first <= pos < first + len(chunks[first]):
+                    n = min( first + len(chunks[first]), stop + 1 ) - pos
+                    out[pos-start:pos-start+n] = chunks[first][pos-first:pos-first+n]
+                    pos += n
+                    break
+            else:
+                raise ReplayError( 'Samples %d..%d of %s were not recorded'
+                                   % (start, stop, source) )
+        return make_block( out.tobytes(), self.block_digits ) + self.block_end
+
+    ########################################################################
+
+    def _write( self, kind, payload ):
+        if self.strict:
+            expected = self._writes[self._write_index] \
+                       if self._write_index < len(self._writes) else None
+            if expected is None or (expected[0], expected[3]) != (kind, payload):
+                raise ReplayError( 'Write #%d differs from the recording: %r'
+                                   % (self._write_index, payload[:80]) )
+        self._write_index += 1
+        cmd = (payload if kind == b'w' else payload[:200]).decode( 'ascii', 'replace' )
+        self._state.update( cmd )
+        if _queries( cmd ):
+            self._key = self._state.key( cmd )
+        else:
+            self._delay( self.write_time )
+        return len( payload )
+
+    def write( self, cmd ):
+        return self._write( b'w', cmd.encode('utf-8') )
+
+    def write_raw( self, data ):
+        return self._write( b'W', bytes(data) )
+
+    def _reply( self ):
+        key = self._key
+        queue = self.replies.get( key )
+        if queue:
+            # the last reply is repeated when the others have been used
+            kind, duration, payload = queue.popleft() if len(queue) > 1 else queue[0]
+        elif isinstance( key, tuple ):
+            payload = self._memory_block( *key[1:] )
+            kind, duration = b'R', self.latency + len(payload) * self.seconds_per_byte
+        else:
+            raise ReplayError( 'No recorded reply to %r' % (key,) )
+        self._delay( duration )
+        if kind == b'x':
+            raise IOError( payload.decode('utf-8', 'replace') )
+        return payload
+
+    def read( self ):
+        return self._reply().decode( 'utf-8', 'replace' )
+
+    def read_raw( self, size=None ):
+        return self._reply()
+
+    def query( self, cmd ):
+        self.write( cmd )
+        return self.read()
+
+    def close( self ):
+        pass
+
+############################################################################
+
+def summary( records ):
+    # per command: [count, bytes read, time of the reads]
+    stats = collections.OrderedDict()
+    cmd = None
+    for kind, start, duration, payload in records:
+        if kind in WRITE_KINDS:
+            cmd = payload[:40].decode( 'ascii', 'replace' ).strip()
+            cmd = normalize_header( cmd.split(' ')[0] ) if '?' in cmd else None
+        elif cmd is not None:
+            entry = stats.setdefault( cmd, [0, 0, 0.0] )
+            entry[0] += 1
+            entry[1] += len( payload )
+            entry[2] += duration
+    return stats
+
+def main( argv=None ):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print ( 'Usage: rigol_session.py <session file>' )
+        return -1
+    records = read_session( argv[0] )
+    if not records:
+        print ( 'Empty session' )
+        return 0
+    print ( '{:d} records, {:.3f} s'.format(len(records),
+            records[-1][1] + records[-1][2] - records[0][1]) )
+    print ( '{:>32s} {:>6s} {:>12s} {:>9s}'.format('query', 'count', 'bytes', 'time') )
+    for cmd, (count, size, seconds) in summary( records ).items():
+        print ( '{:>32s} {:>6d} {:>12d} {:>8.3f}s'.format(cmd[:32], count, size, seconds) )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,724 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Simulated Rigol instruments for offline tests and benchmarks
+#    (no USB device needed):
+#     - SimScope     : DS2000A (DS2072A), DS1000E (DS1052E) or DS1000Z
+#                      (DS1054Z) digital oscilloscope
+#     - SimGenerator : DG1022 function generator (two channels)
+#    The objects have the same methods as a pyvisa resource (write,
+#    write_raw, read, read_raw, query, close) and answer the SCPI commands
+#    used by the scripts, e.g. '*IDN?', ':WAV:PRE?', ':WAV:DATA?' (a binary
+#    block with the header of the model: '#9' or '#8'), ':MEAS:xxx?',
+#    ':TRIG:STAT?', 'DATA:DAC', 'APPL:SIN', also compound queries
+#    separated by ';' (one answer, the values separated by ';').
+#    Other settings are stored and returned by the query ('X 1', 'X?').
+#    The time of a USB transfer is simulated from the link throughput
+#    ('bytes_per_sec'), a per-command/per-chunk latency, and the time the
+#    instrument is busy (e.g. parsing waveform data), which a query
+#    (e.g. '*OPC?') waits for. Faults can be injected with a probability
+#    per read or command:
+#       faults = {'timeout': 0.01, 'drop': 0.0, 'corrupt': 0.0, 'error': 0.0}
+#     - timeout : the read times out, the answer is kept (a retry works)
+#     - drop    : the answer is lost (the read times out)
+#     - corrupt : one byte of the answer is changed
+#     - error   : the command is ignored (-113 in the error queue)
+#    Each oscilloscope channel shows a sine wave (set_signal), a function
+#    of time, or an output of a SimGenerator (connect), optionally through
+#    a frequency response, e.g. rc_lowpass(fc) (a device under test);
+#    a periodic non-sine output is filtered over one period (FFT).
+#    The acquisition time runs in real time and freezes on ':STOP'.
+#    make_bench() returns a DS oscilloscope and a DG1022 connected like
+#    the bench of ds2000a_dg1022_freq_sweep.py; see pyvisa_rigolsim.py
+#    for the pyvisa back end ('@rigolsim').
+############################################################################
+
+import time
+import numpy as np
+
+import rigol_capture
+import rigol_measure
+from rigol_instr import make_block, parse_block
+
+RIGOL_VENDOR_ID = 0x1AB1
+INVALID = '9.9E37'   # the answer of an invalid measurement
+
+# the short forms of the SCPI mnemonics used in the long form
+SHORT_FORMS = {
+    'WAVEFORM': 'WAV', 'SOURCE': 'SOUR', 'TIMEBASE': 'TIM', 'SCALE': 'SCAL',
+    'CHANNEL': 'CHAN', 'MEASURE': 'MEAS', 'TRIGGER': 'TRIG', 'STATUS': 'STAT',
+    'ACQUIRE': 'ACQ', 'SYSTEM': 'SYST', 'REMOTE': 'REM', 'OFFSET': 'OFFS',
+    'FREQUENCY': 'FREQ', 'VOLTAGE': 'VOLT', 'OUTPUT': 'OUTP', 'FUNCTION': 'FUNC',
+    'PHASE': 'PHAS', 'SWEEP': 'SWE', 'DELETE': 'DEL', 'DELELETE': 'DEL',
+    'CATALOG': 'CAT', 'ATTRIBUTE': 'ATTR', 'POINTS': 'POIN', 'ERROR': 'ERR',
+    'APPLY': 'APPL', 'PREAMBLE': 'PRE', 'START': 'STAR', 'FORMAT': 'FORM',
+    'SPACING': 'SPAC', 'STATE': 'STAT', 'PROBE': 'PROB', 'DISPLAY': 'DISP',
+    'COUPLING': 'COUP', 'MDEPTH': 'MDEP', 'SRATE': 'SRAT', 'SAMPLINGRATE': 'SAMP',
+    'LOCAL': 'LOC', 'AVERAGES': 'AVER', 'TYPE': 'TYP', 'SINGLE': 'SING',
+}
+
+############################################################################
+
+def normalize_header( head ):
+    # ':WAVeform:SOURce' -> 'WAV:SOUR', ':DATA:DELelete' -> 'DATA:DEL'
+    nodes = head.strip().upper().lstrip(':').split(':')
+    return ':'.join( SHORT_FORMS.get(node, node) for node in nodes )
+
+def rc_lowpass( fc ):
+    # frequency response of a first order RC lowpass filter
+    return lambda freq: 1.0 / (1.0 + 1j * np.asarray(freq) / fc)
+
+class SimInstrument(object):
+    # the link (USB transfers, latency, faults) and the SCPI message
+    # handling; the instruments implement _handle(head, arg)
+
+    IDN = 'RIGOL TECHNOLOGIES,SIM,SIM000000001,00.00.00'
+    PRODUCT_ID = 0x0000
+
+    def __init__( self, bytes_per_sec=1.0e6, latency=0.001, faults=None, seed=0 ):
+        self.bytes_per_sec = bytes_per_sec
+        self.latency = latency
+        self.faults = dict( faults or {} )
+        self.timeout = 1000        # ms (as pyvisa)
+        self.chunk_size = 102400
+        self.settings = {}
+        self.errors = []
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self._busy_until = 0.0
+        self._resp = b''
+        self._rng = np.random.RandomState( seed )
+        self._fault_rng = np.random.RandomState( seed + 1 )
+
+    @property
+    def serial( self ):
+        return self.IDN.split(',')[2].strip()
+
+    @property
+    def resource_name( self ):
+        return 'USB0::0x{:04X}::0x{:04X}::{}::INSTR'.format(
+                   RIGOL_VENDOR_ID, self.PRODUCT_ID, self.serial )
+
+    def _fault( self, name ):
+        p = self.faults.get( name, 0.0 )
+        return p > 0.0 and self._fault_rng.random_sample() < p
+
+    def _busy( self, seconds ):
+        self._busy_until = max( self._busy_until, time.time() ) + seconds
+
+    def _timeout( self ):
+        time.sleep( self.timeout / 1000.0 )
+        raise IOError( 'VI_ERROR_TMO (-1073807339): Timeout expired before operation completed.' )
+
+    ########################################################################
+
+    def _common( self, head, arg ):
+        # IEEE 488.2 common commands; returns (handled, answer)
+        if head == '*IDN?':
+            return True, self.IDN
+        if head == '*OPC?':
+            return True, '1'
+        if head in ('*OPC', '*WAI', '*TRG'):
+            return head != '*TRG', None
+        if head == '*CLS':
+            self.errors = []
+            return True, None
+        if head == 'SYST:ERR?':
+            return True, (self.errors.pop(0) if self.errors else '0,"No error"')
+        if head in ('SYST:REM', 'SYST:LOC'):
+            return True, None
+        return False, None
+
+    def _generic( self, head, arg ):
+        # store a setting / return a stored setting
+        if head.endswith('?'):
+            return str( self.settings.get(head[:-1], 0) )
+        self.settings[head] = arg
+        return None
+
+    def _message( self, data ):
+        # one message (one write), may contain several commands ';'
+        if self._fault( 'error' ):
+            self.errors.append( '-113,"Undefined header"' )
+            return
+        if b'#' in data and normalize_header( data.split(b' ')[0].decode(
+                                                'ascii', 'replace') ) == 'DATA:DAC':
+            parts = [ data ]   # a binary block is not split
+        else:
+            parts = data.decode( 'ascii', 'replace' ).split(';')
+        answers = []
+        for part in parts:
+            if isinstance( part, bytes ):
+                head, _, arg = part.lstrip().partition( b' ' )
+                head = head.decode()
+            else:
+                part = part.strip()
+                if not part:
+                    continue
+                head, _, arg = part.partition( ' ' )
+                arg = arg.strip()
+            head = normalize_header( head )
+            handled, answer = self._common( head, arg )
+            if not handled:
+                answer = self._handle( head, arg )
+            if answer is not None:
+                answers.append( answer )
+        if not answers:
+            return
+        if any( isinstance(answer, bytes) for answer in answers ):
+            self._resp = b''.join( a if isinstance(a, bytes) else a.encode()
+                                   for a in answers ) + b'\n'
+        else:
+            self._resp = (';'.join(answers) + '\n').encode()
+
+    def _handle( self, head, arg ):
+        return self._generic( head, arg )
+
+    ########################################################################
+
+    def write_raw( self, data ):
+        time.sleep( self.latency + len(data) / self.bytes_per_sec )
+        self.bytes_written += len( data )
+        self._message( bytes(data) )
+        return len( data )
+
+    def write( self, cmd ):
+        return self.write_raw( (cmd + '\n').encode() )
+
+    def read_chunk( self, count ):
+        # up to 'count' bytes of the answer; returns (data, more)
+        wait = self._busy_until - time.time()
+        if wait > self.timeout / 1000.0 or not self._resp:
+            self._timeout()
+        if self._fault( 'timeout' ):
+            self._timeout()
+        if self._fault( 'drop' ):
+            self._resp = b''
+            self._timeout()
+        time.sleep( max(wait, 0.0) )
+        chunk, self._resp = self._resp[:count], self._resp[count:]
+        if self._fault( 'corrupt' ) and chunk:
+            pos = self._fault_rng.randint( len(chunk) )
+            chunk = chunk[:pos] + bytes([chunk[pos] ^ 0x55]) + chunk[pos+1:]
+        time.sleep( self.latency + len(chunk) / self.bytes_per_sec )
+        self.bytes_read += len( chunk )
+        return chunk, len(self._resp) > 0
+
+    def read_raw( self, size=None ):
+        # the whole answer, read in chunks of 'size' (or chunk_size)
+        chunks = []
+        more = True
+        while more:
+            chunk, more = self.read_chunk( size or self.chunk_size )
+            chunks.append( chunk )
+        return b''.join( chunks )
+
+    def read( self ):
+        return self.read_raw().decode( 'ascii', 'replace' )
+
+    def query( self, cmd ):
+        self.write( cmd )
+        return self.read()
+
+    def close( self ):
+        pass
+
+############################################################################
+
+MODELS = {
+    #            IDN model, serial, USB product ID, horizontal divisions,
+    #            NORM points, block length digits, '\n' after the block,
+    #            channels, max. sample rate, default memory depth
+    'DS2000A': ('DS2072A', 'DS2A000000001', 0x04B0, 14, 1400, 9, True, 2, 1.0e9, 1400000),
+    'DS1000E': ('DS1052E', 'DS1EB000000001', 0x0588, 12, 600, 8, False, 2, 1.0e9, 16384),
+    'DS1000Z': ('DS1054Z', 'DS1ZA000000001', 0x04CE, 12, 1200, 9, True, 4, 1.0e9, 1200000),
+}
+MODELS['DS1054Z'] = MODELS['DS1000Z']
+
+MEAS_ITEMS = {
+    'VMAX': 'vmax', 'VMIN': 'vmin', 'VPP': 'vpp', 'VTOP': 'vtop', 'VBAS': 'vbase',
+    'VAMP': 'vamp', 'VAVG': 'vavg', 'VRMS': 'vrms', 'PER': 'period',
+    'FREQ': 'freq', 'RTIM': 'rtime', 'FTIM': 'ftime', 'PWID': 'pwidth',
+    'NWID': 'nwidth', 'PDUT': 'pduty',
+}
+
+class SimScope(SimInstrument):
+
+    def __init__( self, bytes_per_sec=1.0e6, latency=0.001, freq=1000.0,
+                  vpp=2.0, noise=0.02, mem_depth=None, model='DS2000A',
+                  faults=None, seed=0 ):
+        SimInstrument.__init__( self, bytes_per_sec, latency, faults, seed )
+        (name, serial, self.PRODUCT_ID, self.hdivs, self.norm_points,
+         self.block_digits, self.block_term, self.channels,
+         self.max_srate, default_depth) = MODELS[model.upper()]
+        self.model = model.upper()
+        self.IDN = 'RIGOL TECHNOLOGIES,{},{},00.04.00'.format( name, serial )
+        self.default_depth = mem_depth or default_depth
+        self.noise = noise
+        self.sources = {}
+        for ch in range( 1, self.channels + 1 ):
+            # CH2: half the amplitude, 45 degrees behind CH1
+            self.set_signal( ch, freq, vpp / ch, -45.0 * (ch - 1) )
+        self.reset( freq )
+
+    def reset( self, freq=1000.0 ):
+        self.chan = dict( (ch, {'SCAL': 1.0, 'OFFS': 0.0, 'PROB': 1.0,
+                                'DISP': '1', 'COUP': 'DC'})
+                          for ch in range(1, self.channels + 1) )
+        self.time_per_div = 1.0 / freq   # one period per division
+        self.time_offset = 0.0
+        self.mem_depth = self.default_depth
+        self.mode = 'NORM'
+        self.source = 1
+        self.start = 1
+        self.stop = self.norm_points
+        self.trig_sweep = 'AUTO'
+        self.meas_sources = {}
+        self.running = True
+        self._t0 = time.time()
+        self._t_stop = 0.0
+
+    ########################################################################
+    # signals
+
+    def set_signal( self, channel, freq=1000.0, vpp=2.0, phase=0.0, offset=0.0 ):
+        # a sine wave (phase in degrees)
+        self.sources[channel] = (freq, vpp, phase, offset)
+
+    def connect( self, channel, generator, gen_channel=1, response=None ):
+        # the output of a SimGenerator channel (through a frequency response)
+        self.sources[channel] = lambda t: generator.voltage( gen_channel, t, response )
+
+    def _volts( self, channel, t ):
+        source = self.sources.get( channel )
+        if source is None:
+            volts = np.zeros( len(t) )
+        elif callable( source ):
+            volts = np.asarray( source(t), dtype=np.float64 )
+        else:
+            freq, vpp, phase, offset = source
+            volts = offset + 0.5 * vpp * np.sin( 2*np.pi*freq*t + np.radians(phase) )
+        if self.noise:
+            volts = volts + self.noise * self._rng.standard_normal( len(t) )
+        return volts
+
+    def _acq_time( self ):
+        # the time of the current acquisition (frozen when stopped)
+        if self.running and self.trig_sweep == 'SING' and \
+           time.time() - self._t0 > self.hdivs * self.time_per_div:
+            self._stop()   # the single acquisition is complete
+        if self.running:
+            return time.time() - self._t0
+        return self._t_stop
+
+    def _stop( self ):
+        if self.running:
+            self._t_stop = time.time() - self._t0
+            self.running = False
+
+    ########################################################################
+    # waveform data
+
+    def srate( self ):
+        return min( self.max_srate, self.mem_depth / (self.hdivs * self.time_per_div) )
+
+    def _points( self ):
+        if self.mode == 'NORM':
+            return self.norm_points
+        return max( 0, min(self.stop, self.mem_depth) - self.start + 1 )
+
+    def _xinc( self ):
+        if self.mode == 'NORM':
+            return (self.hdivs * self.time_per_div) / self.norm_points
+        return 1.0 / self.srate()
+
+    def _xorg( self ):
+        if self.mode == 'NORM':
+            return self.time_offset - 0.5 * self.hdivs * self.time_per_div
+        return self.time_offset - 0.5 * self.mem_depth / self.srate()
+
+    def _yinc( self, channel ):
+        return self.chan[channel]['SCAL'] / 25.0
+
+    def _preamble( self ):
+        ch = self.source
+        yinc = self._yinc( ch )
+        return '0,{:d},{:d},1,{:e},{:e},0,{:e},{:e},127'.format(
+                   0 if self.mode == 'NORM' else 2, self._points(),
+                   self._xinc(), self._xorg(), yinc,
+                   self.chan[ch]['OFFS'] / yinc )
+
+    def _codes( self, channel, first, n, xinc, xorg ):
+        # the 8-bit samples first .. first+n-1 of the acquisition
+        t = self._t_msg + xorg + (first + np.arange(n)) * xinc
+        volts = self._volts( channel, t ) + self.chan[channel]['OFFS']
+        scale = self.chan[channel]['SCAL']
+        if self.model == 'DS1000E':
+            # V = (240 - code) * scale/25 - (offset + 4.6*scale)
+            codes = 125.0 - np.round( volts * 25.0 / scale )
+        else:
+            codes = np.round( volts * 25.0 / scale ) + 127
+        return np.clip( codes, 0, 255 ).astype( np.uint8 )
+
+    def _record( self, channel ):
+        # the screen data (NORM) of a channel and its parameters
+        n = self.norm_points
+        xinc = (self.hdivs * self.time_per_div) / n
+        xorg = self.time_offset - 0.5 * self.hdivs * self.time_per_div
+        yinc = self._yinc( channel )
+        params = { 'xinc': xinc, 'xorg': xorg, 'xref': 0.0, 'yinc': yinc,
+                   'yorg': self.chan[channel]['OFFS'] / yinc, 'yref': 127.0 }
+        codes = self._codes( channel, 0, n, xinc, xorg )
+        if self.model == 'DS1000E':
+            codes = (252 - codes.astype(np.int16)).clip(0, 255).astype(np.uint8)
+        return codes, params
+
+    def _wave_data( self, arg ):
+        channel = int( arg[-1] ) if arg.upper().startswith('CHAN') else self.source
+        if self.mode == 'NORM':
+            data = self._codes( channel, 0, self.norm_points, self._xinc(), self._xorg() )
+        else:
+            data = self._codes( channel, self.start - 1, self._points(),
+                                self._xinc(), self._xorg() )
+        # the time to transfer the data from the acquisition memory
+        self._busy( len(data) / 100.0e6 )
+        return make_block( data.tobytes(), self.block_digits )
+
+    ########################################################################
+    # measurements
+
+    def _measure( self, item, sources ):
+        channels = [ int(s.strip()[-1]) for s in sources if s.strip() ]
+        if item in ('RPH', 'FPH', 'RDEL', 'FDEL'):
+            a, b = (channels + [ int(self.settings.get('MEAS:SET:PSA', 'CHAN1')[-1]),
+                                 int(self.settings.get('MEAS:SET:PSB', 'CHAN2')[-1]) ])[:2] \
+                   if len(channels) < 2 else channels[:2]
+            (data_a, params), (data_b, _) = self._record( a ), self._record( b )
+            rising = item[0] == 'R'
+            if item.endswith('PH'):
+                value = rigol_measure.phase( data_a, data_b, rising )
+            else:
+                value = rigol_measure.delay( data_a, data_b, params['xinc'], rising )
+        elif item in MEAS_ITEMS or item == 'NDUT':
+            channel = channels[0] if channels else \
+                      int( self.settings.get('MEAS:SOUR', 'CHAN1')[-1] )
+            data, params = self._record( channel )
+            if self.model != 'DS1000E' and (data.min() == 0 or data.max() == 255) \
+               and item.startswith('V'):
+                return INVALID   # clipped
+            result = rigol_measure.measure( data, params['xinc'], params )
+            if item == 'NDUT':
+                value = (1.0 - result['pduty']) if result['pduty'] is not None else None
+            else:
+                value = result[ MEAS_ITEMS[item] ]
+        else:
+            return '0'
+        return INVALID if value is None else '{:.6e}'.format( value )
+
+    ########################################################################
+
+    def _handle( self, head, arg ):
+        ch_node = head.split(':')[0]
+        if head in ('RUN', 'SING'):
+            self.running = True
+            self._t0 = time.time() - self._t_stop
+            if head == 'SING':
+                self.trig_sweep = 'SING'
+        elif head == 'STOP':
+            self._stop()
+        elif head == '*RST':
+            self.reset()
+        elif head == 'TRIG:STAT?':
+            self._acq_time()
+            if not self.running:
+                return 'STOP'
+            return 'WAIT' if self.trig_sweep == 'SING' else 'TD'
+        elif head == 'TRIG:SWE':
+            self.trig_sweep = arg.upper()[:4].replace( 'SINGLE', 'SING' )
+        elif head == 'TRIG:SWE?':
+            return self.trig_sweep
+        elif head in ('TIM:SCAL', 'TIM:MAIN:SCAL'):
+            self.time_per_div = float( arg )
+        elif head in ('TIM:SCAL?', 'TIM:MAIN:SCAL?'):
+            return '{:e}'.format( self.time_per_div )
+        elif head in ('TIM:OFFS', 'TIM:MAIN:OFFS'):
+            self.time_offset = float( arg )
+        elif head in ('TIM:OFFS?', 'TIM:MAIN:OFFS?'):
+            return '{:e}'.format( self.time_offset )
+        elif ch_node.startswith('CHAN') and ch_node[4:].isdigit() and \
+             int(ch_node[4:]) in self.chan:
+            settings = self.chan[ int(ch_node[4:]) ]
+            item = head.split(':')[-1]
+            if item.endswith('?'):
+                return str( settings.get(item[:-1], 0) )
+            settings[item] = float( arg ) if item in ('SCAL', 'OFFS', 'PROB') else arg
+        elif head == 'ACQ:MDEP':
+            self.mem_depth = self.default_depth if arg.upper() == 'AUTO' else int( float(arg) )
+        elif head == 'ACQ:MDEP?':
+            return '{:d}'.format( self.mem_depth )
+        elif head in ('ACQ:SRAT?', 'ACQ:SAMP?'):
+            return '{:e}'.format( self.srate() )
+        elif head == 'WAV:MODE':
+            self.mode = 'NORM' if arg.upper().startswith('NORM') else 'RAW'
+        elif head == 'WAV:POIN:MODE':   # DS1000E
+            self.mode = 'NORM' if arg.upper().startswith('NOR') else 'RAW'
+            self.start, self.stop = 1, self.mem_depth
+        elif head == 'WAV:SOUR':
+            self.source = int( arg[-1] )
+        elif head == 'WAV:STAR':
+            self.start = int( arg )
+        elif head == 'WAV:STOP':
+            self.stop = int( arg )
+        elif head == 'WAV:STAT?':
+            return 'IDLE,{:d}'.format( self._points() )
+        elif head == 'WAV:PRE?':
+            return self._preamble()
+        elif head in ('WAV:XINC?', 'WAV:XOR?', 'WAV:XREF?',
+                      'WAV:YINC?', 'WAV:YOR?', 'WAV:YREF?'):
+            params = rigol_capture.parse_preamble( self._preamble() )
+            name = { 'XINC?': 'xinc', 'XOR?': 'xorg', 'XREF?': 'xref',
+                     'YINC?': 'yinc', 'YOR?': 'yorg', 'YREF?': 'yref' }[ head[4:] ]
+            return '{:e}'.format( params[name] )
+        elif head == 'WAV:DATA?':
+            return self._wave_data( arg )
+        elif head.startswith('MEAS:') and head.endswith('?'):
+            item = head.split(':')[1].rstrip('?')
+            sources = arg.split(',') if arg else \
+                      self.meas_sources.get( item, '' ).split(',')
+            return self._measure( item, sources )
+        elif head.startswith('MEAS:') and head.split(':')[1] in \
+             tuple(MEAS_ITEMS) + ('NDUT', 'RPH', 'FPH', 'RDEL', 'FDEL'):
+            self.meas_sources[ head.split(':')[1] ] = arg
+        else:
+            return self._generic( head, arg )
+        return None
+
+    def _message( self, data ):
+        # the channels of one message are sampled at the same time
+        self._t_msg = self._acq_time()
+        SimInstrument._message( self, data )
+        if self._resp[:1] == b'#' and not self.block_term:
+            self._resp = self._resp[:-1]   # DS1000E: no '\n' after the block
+
+############################################################################
+
+FUNCTIONS = ( 'SIN', 'SQU', 'RAMP', 'PULS', 'NOIS', 'DC', 'USER' )
+PERIOD_POINTS = 4096   # samples of one period (SQU, RAMP, PULS) to filter
+
+class SimGenerator(SimInstrument):
+
+    IDN = 'RIGOL TECHNOLOGIES,DG1022 ,DG1D000000001,,00.03.00.09.00.02.08'
+    PRODUCT_ID = 0x0588
+
+    def __init__( self, bytes_per_sec=0.5e6, latency=0.001,
+                  ascii_per_point=20e-6, binary_per_point=1e-6,
+                  delete_time=0.2, apply_time=0.3, binary=True,
+                  max_points=4096, sweep=True, faults=None, seed=0 ):
+        SimInstrument.__init__( self, bytes_per_sec, latency, faults, seed )
+        self.timeout = 500
+        self.ascii_per_point = ascii_per_point     # parsing time per point
+        self.binary_per_point = binary_per_point
+        self.delete_time = delete_time
+        self.apply_time = apply_time
+        self.binary = binary        # accepts 'DATA:DAC VOLATILE,#<block>'
+        self.max_points = max_points
+        self.sweep = sweep          # has the 'SWE' subsystem
+        self.user_slots = 10
+        self._periods = {}          # the filtered periods (see _period)
+        self.reset()
+
+    def reset( self ):
+        self.volatile = None        # the DAC codes in the volatile memory
+        self.user = {}              # name -> DAC codes (non-volatile memory)
+        self.output = None          # the DAC codes of the output waveform
+        self.chan = [ None,
+                      {'FUNC': 'SIN', 'FREQ': 1000.0, 'VOLT': 5.0, 'OFFS': 0.0,
+                       'PHAS': 0.0, 'OUTP': False},
+                      {'FUNC': 'SIN', 'FREQ': 1000.0, 'VOLT': 5.0, 'OFFS': 0.0,
+                       'PHAS': 0.0, 'OUTP': False} ]
+        self._t0 = time.time()
+
+    def _period( self, func, freq, response ):
+        # one period of a periodic output (-1..+1, without the offset);
+        # through 'response': rfft, multiplied by response(k*freq), irfft
+        if func == 'USER':
+            wave = (self.output - 8192.0) / 8191.0
+        else:
+            cycle = np.arange( PERIOD_POINTS ) / float( PERIOD_POINTS )
+            if func == 'RAMP':
+                wave = 2.0 * cycle - 1.0
+            else:   # SQU, PULS
+                wave = np.where( cycle < 0.5, 1.0, -1.0 )
+        if response is None:
+            return wave
+        key = (func, freq, id(response), id(self.output) if func == 'USER' else None)
+        if key not in self._periods:
+            if len(self._periods) > 16:
+                self._periods.clear()
+            spectrum = np.fft.rfft( wave )
+            spectrum *= response( freq * np.arange(len(spectrum)) )
+            self._periods[key] = (np.fft.irfft( spectrum, len(wave) ), response, self.output)
+        return self._periods[key][0]
+
+    def voltage( self, channel, t, response=None ):
+        # the output voltage of a channel at the times t (high impedance
+        # load), through the frequency response 'response(freq)'
+        state = self.chan[channel]
+        t = np.asarray( t, dtype=np.float64 )
+        if not state['OUTP']:
+            return np.zeros( len(t) )
+        freq, amp, offset = state['FREQ'], 0.5 * state['VOLT'], state['OFFS']
+        phase = 2*np.pi * freq * t + np.radians( state['PHAS'] )
+        func = state['FUNC']
+        if response is not None:
+            offset = offset * abs( response(0.0) )
+        if func == 'SIN':
+            if response is not None:
+                h = response( freq )
+                amp, phase = amp * abs(h), phase + np.angle(h)
+            return offset + amp * np.sin( phase )
+        if func == 'NOIS':
+            return offset + amp / 3.0 * self._rng.standard_normal( len(t) )
+        if func in ('SQU', 'RAMP', 'PULS') or (func == 'USER' and self.output is not None):
+            wave = self._period( func, freq, response )
+            cycle = (phase / (2*np.pi)) % 1.0
+            index = (cycle * len(wave)).astype( int ) % len(wave)
+            return offset + amp * wave[index]
+        return np.full( len(t), offset )
+
+    ########################################################################
+
+    def _data_dac( self, arg ):
+        # arg: b'VOLATILE,<v>,<v>,...' or b'VOLATILE,#<block>'
+        if isinstance( arg, str ):
+            arg = arg.encode()
+        _, _, data = arg.partition( b',' )
+        if data[0:1] == b'#':
+            if not self.binary:
+                self.errors.append( '-104,"Data type error"' )
+                return
+            codes = np.frombuffer( parse_block(data), dtype='<u2' )
+            self._busy( len(codes) * self.binary_per_point )
+        else:
+            codes = np.array( data.decode().strip().split(','), dtype=np.int64 )
+            self._busy( len(codes) * self.ascii_per_point )
+        if len(codes) > self.max_points or codes.max() > 16383:
+            self.errors.append( '-222,"Data out of range"' )
+            return
+        self.volatile = codes.astype( np.uint16 )
+
+    def _channel( self, head ):
+        # 'PHAS:CH2' -> ('PHAS', 2), 'OUTP1' -> ('OUTP', 1)
+        nodes = head.split(':')
+        channel = 1
+        if nodes[-1] in ('CH1', 'CH2', 'CH2?', 'CH1?'):
+            channel = int( nodes[-1][2] )
+            nodes[-1:] = ['?'] if nodes[-1].endswith('?') else []
+        head = ':'.join( nodes ).replace( ':?', '?' )
+        if head.rstrip('?')[-1:] in ('1', '2'):
+            channel = int( head.rstrip('?')[-1] )
+            head = head.rstrip('?')[:-1] + ('?' if head.endswith('?') else '')
+        return head, channel
+
+    def _handle( self, head, arg ):
+        if head == 'DATA:DAC':
+            self._data_dac( arg )
+            return None
+        if head == '*RST':
+            self.reset()
+            return None
+        if head == '*TRG':
+            return None
+        if head.startswith('SWE') and not self.sweep:
+            self.errors.append( '-113,"Undefined header"' )
+            return None
+        if head == 'DATA:ATTR:POIN?':
+            return '{:d}'.format( self.max_points )
+        if head == 'DATA:DEL':
+            if arg.upper() == 'VOLATILE':
+                self.volatile = None
+            else:
+                self.user.pop( arg.upper(), None )
+            self._busy( self.delete_time )
+            return None
+        if head == 'DATA:COPY':
+            name = arg.split(',')[0].strip().upper()
+            if self.volatile is None or (name not in self.user and
+                                         len(self.user) >= self.user_slots):
+                self.errors.append( '-257,"File name error"' )
+            else:
+                self.user[name] = self.volatile
+                self._busy( self.delete_time )
+            return None
+        if head == 'DATA:CAT?':
+            names = ['VOLATILE'] + sorted( self.user )
+            return ','.join( '"%s"' % name for name in names )
+        if head == 'FUNC:USER':
+            name = arg.upper()
+            if name in ('', 'VOLATILE'):
+                self.output = self.volatile
+            elif name in self.user:
+                self.output = self.user[name]
+            else:
+                self.errors.append( '-224,"Illegal parameter value"' )
+            self._busy( self.apply_time )
+            return None
+
+        head, channel = self._channel( head )
+        state = self.chan[channel]
+        if head.startswith('APPL:') and not head.endswith('?'):
+            func = head.split(':')[1]
+            values = [ v.strip() for v in arg.split(',') if v.strip() ]
+            if func not in FUNCTIONS:
+                self.errors.append( '-113,"Undefined header"' )
+                return None
+            state['FUNC'] = func
+            for key, value in zip( ('FREQ', 'VOLT', 'OFFS'), values ):
+                if value.upper() != 'DEF':
+                    state[key] = float( value )
+            state['OUTP'] = True
+            return None
+        if head == 'APPL?':
+            return '{},{:e},{:e},{:e}'.format( state['FUNC'], state['FREQ'],
+                                               state['VOLT'], state['OFFS'] )
+        if head in ('FUNC', 'FREQ', 'VOLT', 'VOLT:OFFS', 'PHAS', 'OUTP'):
+            key = head.split(':')[-1]
+            if key == 'FUNC':
+                state[key] = arg.upper()[:4].rstrip('E') if arg.upper() != 'SQUARE' else 'SQU'
+            elif key == 'OUTP':
+                state[key] = arg.upper() in ('ON', '1')
+            else:
+                state[key] = float( arg )
+            return None
+        if head in ('FUNC?', 'FREQ?', 'VOLT?', 'VOLT:OFFS?', 'PHAS?', 'OUTP?'):
+            key = head.rstrip('?').split(':')[-1]
+            value = state[key]
+            if key == 'OUTP':
+                return 'ON' if value else 'OFF'
+            return value if isinstance( value, str ) else '{:e}'.format( value )
+        if head in ('VOLT:HIGH?', 'VOLT:LOW?'):
+            sign = 1.0 if head == 'VOLT:HIGH?' else -1.0
+            return '{:e}'.format( state['OFFS'] + sign * 0.5 * state['VOLT'] )
+        return self._generic( head, arg )
+
+############################################################################
+
+def make_bench( scope='DS2000A', fc=100.0, bytes_per_sec=1.0e6, latency=0.001,
+                faults=None, seed=0 ):
+    # a DS oscilloscope and a DG1022: CHAN1 = DG1022 CH1, CHAN2 = DG1022 CH1
+    # through an RC lowpass (fc, the device under test), or DG1022 CH2 if
+    # fc is None
+    ds = SimScope( bytes_per_sec, latency, model=scope, faults=faults, seed=seed )
+    dg = SimGenerator( bytes_per_sec=min(bytes_per_sec, 0.5e6), latency=latency,
+                       faults=faults, seed=seed )
+    ds.connect( 1, dg, 1 )
+    if fc:
+        ds.connect( 2, dg, 1, rc_lowpass(fc) )
+    else:
+        ds.connect( 2, dg, 2 )
+    return [ ds, dg ]
+
+############################################################################
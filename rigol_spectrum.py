@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Frequency-domain analysis of long waveform captures:
+#     - Welch      : power spectral density (averaged periodograms)
+#     - Spectrogram: power spectra over time
+#     - find_peaks : the largest spectral peaks
+#    The data is processed in chunks (streaming), so a capture of 14M or
+#    56M points is never converted to float64 as a whole: the chunks may
+#    come from an array in memory, a memory-mapped capture file
+#    (rigol_capture.load_capture) or from the transfer loop
+#    (rigol_ds.read_raw with on_chunk=...). The memory used is bounded
+#    by the chunk size and 'batch' segments of 'nperseg' points.
+#    The segments of a chunk can be processed by a pool of threads.
+#    The results are the same as scipy.signal.welch(..., window='hann',
+#    detrend='constant', scaling='density').
+############################################################################
+# Usage (benchmark on synthetic records):
+#   $ python3 ./rigol_spectrum.py [--points 14000000 56000000] [--workers 4]
+#
+############################################################################
+
+import sys, time
+import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+import rigol_capture
+
+CHUNK_POINTS = 1000000
+
+############################################################################
+
+def hann( n ):
+    # periodic Hann window (as used for spectral analysis)
+    return 0.5 - 0.5 * np.cos( 2*np.pi*np.arange(n) / n )
+
+def iter_chunks( data, chunk_points=CHUNK_POINTS ):
+    for start in range( 0, len(data), chunk_points ):
+        yield data[start:start+chunk_points]
+
+class _Segments(object):
+    # splits a stream of chunks into (overlapping) segments and computes
+    # the one-sided power spectrum of each segment
+
+    def __init__( self, fs, nperseg=4096, noverlap=None, params=None,
+                  workers=1, batch=256 ):
+        if noverlap is None:
+            noverlap = nperseg // 2
+        self.fs = float( fs )
+        self.nperseg = nperseg
+        self.step = nperseg - noverlap
+        self.params = params
+        self.batch = batch
+        self.window = hann( nperseg )
+        self.freqs = np.fft.rfftfreq( nperseg, 1.0/fs )
+        # density scaling, one-sided (double all bins except DC and Nyquist)
+        self.scale = np.full( len(self.freqs), 2.0 / (fs * np.sum(self.window**2)) )
+        self.scale[0] /= 2
+        if nperseg % 2 == 0:
+            self.scale[-1] /= 2
+        self.segments = 0
+        self._carry = None
+        self._pool = ThreadPoolExecutor( workers ) if workers > 1 else None
+
+    def _power( self, segs ):
+        # segs: 2-D array (a batch of segments), returns the power spectra
+        if self.params is not None:
+            x = rigol_capture.to_volts( segs, self.params, np.float64 )
+        else:
+            x = segs.astype( np.float64 )
+        x -= x.mean( axis=1, keepdims=True )
+        x *= self.window
+        spec = np.fft.rfft( x, axis=1 )
+        return (spec.real**2 + spec.imag**2) * self.scale
+
+    def _batches( self, chunk ):
+        if self._carry is not None and len(self._carry):
+            buf = np.concatenate( (self._carry, chunk) )
+        else:
+            buf = np.asarray( chunk )
+        if len(buf) < self.nperseg:
+            self._carry = buf.copy()
+            return []
+        nseg = (len(buf) - self.nperseg) // self.step + 1
+        view = np.lib.stride_tricks.sliding_window_view( buf, self.nperseg )
+        segs = view[: nseg*self.step : self.step]
+        batches = [ segs[i:i+self.batch] for i in range(0, nseg, self.batch) ]
+        self._carry = buf[nseg*self.step:].copy()
+        self.segments += nseg
+        return batches
+
+    def _process( self, chunk, reduce ):
+        batches = self._batches( chunk )
+        if self._pool is not None and len(batches) > 1:
+            return list( self._pool.map(lambda segs: reduce(self._power(segs)), batches) )
+        return [ reduce(self._power(segs)) for segs in batches ]
+
+    def close( self ):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+############################################################################
+
+class Welch(_Segments):
+
+    def __init__( self, fs, nperseg=4096, noverlap=None, params=None,
+                  workers=1, batch=256 ):
+        _Segments.__init__( self, fs, nperseg, noverlap, params, workers, batch )
+        self._sum = np.zeros( len(self.freqs) )
+
+    def feed( self, chunk ):
+        for power in self._process( chunk, lambda p: p.sum(axis=0) ):
+            self._sum += power
+
+    def result( self ):
+        # returns (freqs, psd)
+        self.close()
+        if self.segments == 0:
+            raise ValueError( 'Not enough data for one segment' )
+        return self.freqs, self._sum / self.segments
+
+class Spectrogram(_Segments):
+    # each row of the spectrogram is the average of 'average' segments
+
+    def __init__( self, fs, nperseg=4096, noverlap=None, params=None,
+                  workers=1, batch=256, average=1 ):
+        _Segments.__init__( self, fs, nperseg, noverlap, params, workers, batch )
+        self.average = average
+        self.rows = []
+        self._partial = None   # (sum, count) of an unfinished row
+
+    def feed( self, chunk ):
+        for power in self._process( chunk, lambda p: p ):
+            if self._partial is not None:
+                acc, count = self._partial
+                need = self.average - count
+                acc = acc + power[:need].sum( axis=0 )
+                count += len(power[:need])
+                power = power[need:]
+                if count < self.average:
+                    self._partial = (acc, count)
+                    continue
+                self.rows.append( acc / count )
+                self._partial = None
+            full = (len(power) // self.average) * self.average
+            if full:
+                rows = power[:full].reshape( -1, self.average, len(self.freqs) )
+                self.rows.extend( rows.mean(axis=1) )
+            if full < len(power):
+                self._partial = (power[full:].sum(axis=0), len(power) - full)
+
+    def result( self ):
+        # returns (times, freqs, power[times, freqs])
+        self.close()
+        if self._partial is not None:
+            acc, count = self._partial
+            self.rows.append( acc / count )
+            self._partial = None
+        hop = self.step * self.average / self.fs
+        times = (0.5*self.nperseg/self.fs) + hop * np.arange( len(self.rows) )
+        return times, self.freqs, np.array( self.rows )
+
+############################################################################
+
+def welch( data, fs, nperseg=4096, noverlap=None, params=None, workers=1,
+           chunk_points=CHUNK_POINTS ):
+    psd = Welch( fs, nperseg, noverlap, params, workers )
+    for chunk in iter_chunks( data, chunk_points ):
+        psd.feed( chunk )
+    return psd.result()
+
+def spectrogram( data, fs, nperseg=4096, noverlap=None, params=None,
+                 workers=1, average=1, chunk_points=CHUNK_POINTS ):
+    spec = Spectrogram( fs, nperseg, noverlap, params, workers, average=average )
+    for chunk in iter_chunks( data, chunk_points ):
+        spec.feed( chunk )
+    return spec.result()
+
+def welch_capture( basename, nperseg=4096, workers=1 ):
+    # PSD of a saved capture (memory-mapped, read chunk by chunk)
+    data, params = rigol_capture.load_capture( basename )
+    return welch( data, 1.0/params['xinc'], nperseg, params=params,
+                  workers=workers )
+
+def find_peaks( freqs, psd, count=5, min_distance=3 ):
+    # the 'count' largest local maxima of the spectrum, at least
+    # 'min_distance' bins apart; the frequency and the power of each peak
+    # are refined by parabolic interpolation (on a log scale)
+    # returns [(freq, power), ...] sorted by power
+    psd = np.asarray( psd )
+    is_peak = np.zeros( len(psd), dtype=bool )
+    is_peak[1:-1] = (psd[1:-1] > psd[:-2]) & (psd[1:-1] >= psd[2:])
+    candidates = np.flatnonzero( is_peak )
+    candidates = candidates[ np.argsort(psd[candidates])[::-1] ]
+    peaks = []
+    for k in candidates:
+        if len(peaks) >= count:
+            break
+        if any( abs(k - p) < min_distance for p in peaks ):
+            continue
+        peaks.append( k )
+    df = freqs[1] - freqs[0]
+    result = []
+    for k in peaks:
+        a, b, c = np.log( np.maximum(psd[k-1:k+2], 1e-300) )
+        denom = a - 2*b + c
+        shift = 0.5 * (a - c) / denom if denom != 0 else 0.0
+        result.append( (freqs[k] + shift*df, float(np.exp(b - 0.25*(a - c)*shift))) )
+    return result
+
+############################################################################
+
+def _synthetic( points, fs, chunk_points=CHUNK_POINTS ):
+    # a raw (uint8) record: 1 kHz + 12.5 kHz sines and noise
+    data = np.empty( points, dtype=np.uint8 )
+    rng = np.random.RandomState( 1 )
+    for start in range( 0, points, chunk_points ):
+        t = np.arange( start, min(start+chunk_points, points) ) / fs
+        v = 80*np.sin( 2*np.pi*1000*t ) + 8*np.sin( 2*np.pi*12500*t )
+        v += rng.standard_normal( len(t) )
+        data[start:start+len(t)] = np.clip( np.round(v) + 127, 0, 255 )
+    return data
+
+def benchmark( points_list, workers=1, nperseg=4096 ):
+    import tracemalloc
+    fs = 1.0e6
+    params = dict( yinc=0.01, yref=127, yorg=0 )
+    for points in points_list:
+        data = _synthetic( points, fs )
+        for name, func in [ ('welch', welch), ('spectrogram', spectrogram) ]:
+            tracemalloc.start()
+            t_start = time.time()
+            if name == 'welch':
+                freqs, psd = func( data, fs, nperseg, params=params, workers=workers )
+                peaks = find_peaks( freqs, psd, 2 )
+            else:
+                func( data, fs, nperseg, params=params, workers=workers, average=64 )
+                peaks = []
+            t_used = time.time() - t_start
+            _, peak_mem = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print ( '{:>11s} {:>12,} points: {:6.2f} sec, {:7.1f} MS/s, '
+                    'peak memory {:6.1f} MB {}'.format(
+                     name, points, t_used, 1e-6*points/t_used, 1e-6*peak_mem,
+                     ' '.join('{:.1f}Hz'.format(f) for f, p in peaks) ) )
+        del data
+
+def main( argv=None ):
+    parser = argparse.ArgumentParser( description='Streaming spectrum benchmark' )
+    parser.add_argument( '--points', type=int, nargs='+',
+                         default=[14000000, 56000000] )
+    parser.add_argument( '--workers', type=int, default=1 )
+    parser.add_argument( '--nperseg', type=int, default=4096 )
+    args = parser.parse_args( argv )
+    benchmark( args.points, args.workers, args.nperseg )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
+
+############################################################################
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Frequency sweep engine for a Rigol DG1022 function generator and a
+#    Rigol DS2000A oscilloscope (frequency response / Bode plot).
+#    Instead of fixed sleeps after each change of the settings, a sweep
+#    step waits for one screen of new data and then reads the measurements
+#    (one compound query, once per screen) until successive readings agree
+#    within a tolerance ("settled"), or the step timeout has expired (at
+#    least the full averaging time: #averages x one screen). A step with
+#    invalid readings (None, e.g. no trigger yet) is measured again.
+#    The vertical scale of the 'autorange' channels is selected for each
+#    frequency by rigol_ds.auto_range(), starting from the last good scale.
+#    Alternatively, measure_fit() computes the gain and the phase from a
+#    single two-channel capture by sine fitting (rigol_measure.gain_phase).
+#    AdaptivePlanner selects the sweep frequencies: a coarse log-spaced
+#    grid is refined where the gain or the phase changes fastest.
+#    With a journal (rigol_journal.Journal), each completed point is
+#    saved to the disk, and an interrupted sweep continues where it stopped.
+############################################################################
+
+import time, math
+import numpy as np
+
+from rigol_instr import cmdWrite, cmdRead, parse_value
+from rigol_ds import read_measurements, read_channels, auto_range
+from rigol_measure import gain_phase
+from rigol_journal import run_steps
+
+SCREEN_DIVS = 14   # DS2000A: 14 horizontal divisions
+
+# tolerances for the successive readings: (relative, absolute)
+TOLERANCES = {
+    'VPP' : (0.02, 0.002),
+    'VAMP': (0.02, 0.002),
+    'VRMS': (0.02, 0.001),
+    'FREQ': (0.01, 0.0),
+    'PER' : (0.01, 0.0),
+    'RPH' : (0.0,  2.0),   # degrees
+    'FPH' : (0.0,  2.0),
+}
+DEFAULT_TOLERANCE = (0.02, 0.0)
+
+############################################################################
+
+def _tolerance( spec ):
+    item = spec if isinstance( spec, str ) else spec[0]
+    item = item.split(':')[-1].split('?')[0].upper()
+    return TOLERANCES.get( item, DEFAULT_TOLERANCE )
+
+def converged( prev, values, tolerances ):
+    for a, b, (rel_tol, abs_tol) in zip( prev, values, tolerances ):
+        if a is None or b is None:
+            return False
+        if abs(a - b) > max( rel_tol * max(abs(a), abs(b)), abs_tol ):
+            return False
+    return True
+
+def wait_settled( read, tolerances, stable=3, timeout=10.0, poll=0.05 ):
+    # call read() until 'stable' successive readings agree;
+    # returns (values, settled)
+    t_start = time.time()
+    prev = None
+    n_stable = 0
+    while True:
+        values = read()
+        if prev is not None and converged( prev, values, tolerances ):
+            n_stable += 1
+        else:
+            n_stable = 1
+        if n_stable >= stable:
+            return values, True
+        if time.time() - t_start > timeout:
+            return values, False
+        prev = values
+        time.sleep( poll )
+
+############################################################################
+
+class FreqSweep(object):
+
+    def __init__( self, ds, dg, specs, stable=3, timeout=10.0, periods=7,
+                  autorange=(), probe=1, retries=2 ):
+        self.ds = ds            # oscilloscope
+        self.dg = dg            # function generator
+        self.specs = specs      # measurements, e.g. [('VPP',1), ('RPH',1,2)]
+        self.tolerances = [ _tolerance(spec) for spec in specs ]
+        self.stable = stable
+        self.timeout = timeout
+        self.periods = periods  # number of signal periods on the screen
+        self.autorange = autorange
+        self.probe = probe
+        self.retries = retries  # new attempts of a step with invalid readings
+        self.scales = {}        # the last good scale of each channel
+        self.averages = self.read_averages()
+
+    def read_averages( self ):
+        # number of averages (1 if the acquisition type is not AVER)
+        acq_type = cmdRead( self.ds, ':ACQ:TYP?', 0.05 )
+        if acq_type is None or not acq_type.strip().upper().startswith('AVER'):
+            return 1
+        return int( parse_value(cmdRead(self.ds, ':ACQ:AVER?', 0.05)) or 1 )
+
+    def settle_time( self, time_per_div ):
+        # minimum time until the (averaged) measurements use new data
+        return self.averages * SCREEN_DIVS * time_per_div
+
+    def set_frequency( self, freq ):
+        time_per_div = self.periods / (SCREEN_DIVS * freq)
+        cmdWrite( self.dg, 'FREQ {:.3e}'.format(freq), 0.0 )
+        cmdWrite( self.ds, ':TIM:SCAL {:.3e}'.format(time_per_div), 0.0 )
+        return time_per_div
+
+    def auto_range( self, time_per_div ):
+        for channel in self.autorange:
+            self.scales[channel] = auto_range( self.ds, channel,
+                                      self.scales.get(channel), self.probe,
+                                      wait=SCREEN_DIVS*time_per_div )
+
+    def read( self ):
+        return read_measurements( self.ds, self.specs, 0.0 )
+
+    def settle( self, time_per_div ):
+        # poll once per screen from the first new screen on; the averaged
+        # readings may take the full averaging time to settle
+        screen = SCREEN_DIVS * time_per_div
+        time.sleep( screen )
+        timeout = max( self.timeout, self.settle_time(time_per_div) + screen )
+        return wait_settled( self.read, self.tolerances, self.stable,
+                             timeout, poll=screen )
+
+    def measure( self, freq, adjust=None ):
+        # one sweep step; adjust(freq, values) may change the settings
+        # (e.g. the vertical scale) and returns True if it did, then
+        # the step waits again for settled values
+        time_per_div = self.set_frequency( freq )
+        self.auto_range( time_per_div )
+        values, settled = self.settle( time_per_div )
+        if adjust is not None and settled and adjust( freq, values ):
+            values, settled = self.settle( time_per_div )
+        for attempt in range( self.retries ):
+            if None not in values:
+                break
+            values, settled = self.settle( time_per_div )
+        return values, settled
+
+    def measure_fit( self, freq, channels=(1, 2) ):
+        # gain and phase (out/in) from one capture of both channels
+        time_per_div = self.set_frequency( freq )
+        self.auto_range( time_per_div )
+        time.sleep( self.settle_time(time_per_div) )
+        (data_in, params_in), (data_out, params_out) = read_channels( self.ds, channels )
+        return gain_phase( data_in, data_out, freq, params_in['xinc'],
+                           params_in, params_out )
+
+    def run( self, freqs, adjust=None, journal=None, setup=None ):
+        # yields (freq, values, settled) for each frequency; with a
+        # journal, the completed frequencies are not measured again and
+        # setup() (re)configures the instruments on start and after errors
+        if journal is None:
+            for freq in freqs:
+                values, settled = self.measure( freq, adjust )
+                yield freq, values, settled
+            return
+        def do_step( freq ):
+            values, settled = self.measure( freq, adjust )
+            return [values, settled]
+        for freq, (values, settled) in run_steps( freqs, do_step, journal, setup ):
+            yield freq, values, settled
+
+############################################################################
+
+class AdaptivePlanner(object):
+    # Adaptive selection of the frequency points of a response sweep.
+    # Starts from 'coarse' log-spaced points and bisects (in log scale)
+    # the intervals with the largest change of gain (dB) or phase (deg.)
+    # relative to the tolerances, until all intervals are within the
+    # tolerances or 'max_points' have been measured.
+    # measure(freq) returns (gain, phase) or None, e.g.
+    #   planner.run( lambda f: sweep.measure_fit(f) )
+
+    def __init__( self, f_min, f_max, coarse=7, max_points=30,
+                  gain_tol=1.0, phase_tol=10.0, min_ratio=1.05 ):
+        self.f_min = f_min
+        self.f_max = f_max
+        self.coarse = coarse
+        self.max_points = max_points
+        self.gain_tol = gain_tol
+        self.phase_tol = phase_tol
+        self.min_ratio = min_ratio
+        self.points = {}   # freq -> (gain in dB, phase) or None
+
+    def add( self, freq, result ):
+        if result is None or result[0] is None or result[0] <= 0:
+            self.points[freq] = None
+        else:
+            self.points[freq] = (20*math.log10(result[0]), result[1])
+
+    def _score( self, p1, p2 ):
+        (g1, ph1), (g2, ph2) = p1, p2
+        d_phase = abs( (ph2 - ph1 + 180.0) % 360.0 - 180.0 )
+        return max( abs(g2 - g1) / self.gain_tol, d_phase / self.phase_tol )
+
+    def next_points( self ):
+        # the next frequencies to be measured (empty when done)
+        budget = self.max_points - len(self.points)
+        if budget <= 0:
+            return []
+        if not self.points:
+            freqs = np.logspace( math.log10(self.f_min), math.log10(self.f_max),
+                                 self.coarse )
+            return list( freqs[:budget] )
+        freqs = sorted( f for f in self.points if self.points[f] is not None )
+        scores = []
+        for f1, f2 in zip( freqs[:-1], freqs[1:] ):
+            if f2 / f1 < self.min_ratio:
+                continue
+            score = self._score( self.points[f1], self.points[f2] )
+            if score > 1.0:
+                scores.append( (score, math.sqrt(f1*f2)) )
+        scores.sort( reverse=True )
+        # a measured midpoint (also a failed one: None) is not tried again
+        return [ f for score, f in scores if not self._measured(f) ][:budget]
+
+    def _measured( self, freq ):
+        # also after a resume (the journal keys are rounded to 9 digits)
+        return any( abs(freq / f - 1.0) < 1e-8 for f in self.points )
+
+    def run( self, measure, journal=None, setup=None ):
+        # returns (freqs, gain, phase) sorted by frequency
+        def do_step( freq ):
+            result = measure( freq )
+            return list( result ) if result is not None else None
+        if journal is not None:
+            for key, result in journal.done.items():
+                self.add( float(key), result )
+        while True:
+            freqs = self.next_points()
+            if not freqs:
+                break
+            if journal is None:
+                for freq in freqs:
+                    self.add( freq, measure(freq) )
+                continue
+            for freq, result in run_steps( freqs, do_step, journal, setup ):
+                self.add( freq, result )
+        return self.result()
+
+    def result( self ):
+        freqs = sorted( f for f in self.points if self.points[f] is not None )
+        gain = [ 10**(self.points[f][0]/20.0) for f in freqs ]
+        phase = [ self.points[f][1] for f in freqs ]
+        return np.array( freqs ), np.array( gain ), np.array( phase )
+
+############################################################################
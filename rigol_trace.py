@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Per-command tracing of the command layer (rigol_instr.py: cmdWrite,
+#    cmdWriteRaw, cmdRead, cmdReadRaw). While tracing, each command is
+#    recorded as a span:
+#      command, instrument, bytes out (command), bytes in (reply),
+#      write time, sleep (requested 'dly' and the actual time),
+#      read time = wait (instrument processing) + transfer
+#    The read time is split with the throughput of the link: the transfer
+#    time is bytes in / bytes_per_sec, the rest is waiting. If the
+#    throughput is not given, the best one of the large reads is used.
+#    Without a tracer, the command layer only checks 'tracer is None'.
+#    The listeners of a tracer get each span and the reply, e.g. the
+#    metrics (rigol_metrics.py); keep=False does not store the spans.
+#    start() keeps the listeners of the running tracer, and stop() goes
+#    back to it, so tracing a run does not disconnect the metrics.
+#    The spans are exported as Chrome trace events (JSON, open it with
+#    chrome://tracing or https://ui.perfetto.dev), one row (thread) per
+#    instrument, or summarized as a table of the slowest commands.
+############################################################################
+# Usage:
+#   tracer = rigol_trace.start()
+#   ...
+#   rigol_trace.stop()
+#   tracer.save_chrome( 'trace.json' )
+#   tracer.print_summary()
+#
+############################################################################
+
+import time, json
+import threading
+import collections
+
+import rigol_instr
+
+MIN_RATE_BYTES = 10000   # min. reply size for the throughput estimate
+
+Span = collections.namedtuple( 'Span', 'instr command kind start write sleep_req '
+                               'sleep read bytes_out bytes_in error' )
+
+_names = {}   # id(instr) -> name (of all tracers)
+
+############################################################################
+
+class Tracer(object):
+
+    def __init__( self, bytes_per_sec=None, keep=True ):
+        self.bytes_per_sec = bytes_per_sec   # None: estimated
+        self.keep = keep
+        self.spans = []
+        self.listeners = []     # listener( span, reply )
+        self.instruments = {}   # id(instr) -> (row, name)
+        self.previous = None    # the tracer running before start()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def instrument_name( self, key ):
+        return self.instruments[key][1]
+
+    def _instrument( self, instr ):
+        key = id( instr )
+        if key not in self.instruments:
+            with self._lock:
+                name = getattr( instr, 'resource_name', None ) or type(instr).__name__
+                self.instruments.setdefault( key, (len(self.instruments) + 1, name) )
+                _names[key] = name
+        return key
+
+    def command( self, instr, cmd, dly, kind ):
+        # the traced version of the command layer functions
+        t_start = time.perf_counter()
+        if kind == 'write_raw':
+            instr.write_raw( cmd )
+            bytes_out = len( cmd )
+            cmd = bytes( cmd[:40] ).decode( 'ascii', 'replace' )
+        else:
+            instr.write( cmd )
+            bytes_out = len( cmd ) + 1
+        t_write = time.perf_counter()
+        time.sleep( dly )
+        t_sleep = time.perf_counter()
+        resp, error = None, None
+        if kind in ('read', 'read_raw'):
+            try:
+                resp = instr.read() if kind == 'read' else instr.read_raw()
+            except Exception as ex:
+                rigol_instr.log.warning( '%s: %s', cmd, ex )
+                error = str( ex )
+        t_read = time.perf_counter()
+        span = Span( self._instrument(instr), cmd, kind, t_start - self._t0,
+                     t_write - t_start, dly, t_sleep - t_write, t_read - t_sleep,
+                     bytes_out, len(resp) if resp is not None else 0, error )
+        if self.keep:
+            self.spans.append( span )
+        for listener in self.listeners:
+            listener( span, resp )
+        if kind == 'read' and resp is not None:
+            return resp.rstrip('\r\n')
+        return resp
+
+    ########################################################################
+
+    def link_rate( self ):
+        # bytes/s of the link: given, or the best rate of the large reads
+        if self.bytes_per_sec:
+            return self.bytes_per_sec
+        rates = [ s.bytes_in / s.read for s in self.spans
+                  if s.bytes_in >= MIN_RATE_BYTES and s.read > 0 ]
+        return max( rates ) if rates else None
+
+    def split_read( self, span, rate=None ):
+        # (wait, transfer) of the read time of a span
+        rate = rate or self.link_rate()
+        if not rate:
+            return span.read, 0.0
+        transfer = min( span.read, span.bytes_in / float(rate) )
+        return span.read - transfer, transfer
+
+    def chrome_events( self ):
+        # Chrome trace events: one complete event ('X') per command with
+        # the phases (write, sleep, wait, transfer) as nested events
+        rate = self.link_rate()
+        events = []
+        for key, (row, name) in self.instruments.items():
+            events.append( {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': row,
+                            'args': {'name': name}} )
+        for span in self.spans:
+            row = self.instruments[span.instr][0]
+            wait, transfer = self.split_read( span, rate )
+            total = span.write + span.sleep + span.read
+            events.append( {'name': span.command, 'cat': span.kind, 'ph': 'X',
+                            'pid': 1, 'tid': row, 'ts': span.start * 1e6,
+                            'dur': total * 1e6,
+                            'args': {'bytes_out': span.bytes_out,
+                                     'bytes_in': span.bytes_in,
+                                     'sleep_requested': span.sleep_req,
+                                     'error': span.error}} )
+            t = span.start
+            for phase, seconds in (('write', span.write), ('sleep', span.sleep),
+                                   ('wait', wait), ('transfer', transfer)):
+                if seconds > 0:
+                    events.append( {'name': phase, 'cat': 'phase', 'ph': 'X',
+                                    'pid': 1, 'tid': row, 'ts': t * 1e6,
+                                    'dur': seconds * 1e6} )
+                t += seconds
+        return events
+
+    def save_chrome( self, filename ):
+        with open( filename, 'w' ) as f:
+            json.dump( {'traceEvents': self.chrome_events(),
+                        'displayTimeUnit': 'ms'}, f )
+
+    def summary( self, top=10 ):
+        # per command header: count, total time, max. time, bytes in,
+        # sleep, wait and transfer; sorted by the total time
+        rate = self.link_rate()
+        stats = {}
+        for span in self.spans:
+            head = span.command.split(' ')[0]
+            wait, transfer = self.split_read( span, rate )
+            entry = stats.setdefault( head, [0, 0.0, 0.0, 0, 0.0, 0.0, 0.0] )
+            total = span.write + span.sleep + span.read
+            entry[0] += 1
+            entry[1] += total
+            entry[2] = max( entry[2], total )
+            entry[3] += span.bytes_in
+            entry[4] += span.sleep
+            entry[5] += wait
+            entry[6] += transfer
+        return sorted( stats.items(), key=lambda item: -item[1][1] )[:top]
+
+    def print_summary( self, top=10 ):
+        print ( '{:>24s} {:>6s} {:>9s} {:>9s} {:>11s} {:>9s} {:>9s} {:>9s}'.format(
+                'command', 'count', 'total', 'max', 'bytes in', 'sleep', 'wait', 'transfer') )
+        for head, (count, total, longest, nbytes, sleep, wait, transfer) in self.summary( top ):
+            print ( '{:>24s} {:>6d} {:>8.3f}s {:>8.3f}s {:>11d} {:>8.3f}s {:>8.3f}s {:>8.3f}s'.format(
+                    head[:24], count, total, longest, nbytes, sleep, wait, transfer) )
+
+############################################################################
+
+def instrument_name( key ):
+    # the name of an instrument of a span (Span.instr)
+    return _names.get( key, '?' )
+
+def start( bytes_per_sec=None ):
+    # trace the commands from now on; returns the tracer. The listeners
+    # of the running tracer (the same list) are kept
+    tracer = Tracer( bytes_per_sec )
+    previous = rigol_instr.tracer
+    if previous is not None:
+        tracer.listeners = previous.listeners
+        tracer.previous = previous
+    rigol_instr.tracer = tracer
+    return tracer
+
+def stop():
+    # stop tracing; returns the tracer (or None). The listeners go on with
+    # the previous tracer, or with a new one which does not keep the spans
+    tracer = rigol_instr.tracer
+    if tracer is None:
+        return None
+    previous = tracer.previous
+    if tracer.listeners:
+        if previous is None:
+            previous = Tracer( keep=False )
+        previous.listeners = tracer.listeners
+    elif previous is not None and not previous.keep:
+        previous = None   # only kept for the listeners
+    rigol_instr.tracer = previous
+    return tracer
+
+############################################################################
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Arbitrary waveform data for the Rigol DG1022 function generator.
+#    A waveform is an array of DAC codes (14-bit, 0..16383) uploaded with
+#    'DATA:DAC VOLATILE,<data>'.
+#    Basic shapes (DAC codes, uint16), computed without Python loops over
+#    the points, one period = one record, t = -0.5..+0.5 (center = 0):
+#     - sine, halfwave_sine, square, sawtooth, sinc, exp_cos_sym
+#    dac_string() converts the codes to the comma separated list in one
+#    step using a table of the 16384 possible code strings.
+#    The functions below return waveforms normalized to -1.0..+1.0;
+#    to_dac() converts them to DAC codes.
+#    Wideband excitation signals (one period = one record):
+#     - log_chirp : a sine sweep with exponentially increasing frequency
+#     - multitone : a sum of sines (harmonics) with Schroeder phases,
+#                   which gives a low crest factor
+#    resample() fits a waveform (one period) of any length, e.g. a
+#    captured oscilloscope record, to the number of points of the
+#    generator without aliasing: a long record is first decimated by a
+#    polyphase FIR filter (a few multiply-adds per input point), then the
+#    spectrum is cut (or zero-padded) to the target length (FFT).
+#    fit_dac() returns the DAC codes and caches them per target length.
+############################################################################
+
+import hashlib
+import functools
+import collections
+import numpy as np
+
+DAC_MAX = 16383
+DAC_MID = 8192
+MAX_POINTS = 4096   # DG1022: 'DATA:ATTR:POIN? VOLATILE'
+
+_DAC_STR = [ str(code) for code in range(DAC_MAX + 1) ]
+
+FIR_PHASE_TAPS = 8     # taps per polyphase branch of the decimation filter
+FIT_CACHE_SIZE = 16
+
+_fit_cache = collections.OrderedDict()
+
+############################################################################
+
+def to_dac( y ):
+    # -1.0..+1.0 -> 1..16383 (8191*y + 8192, truncated), clipped to 0..16383
+    codes = np.floor( 8191.0 * np.asarray(y, dtype=np.float64) + 8192.0 )
+    return np.clip( codes, 0, DAC_MAX ).astype( np.uint16 )
+
+def dac_string( codes ):
+    # the data for the 'DATA:DAC' command: '8192,8195,...'
+    codes = np.clip( np.asarray(codes), 0, DAC_MAX ).astype( np.uint16 )
+    return ','.join( map(_DAC_STR.__getitem__, codes.tolist()) )
+
+def time_base( n ):
+    # t = -0.5 .. +0.5 (n points, one period)
+    return np.arange( -(n//2), n - n//2 ) / float( n )
+
+def normalize( y ):
+    y = np.asarray( y, dtype=np.float64 )
+    y = y - 0.5 * (y.max() + y.min())
+    peak = np.abs( y ).max()
+    return y / peak if peak > 0 else y
+
+def crest_factor( y ):
+    y = np.asarray( y, dtype=np.float64 )
+    return np.abs( y ).max() / np.sqrt( np.mean(y*y) )
+
+############################################################################
+
+def sine( n=1024 ):
+    return to_dac( np.sin(2*np.pi * time_base(n)) )
+
+def halfwave_sine( n=512 ):
+    return to_dac( np.abs(np.sin(np.pi * time_base(n))) )
+
+def square( n=1024, duty_cycle=0.5 ):
+    codes = np.zeros( n, dtype=np.uint16 )
+    codes[: int(np.ceil(duty_cycle * n))] = DAC_MAX
+    return codes
+
+def sawtooth( n=2048 ):
+    return (DAC_MAX * np.arange(n) // n).astype( np.uint16 )
+
+def sinc( n=1024, k=2.0 ):
+    # k: time compression factor
+    return to_dac( np.sinc(2*np.pi*k * time_base(n)) )
+
+def exp_cos_sym( n=512, k=4.0 ):
+    t = time_base( n )
+    return to_dac( np.exp(-2*k*np.abs(t)) * np.cos(2*np.pi*k * t) )
+
+############################################################################
+
+def log_harmonics( ratio, count ):
+    # about 'count' distinct harmonics, log-spaced from 1 to 'ratio'
+    h = np.unique( np.rint(np.logspace(0, np.log10(ratio), count)).astype(int) )
+    return h[h >= 1]
+
+def log_chirp( n, h_start, h_stop ):
+    # exponential sine sweep from harmonic h_start to h_stop of the
+    # record (the instantaneous frequency is in cycles per record)
+    t = np.arange( n ) / float( n )
+    k = np.log( float(h_stop) / h_start )
+    phase = 2*np.pi * h_start * (np.exp(k * t) - 1.0) / k
+    return np.sin( phase )
+
+def multitone( n, harmonics, amplitudes=None, iterations=100 ):
+    # sum of cosines at the given harmonics of the record, normalized
+    # to +-1.0. The phases start from Schroeder phases and are improved
+    # by iterative clipping: clip the peaks, then restore the amplitude
+    # spectrum (keeping the new phases), which lowers the crest factor.
+    harmonics = np.asarray( harmonics )
+    if amplitudes is None:
+        amplitudes = np.ones( len(harmonics) )
+    power = amplitudes**2 / np.sum( amplitudes**2 )
+    phases = -2*np.pi * np.cumsum( np.concatenate(([0.0], np.cumsum(power)[:-1])) )
+    spectrum = np.zeros( n//2 + 1, dtype=complex )
+    spectrum[harmonics] = amplitudes * np.exp( 1j*phases )
+    y = np.fft.irfft( spectrum, n )
+    best, best_cf = y, crest_factor( y )
+    for i in range( iterations ):
+        limit = 0.9 * np.abs( y ).max()
+        clipped = np.fft.rfft( np.clip(y, -limit, limit) )
+        spectrum[harmonics] = amplitudes * np.exp( 1j*np.angle(clipped[harmonics]) )
+        y = np.fft.irfft( spectrum, n )
+        cf = crest_factor( y )
+        if cf < best_cf:
+            best, best_cf = y, cf
+    return best / np.abs( best ).max()
+
+############################################################################
+
+@functools.lru_cache( maxsize=16 )
+def _decimation_filter( factor, phase_taps=FIR_PHASE_TAPS ):
+    # Blackman-windowed sinc lowpass (cutoff: the new Nyquist frequency),
+    # as an array of polyphase branches (phase_taps x factor)
+    taps = phase_taps * factor
+    k = np.arange( taps ) - (taps - 1) / 2.0
+    h = np.sinc( k / factor ) * np.blackman( taps )
+    h = (h / h.sum()).astype( np.float32 )
+    return h.reshape( phase_taps, factor )
+
+def decimate( y, factor ):
+    # lowpass filter and keep every 'factor'-th point; y is one period
+    # (the filter wraps around). Returns (data, delay in output points).
+    branches = _decimation_filter( factor )
+    n = len(y) // factor
+    blocks = np.asarray( y[:n*factor], dtype=np.float32 ).reshape( n, factor )
+    out = np.zeros( n, dtype=np.float64 )
+    for m in range( len(branches) ):
+        # out[k] += sum_p h[m*factor + p] * y[(k - m)*factor + p]
+        out += np.roll( blocks.dot(branches[m][::-1]), m )
+    return out, (branches.size - 1) / (2.0 * factor) - (factor - 1) / float(factor)
+
+def resample( y, n ):
+    # band-limited resampling of one period of a waveform to n points
+    y = np.asarray( y )
+    delay = 0.0
+    if len(y) >= 8 * n:
+        # a factor between N/8n and N/4n which (nearly) divides N, so
+        # that (almost) no points are dropped from the period
+        factors = np.arange( len(y) // (4 * n), len(y) // (8 * n) - 1, -1 )
+        factor = int( factors[np.argmin(len(y) % factors)] )
+        y, delay = decimate( y, factor )
+    y = np.asarray( y, dtype=np.float64 )
+    if len(y) == n and delay == 0.0:
+        return y.copy()
+    spectrum = np.fft.rfft( y )
+    bins = n // 2 + 1
+    if len(spectrum) > bins:
+        spectrum = spectrum[:bins]
+    elif len(spectrum) < bins:
+        if len(y) % 2 == 0:   # split the Nyquist bin
+            spectrum[-1] *= 0.5
+        spectrum = np.concatenate( (spectrum, np.zeros(bins - len(spectrum), complex)) )
+    if delay:
+        spectrum *= np.exp( 2j*np.pi * np.arange(bins) * delay / len(y) )
+    return np.fft.irfft( spectrum, n ) * (float(n) / len(y))
+
+def fit_dac( y, n=MAX_POINTS ):
+    # one period of any length -> n DAC codes (normalized to the full
+    # scale), cached on the content and n
+    y = np.ascontiguousarray( y )
+    key = (hashlib.sha1( y.view(np.uint8) ).hexdigest(), y.dtype.str, len(y), n)
+    if key in _fit_cache:
+        _fit_cache.move_to_end( key )
+        return _fit_cache[key]
+    codes = to_dac( normalize(resample(y, n)) )
+    codes.setflags( write=False )
+    _fit_cache[key] = codes
+    if len(_fit_cache) > FIT_CACHE_SIZE:
+        _fit_cache.popitem( last=False )
+    return codes
+
+############################################################################
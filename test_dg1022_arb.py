@@ -10,6 +10,7 @@
 import visa
 import time, sys, re
 import numpy as np
+import rigol_wave
 
 vendor_id   = None
 device_id   = None
@@ -87,31 +88,19 @@ cmdWrite( "SYSTem:REMote" )
 ############################################################################
 def gen_data_sin():
     N = 512                   # number of samples per period
-    x = np.arange(-N/2,N/2)   # N points per period
-    #y = [ int(8191 * np.sin( 2*np.pi*i/N) + 8192) for i in x ]
-    y = 8191*np.sin(2*x*np.pi/N) + 8192
-    y = y.astype(int)
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.sine(N) )
 
 def gen_data_halfwave_sin():
     N = 512                   # number of samples per period
-    x = np.arange(-N/2,N/2)   # N points per period
-    #y = [ int(8191 * np.abs(np.sin( np.pi*i/N)) + 8192) for i in x ]
-    y = 8191*np.abs(np.sin(x*np.pi/N)) + 8192
-    y = y.astype(int)
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.halfwave_sine(N) )
 
 def gen_data_square( duty_cycle = 0.5 ):
     N = 1024              # number of samples per period
-    x = np.arange(0,N)    # N points per period
-    y = [ int(16383 * (i < duty_cycle*N)) for i in x ]
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.square(N, duty_cycle) )
 
 def gen_data_sawtooth( ):
     N = 2048              # number of samples per period
-    x = np.arange(0,N)    # N points per period
-    y = [ int( 16383.0*i/N ) for i in x ]
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.sawtooth(N) )
 
 #data = gen_data_sin()
 #data = gen_data_halfwave_sin()
@@ -37,6 +37,7 @@
 import visa
 import time, sys, re
 import numpy as np
+import rigol_wave
 
 vendor_id   = None
 device_id   = None
@@ -118,24 +119,17 @@ cmdWrite( "SYSTem:REMote" )
 ###############################################################
 def gen_data_sin():
     N = 512               # number of samples per a half period
-    x = np.arange(-N,N)   # 2N points per period
-    y = [ int(8191 * np.sin( np.pi*i/N) + 8192) for i in x ]
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.sine(2*N) )
 
 def gen_data_sinc():
     N = 512               # number of samples per a half period
     k = 2                 # time compression factor
-    x = np.arange(-N,N)   # 2N points per period
-    y = [ int(8191 * np.sinc(np.pi*k*i/N) + 8192) for i in x ]
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.sinc(2*N, k) )
 
 def gen_data_exp_cos_sym():
     N = 256               # number of samples per a half period
     k = 4.0               # time compression factor
-    x = np.arange(-N,N)   # 2N points per period
-    y = [ int(8191 * np.exp(-np.abs(k*i)/N) * np.cos(np.pi*k*i/N) + 8192) 
-            for i in x ]
-    return ','.join(map(str,y))
+    return rigol_wave.dac_string( rigol_wave.exp_cos_sym(2*N, k) )
 
 ###############################################################
 data = gen_data_sin() 
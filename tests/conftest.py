@@ -0,0 +1,17 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    Regression tests of the rigol_*.py modules, without instruments
+#    (synthetic data, rigol_sim.py).
+############################################################################
+# Usage:
+#   $ python3 -m pytest -q
+#
+############################################################################
+
+import os, sys
+
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+
+############################################################################
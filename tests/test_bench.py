@@ -0,0 +1,33 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_bench.py: the stages after the transfers use the largest capture
+#    (not the last --points size), np.save is timed in its own stage, and
+#    the temporary directory is removed.
+############################################################################
+
+import os
+import json
+
+import rigol_bench
+
+############################################################################
+
+def test_sim( tmp_path ):
+    output = str( tmp_path / 'result.json' )
+    assert rigol_bench.main( ['--sim', '--points', '140K,14K', '--repeat', '1',
+                              '-o', output] ) == 0
+    with open( output ) as f:
+        results = json.load( f )['results']
+    assert results['transfer_0.14M']['points'] == 140000
+    assert results['transfer_0.014M']['points'] == 14000
+    for name in ('parse_header', 'to_volts', 'time_axis', 'decimate',
+                 'save_capture', 'render_png'):
+        assert results[name]['points'] == 140000
+
+def test_close():
+    pipeline = rigol_bench.Pipeline( None )
+    assert os.path.isdir( pipeline.directory )
+    pipeline.close()
+    assert not os.path.exists( pipeline.directory )
@@ -0,0 +1,50 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_dg1022.py: software sweep (fallback of the hardware sweep) and
+#    the fallback itself, with the simulated DG1022 (rigol_sim.py).
+############################################################################
+
+import math
+import numpy as np
+import pytest
+
+import rigol_sim
+import rigol_dg1022
+from rigol_instr import cmdWrite, cmdRead
+
+############################################################################
+
+def test_software_sweep_before_the_first_step():
+    sweep = rigol_dg1022.SoftwareSweep( rigol_sim.SimGenerator(), 10.0, 1000.0, 0.2 )
+    assert math.isnan( sweep.frequency_at(0.1) )
+    assert math.isnan( sweep.time_at(100.0) )
+    assert np.isnan( sweep.frequency_at([0.0, 0.1]) ).all()
+
+def test_software_sweep_reaches_f_stop():
+    dg = rigol_sim.SimGenerator( apply_time=0.0 )
+    sweep = rigol_dg1022.SoftwareSweep( dg, 10.0, 1000.0, 0.2, 'LOG', points=20 )
+    sweep.start()
+    sweep.join()
+    freqs = [ freq for t, freq in sweep.steps ]
+    assert len(freqs) == 20
+    assert freqs[0] == pytest.approx( 10.0 )
+    assert freqs[-1] == 1000.0
+    assert np.all( np.diff(freqs) > 0 )
+    assert float( cmdRead(dg, 'FREQ?', 0.0) ) == pytest.approx( 1000.0 )
+    # the steps are at the scheduled times (LOG spacing)
+    t_100 = sweep.time_at( 100.0 )
+    assert t_100 == pytest.approx( 0.1, abs=0.03 )
+    assert sweep.frequency_at( t_100 ) >= 100.0
+    assert not math.isnan( sweep.time_at(1000.0) )
+
+def test_rejected_hardware_sweep_restores_the_settings():
+    dg = rigol_sim.SimGenerator( sweep=False )
+    cmdWrite( dg, 'TRIG:SOUR EXT', 0.0 )
+    sweep = rigol_dg1022.start_sweep( dg, 10.0, 1000.0, 0.1, points=5 )
+    assert isinstance( sweep, rigol_dg1022.SoftwareSweep )
+    sweep.join()
+    assert cmdRead( dg, 'TRIG:SOUR?', 0.0 ) == 'EXT'
+
+############################################################################
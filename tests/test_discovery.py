@@ -0,0 +1,88 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_discovery.py: the resource names (hex and decimal USB IDs),
+#    the vendor filter (other instruments are never opened) and the cache
+#    shared by the Discovery instances.
+############################################################################
+
+import pytest
+
+from rigol_discovery import Discovery, parse_resource
+
+class FakeInstr(object):
+    def __init__( self, idn ):
+        self.idn = idn
+    def write( self, cmd ):
+        pass
+    def read( self ):
+        return self.idn + '\n'
+    def close( self ):
+        pass
+
+class FakeResources(object):
+    # a ResourceManager: list_resources() and open_resource() are counted
+    def __init__( self, idns ):
+        self.idns = idns    # resource name -> '*IDN?'
+        self.opened = []
+    def list_resources( self, query ):
+        return [ name for name in self.idns if name.startswith( query[:3] ) ]
+    def open_resource( self, name, **kwargs ):
+        self.opened.append( name )
+        return FakeInstr( self.idns[name] )
+
+RIGOL_DS = 'USB0::0x1AB1::0x04B0::DS2A000000001::INSTR'
+RIGOL_DG = 'USB0::6833::1416::DG1D123456789::INSTR'
+OTHER = 'USB0::0x0957::0x1796::MY12345678::INSTR'
+IDNS = { RIGOL_DS: 'RIGOL TECHNOLOGIES,DS2202A,DS2A000000001,00.03.05',
+         RIGOL_DG: 'RIGOL TECHNOLOGIES,DG1022 ,DG1D123456789,,00.03.00',
+         OTHER: 'AGILENT TECHNOLOGIES,DSO-X 2024A,MY12345678,02.41' }
+
+############################################################################
+
+@pytest.mark.parametrize( 'name, vendor_id, product_id, serial, family', [
+    ('USB0::0x1AB1::0x04B0::DS2A0001::INSTR', 0x1AB1, 0x04B0, 'DS2A0001', 'DS2000A'),
+    ('USB0::6833::1200::DS2A0001::INSTR', 6833, 1200, 'DS2A0001', 'DS2000A'),
+    ('USB0::0x1ab1::0x04ce::XYZ::INSTR', 0x1AB1, 0x04CE, 'XYZ', 'DS1000Z'),
+    ('USB1::0x1AB1::0x0588::DG1D123::INSTR', 0x1AB1, 0x0588, 'DG1D123', 'DG1000'),
+    ('TCPIP0::192.168.1.10::INSTR', None, None, None, None) ] )
+def test_parse_resource( name, vendor_id, product_id, serial, family ):
+    device = parse_resource( name )
+    assert (device.vendor_id, device.product_id) == (vendor_id, product_id)
+    assert (device.serial, device.family) == (serial, family)
+
+def test_parse_idn():
+    device = parse_resource( 'TCPIP0::192.168.1.10::INSTR',
+                             'RIGOL TECHNOLOGIES,DS1104Z,DS1ZA000001,00.04.04' )
+    assert device.interface == 'TCPIP' and device.board == 0
+    assert (device.model, device.family) == ('DS1104Z', 'DS1000Z')
+    assert parse_resource( 'ASRL1::INSTR' ).board == 1
+
+def test_other_vendor( tmp_path ):
+    resources = FakeResources( IDNS )
+    discovery = Discovery( '@fake', cache_file=str(tmp_path / 'cache.json'),
+                           resources=resources )
+    names = [ device.resource for device in discovery.devices() ]
+    assert names == [RIGOL_DS, RIGOL_DG]
+    assert OTHER not in resources.opened
+    assert discovery.find( 'DS' ).model == 'DS2202A'
+    assert discovery.find( family='DG1000' ).resource == RIGOL_DG
+
+def test_cache( tmp_path ):
+    cache_file = str( tmp_path / 'cache.json' )
+    first = Discovery( '@fake', cache_file=cache_file, resources=FakeResources(IDNS) )
+    assert len( first.devices() ) == 2 and first.enumerations == 1
+    resources = FakeResources( IDNS )
+    second = Discovery( '@fake', cache_file=cache_file, resources=resources )
+    assert second.devices() == first.devices()
+    assert second.enumerations == 0 and resources.opened == []
+    # another library: its own entry
+    third = Discovery( '@other', cache_file=cache_file, resources=FakeResources(IDNS) )
+    third.devices()
+    assert third.enumerations == 1
+    # expired: enumerated again, '*IDN?' not queried again
+    resources = FakeResources( IDNS )
+    fourth = Discovery( '@fake', cache_file=cache_file, ttl=0.0, resources=resources )
+    assert len( fourth.devices() ) == 2
+    assert fourth.enumerations == 1 and resources.opened == []
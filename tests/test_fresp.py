@@ -0,0 +1,36 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_fresp.py: the multitone and the log-chirp measurements reproduce
+#    the magnitude and the phase of the RC lowpass of rigol_sim.make_bench
+#    (fc = 100 Hz), at the harmonics of f_rep only.
+############################################################################
+
+import numpy as np
+import pytest
+
+import rigol_sim
+import rigol_fresp
+
+FC = 100.0
+
+############################################################################
+
+@pytest.mark.parametrize( 'kind', ['multitone', 'chirp'] )
+def test_rc_lowpass( kind ):
+    ds, dg = rigol_sim.make_bench( fc=FC )
+    freqs, gain, phase = rigol_fresp.measure_response( ds, dg, f_min=10.0, f_max=1000.0,
+                                                       kind=kind, tones=10 )
+    h = rigol_sim.rc_lowpass( FC )( freqs )
+    error = phase - np.degrees( np.angle(h) )
+    assert len( freqs ) == (10 if kind == 'multitone' else 100)
+    assert np.allclose( freqs / freqs[0], np.rint(freqs / freqs[0]) )
+    assert np.max( np.abs(gain - np.abs(h)) ) < 0.04
+    if kind == 'multitone':
+        assert np.max( np.abs(error) ) < 3.0
+    else:
+        # the chirp spreads the excitation over all the harmonics: above
+        # 5*fc the phase is limited by the noise of the scope
+        assert np.max( np.abs(error[freqs <= 5*FC]) ) < 6.0
+        assert np.sqrt( np.mean(error**2) ) < 5.0
@@ -0,0 +1,63 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_instr.py: the timeout and the chunk size of the link model
+#    (LinkModel), and their use by cmdReadRaw( ..., nbytes ).
+############################################################################
+
+import time
+
+import pytest
+
+import rigol_instr
+from rigol_instr import LinkModel, MIN_CHUNK, MAX_CHUNK
+
+class FakeInstr(object):
+    # records the timeout and the chunk size of the read
+    def __init__( self, reply, seconds=0.02 ):
+        self.reply, self.seconds = reply, seconds
+        self.timeout, self.chunk_size = 2000, 20 * 1024
+        self.used = None
+    def write( self, cmd ):
+        pass
+    def read_raw( self ):
+        self.used = (self.timeout, self.chunk_size)
+        time.sleep( self.seconds )
+        return self.reply
+
+############################################################################
+
+def test_timeout():
+    link = LinkModel( latency=0.005, bytes_per_sec=0.5e6 )
+    assert link.timeout_ms() == 500    # the floor (MIN_TIMEOUT)
+    # 14M bytes at 0.5 MB/s: 3 * 28 s + slack
+    expected = 3.0 * (0.005 + 14e6 / 0.5e6) + 0.1
+    assert link.timeout_ms( 14000000 ) == int( 1000 * expected + 0.5 )
+
+def test_chunk_size():
+    assert LinkModel( bytes_per_sec=0.1e6 ).chunk_size() == MIN_CHUNK
+    assert LinkModel( bytes_per_sec=10e6 ).chunk_size() == 1000000
+    assert LinkModel( bytes_per_sec=1e9 ).chunk_size() == MAX_CHUNK
+    # not more than the reply (rounded up to 1 KB)
+    assert LinkModel( bytes_per_sec=1e9 ).chunk_size( 1400 ) == 2048
+
+def test_observe():
+    link = LinkModel( latency=0.005, bytes_per_sec=0.5e6, alpha=0.5 )
+    link.observe( 100, 0.015 )          # a small reply: the latency
+    assert link.latency == pytest.approx( 0.010 )
+    assert link.bytes_per_sec == 0.5e6
+    link.observe( 1000000, 0.110 )      # the first large read: the rate
+    assert link.bytes_per_sec == pytest.approx( 10e6 )
+    link.observe( 1000000, 0.210 )      # then averaged
+    assert link.bytes_per_sec == pytest.approx( 7.5e6 )
+
+def test_read_raw_nbytes():
+    instr = FakeInstr( b'x' * 200000 )
+    link = rigol_instr.link_model( instr )
+    expected = (link.timeout_ms(200000), link.chunk_size(200000))
+    data = rigol_instr.cmdReadRaw( instr, ':WAV:DATA?', 0.0, nbytes=200000 )
+    assert len( data ) == 200000
+    assert instr.used == expected
+    assert (instr.timeout, instr.chunk_size) == (2000, 20 * 1024)   # restored
+    assert link.measured   # learned from the read
@@ -0,0 +1,84 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_journal.py: resuming a sweep (rigol_sweep.FreqSweep) with the
+#    simulated DS2000A and DG1022 (rigol_sim.make_bench).
+############################################################################
+
+import json
+
+import rigol_sim
+import rigol_sweep
+import rigol_journal
+from rigol_instr import cmdWrite
+
+SPECS = [ ('FREQ',1), ('VPP',1), ('VPP',2), ('RPH',1,2) ]
+FREQS = [ 100.0, 1000.0 ]
+
+class Sweep(rigol_sweep.FreqSweep):
+    # counts the measured frequencies; 'invalid': the frequencies
+    # without a valid reading
+
+    def __init__( self, invalid=() ):
+        ds, dg = rigol_sim.make_bench( fc=100.0 )
+        cmdWrite( dg, 'APPL:SIN 100,2,0', 0.0 )
+        cmdWrite( dg, 'OUTP ON', 0.0 )
+        rigol_sweep.FreqSweep.__init__( self, ds, dg, SPECS, timeout=0.5 )
+        self.invalid = invalid
+        self.measured = []
+        self._freq = None
+
+    def set_frequency( self, freq ):
+        self._freq = freq
+        self.measured.append( freq )
+        return rigol_sweep.FreqSweep.set_frequency( self, freq )
+
+    def read( self ):
+        if self._freq in self.invalid:
+            return [None] * len(SPECS)
+        return rigol_sweep.FreqSweep.read( self )
+
+def run( sweep, filename, stop_after=None ):
+    journal = rigol_journal.Journal( filename, {'freqs': FREQS} )
+    results = {}
+    for freq, values, settled in sweep.run( FREQS, journal=journal ):
+        results[freq] = values
+        if stop_after is not None and len(results) == stop_after:
+            break   # interrupted
+    return results
+
+############################################################################
+
+def test_resume_skips_completed_points( tmp_path ):
+    filename = str( tmp_path / 'journal.txt' )
+    first = Sweep()
+    run( first, filename, stop_after=1 )
+    assert first.measured == [100.0]
+    second = Sweep()
+    results = run( second, filename )
+    assert second.measured == [1000.0]
+    assert sorted( results ) == FREQS
+    assert results[100.0][1] > 1.0   # Vpp1 from the journal
+
+def test_invalid_points_are_measured_again( tmp_path ):
+    filename = str( tmp_path / 'journal.txt' )
+    first = Sweep( invalid=(1000.0,) )
+    results = run( first, filename )
+    assert None in results[1000.0]
+    second = Sweep()
+    results = run( second, filename )
+    assert second.measured == [1000.0]
+    assert None not in results[1000.0]
+
+def test_invalid_records_of_old_journals_are_dropped( tmp_path ):
+    filename = str( tmp_path / 'journal.txt' )
+    with open( filename, 'w' ) as f:
+        f.write( json.dumps({'header': None}) + '\n' )
+        f.write( json.dumps({'key': '100', 'result': [[None, 1.0], False]}) + '\n' )
+        f.write( json.dumps({'key': '1000', 'result': [[2.0, 1.0], True]}) + '\n' )
+    journal = rigol_journal.Journal( filename )
+    assert '100' not in journal.done
+    assert 1000.0 in journal
+
+############################################################################
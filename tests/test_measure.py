@@ -0,0 +1,57 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_measure.py: measurements of synthetic waveforms.
+############################################################################
+
+import numpy as np
+import pytest
+
+import rigol_measure
+
+XINC = 1e-5   # 100 kSa/s
+
+def sine( freq, amplitude, phase=0.0, points=20000, offset=0.0 ):
+    t = XINC * np.arange( points )
+    return offset + amplitude * np.sin( 2*np.pi*freq*t + np.radians(phase) )
+
+def square( freq, low, high, points=20000 ):
+    t = XINC * np.arange( points )
+    return np.where( (t * freq) % 1.0 < 0.5, high, low ).astype( np.float64 )
+
+############################################################################
+
+def test_sine_freq_vpp():
+    result = rigol_measure.measure( sine(1000.0, 1.5, offset=0.2), XINC )
+    assert result['freq'] == pytest.approx( 1000.0, rel=1e-3 )
+    assert result['vpp'] == pytest.approx( 3.0, rel=1e-3 )
+    assert result['vavg'] == pytest.approx( 0.2, abs=1e-2 )
+
+def test_square_levels_and_duty():
+    result = rigol_measure.measure( square(500.0, -1.0, 2.0), XINC )
+    assert result['freq'] == pytest.approx( 500.0, rel=1e-3 )
+    assert result['vtop'] == pytest.approx( 2.0 )
+    assert result['vbase'] == pytest.approx( -1.0 )
+    assert result['pduty'] == pytest.approx( 0.5, abs=0.01 )
+
+def test_phase_of_delayed_sine():
+    a = sine( 1000.0, 1.0 )
+    b = sine( 1000.0, 1.0, phase=-45.0 )   # B lags A by 45 deg.
+    assert rigol_measure.phase( a, b ) == pytest.approx( 45.0, abs=0.5 )
+
+def test_gain_phase_sine_fit():
+    data_in = sine( 200.0, 2.0 )
+    data_out = sine( 200.0, 1.0, phase=-60.0 )
+    gain, phase = rigol_measure.gain_phase( data_in, data_out, 200.0, XINC )
+    assert gain == pytest.approx( 0.5, rel=1e-6 )
+    assert phase == pytest.approx( -60.0, abs=1e-6 )
+
+def test_edges_without_lower_crossing():
+    # the record starts between the thresholds: no complete edge
+    data = np.array( [128]*5 + [200]*10, dtype=np.float64 )
+    edges = rigol_measure.Edges( data, {'vbase': 50.0, 'vtop': 200.0} )
+    assert len(edges.rise_mid) == 0
+    assert edges.period() is None
+
+############################################################################
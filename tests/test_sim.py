@@ -0,0 +1,46 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_sim.py: the device under test (e.g. rc_lowpass) also filters the
+#    periodic non-sine outputs (SQU, RAMP, PULS, USER) of the generator.
+############################################################################
+
+import numpy as np
+import pytest
+
+import rigol_sim
+import rigol_wave
+
+def harmonic( v, k, periods ):
+    return np.fft.rfft( v )[k * periods]
+
+def generator( func, freq=100.0 ):
+    dg = rigol_sim.SimGenerator()
+    dg.chan[1].update( OUTP=True, FUNC=func, FREQ=freq, VOLT=2.0, OFFS=0.5, PHAS=0.0 )
+    return dg
+
+############################################################################
+
+@pytest.mark.parametrize( 'func', ['SQU', 'RAMP', 'PULS', 'USER'] )
+def test_rc_lowpass( func ):
+    fc, freq, periods = 100.0, 100.0, 10
+    dg = generator( func, freq )
+    if func == 'USER':
+        dg.output = rigol_wave.sine( 1024 )
+    t = np.arange( 10000 ) / 1e5   # 10 periods
+    response = rigol_sim.rc_lowpass( fc )
+    v0, v = dg.voltage( 1, t ), dg.voltage( 1, t, response )
+    assert abs( v.mean() - 0.5 ) < 0.01   # the offset passes
+    for k in (1, 3):
+        if abs( harmonic(v0, k, periods) ) < 1.0:
+            continue   # no such harmonic (e.g. USER sine)
+        h = harmonic( v, k, periods ) / harmonic( v0, k, periods )
+        expected = response( k * freq )
+        assert abs( abs(h) - abs(expected) ) < 0.01
+        assert abs( np.angle(h) - np.angle(expected) ) < 0.05
+
+def test_no_response():
+    dg = generator( 'SQU' )
+    v = dg.voltage( 1, np.array([0.001, 0.006]) )
+    assert v.tolist() == [1.5, -0.5]
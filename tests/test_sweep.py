@@ -0,0 +1,39 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_sweep.py: adaptive selection of the frequency points.
+############################################################################
+
+import math
+
+import rigol_sweep
+
+def rc_response( freq, fc=100.0 ):
+    # (gain, phase in degrees) of a first-order RC low-pass
+    return 1.0 / math.sqrt(1.0 + (freq/fc)**2), -math.degrees( math.atan(freq/fc) )
+
+############################################################################
+
+def test_planner_refines_the_corner():
+    planner = rigol_sweep.AdaptivePlanner( 1.0, 10000.0, coarse=5, max_points=25 )
+    freqs, gain, phase = planner.run( rc_response )
+    assert len(planner.points) == 25
+    # most of the added points are around the corner frequency (100 Hz)
+    added = [ f for f in freqs if 10.0 < f < 1000.0 ]
+    assert len(added) > 10
+
+def test_planner_does_not_retry_failed_points():
+    calls = []
+    def measure( freq ):
+        calls.append( freq )
+        if 200.0 < freq < 400.0:
+            return None   # e.g. no valid reading
+        return rc_response( freq )
+    planner = rigol_sweep.AdaptivePlanner( 1.0, 10000.0, coarse=5, max_points=25 )
+    planner.run( measure )
+    assert len(calls) == len(set(round(f, 6) for f in calls))
+    # the failed midpoints do not use up the budget of the other intervals
+    assert len(planner.points) == 25
+
+############################################################################
@@ -0,0 +1,65 @@
+############################################################################
+# Date: 2026-10-19
+############################################################################
+# Description:
+#    rigol_wave.py: the vectorized waveforms give the same DAC codes (and
+#    the same 'DATA:DAC' strings) as the list comprehensions of the
+#    original DG1022 scripts.
+############################################################################
+
+import numpy as np
+import pytest
+
+import rigol_wave
+
+def old_string( y ):
+    return ','.join( map(str, y) )
+
+############################################################################
+
+@pytest.mark.parametrize( 'N', [256, 512, 1024] )
+def test_sine( N ):
+    x = np.arange( -N, N )   # 2N points per period
+    y = [ int(8191 * np.sin( np.pi*i/N) + 8192) for i in x ]
+    assert rigol_wave.sine( 2*N ).tolist() == y
+    assert rigol_wave.dac_string( rigol_wave.sine(2*N) ) == old_string( y )
+
+def test_halfwave_sine():
+    N = 512
+    x = np.arange( -N/2, N/2 )
+    y = [ int(8191 * np.abs(np.sin( np.pi*i/N)) + 8192) for i in x ]
+    assert rigol_wave.halfwave_sine( N ).tolist() == y
+
+@pytest.mark.parametrize( 'duty_cycle', [0.1, 0.25, 0.5, 0.333] )
+def test_square( duty_cycle ):
+    N = 1024
+    y = [ int(16383 * (i < duty_cycle*N)) for i in np.arange(0, N) ]
+    assert rigol_wave.square( N, duty_cycle ).tolist() == y
+
+def test_sawtooth():
+    N = 2048
+    y = [ int( 16383.0*i/N ) for i in np.arange(0, N) ]
+    assert rigol_wave.sawtooth( N ).tolist() == y
+
+@pytest.mark.parametrize( 'k', [1, 2, 3.5] )
+def test_sinc( k ):
+    N = 512
+    x = np.arange( -N, N )
+    y = [ int(8191 * np.sinc(np.pi*k*i/N) + 8192) for i in x ]
+    assert rigol_wave.sinc( 2*N, k ).tolist() == y
+
+@pytest.mark.parametrize( 'k', [2.0, 4.0] )
+def test_exp_cos_sym( k ):
+    N = 256
+    x = np.arange( -N, N )
+    y = [ int(8191 * np.exp(-np.abs(k*i)/N) * np.cos(np.pi*k*i/N) + 8192)
+          for i in x ]
+    assert rigol_wave.exp_cos_sym( 2*N, k ).tolist() == y
+
+def test_dac_string_all_codes():
+    codes = np.arange( 16384 )
+    assert rigol_wave.dac_string( codes ) == old_string( codes.tolist() )
+    # out of range codes are clipped
+    assert rigol_wave.dac_string( [-5, 20000] ) == '0,16383'
+
+############################################################################